@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+
+import os
+from dotenv import load_dotenv
+from notion_client import Client
+
+# 환경 변수 로드
+load_dotenv("config/.env")
+
+def add_cpu_history_property():
+    """최근 1시간 CPU 최댓값 속성 추가 (값은 로컬 시계열 저장소에서 계산)"""
+    print("📈 CPU 1시간 최대 속성 추가 중...")
+    
+    try:
+        notion = Client(auth=os.environ["NOTION_TOKEN"])
+        database_id = os.environ["AUTOMATION_DATABASE_ID"]
+        
+        # 새로운 속성 추가
+        new_properties = {
+            "CPU 1시간 최대": {
+                "number": {
+                    "format": "percent"
+                }
+            }
+        }
+        
+        # 데이터베이스 업데이트
+        response = notion.databases.update(
+            database_id=database_id,
+            properties=new_properties
+        )
+        
+        print("✅ CPU 1시간 최대 속성 추가 완료!")
+        print("📋 추가된 속성:")
+        print("  - CPU 1시간 최대: 최근 1시간 동안의 CPU 사용률 최댓값")
+        print("  - 기록: data/metrics.db (원본 1시간, 1분 단위 1일, 15분 단위 30일)")
+        
+        return True
+        
+    except Exception as e:
+        print(f"❌ 속성 추가 실패: {e}")
+        return False
+
+if __name__ == "__main__":
+    success = add_cpu_history_property()
+    if success:
+        print("\n🎉 CPU 추이 표시 완성!")
+        print("모니터를 재시작하면 다음 업데이트부터 표시됩니다.")
+    else:
+        print("\n💔 설정을 확인해주세요.")
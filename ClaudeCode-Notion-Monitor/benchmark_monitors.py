@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+모니터 벤치마크 - 사이클당 API 호출 수, 전송 바이트, 스캔 시간, 틱 지연, 모니터 자체 CPU/RSS 측정
+
+- 로컬 가짜 노션 서버(fake_notion_server.py)를 프로세스 내에서 실행 (토큰 불필요)
+- 감시 패턴이 cmdline에 포함된 가상 프로세스 N개를 띄워 실제 스캔 경로를 측정
+- 결과는 JSON으로 출력 (추이 비교용)
+
+사용:
+    python3 benchmark_monitors.py --processes 20 --cycles 5 --latency 0.05 --out bench.json
+    python3 benchmark_monitors.py --monitors efficient,engine --rate-limit 3
+"""
+
+import os
+import sys
+import json
+import time
+import tempfile
+import argparse
+import platform
+import statistics
+import subprocess
+from datetime import datetime, timezone
+from pathlib import Path
+
+import psutil
+
+PROJECT_DIR = Path(__file__).resolve().parent
+SRC_DIR = PROJECT_DIR / "src"
+DATABASE_ID = "benchmark-database"
+
+sys.path.insert(0, str(PROJECT_DIR))
+sys.path.insert(0, str(SRC_DIR))
+
+from fake_notion_server import FakeNotionServer
+
+MONITORS = ("efficient", "automation", "engine")
+
+
+def spawn_synthetic_processes(patterns, count):
+    """패턴을 돌아가며 cmdline에 넣은 sleep 프로세스 count개 실행"""
+    procs = []
+    for i in range(count):
+        pattern = patterns[i % len(patterns)]
+        procs.append(subprocess.Popen(
+            [sys.executable, "-c", "import time; time.sleep(86400)", f"/tmp/benchmark/{pattern}"],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        ))
+    return procs
+
+
+def stop_processes(procs):
+    for proc in procs:
+        proc.terminate()
+    for proc in procs:
+        try:
+            proc.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+
+def seed_pages(server, titles):
+    """EfficientMonitor는 페이지를 만들지 않으므로 미리 생성"""
+    with server.store.lock:
+        for title in titles:
+            server.store.create_page({
+                "parent": {"database_id": DATABASE_ID},
+                "properties": {
+                    "이름": {"title": [{"text": {"content": title}}]},
+                    "제어": {"checkbox": False},
+                },
+            })
+
+
+class ScanTimer:
+    """스냅샷 서비스의 스캔 시간 누적 (사이클 동작은 그대로)"""
+
+    def __init__(self, service):
+        self.total = 0.0
+        self.count = 0
+        scan = service._scan
+
+        def timed_scan():
+            started = time.perf_counter()
+            try:
+                return scan()
+            finally:
+                self.total += time.perf_counter() - started
+                self.count += 1
+
+        service._scan = timed_scan
+
+    def take(self):
+        total, count = self.total, self.count
+        self.total, self.count = 0.0, 0
+        return total, count
+
+
+def build_monitor(name, snapshot_service):
+    """모니터 이름 → 한 사이클 실행 함수"""
+    if name == "efficient":
+        from efficient_monitor import EfficientMonitor
+        monitor = EfficientMonitor(snapshot_service=snapshot_service)
+        return monitor.batch_update_notion
+    if name == "automation":
+        from automation_monitor import AutomationMonitor
+        monitor = AutomationMonitor(snapshot_service=snapshot_service)
+        return monitor.run_scan
+    if name == "engine":
+        from efficient_monitor import EfficientMonitor
+        from process_controller import ProcessController
+        from cycle_engine import CycleEngine
+        controller = ProcessController(snapshot_service=snapshot_service)
+        # 실제 프로세스를 시작/중단하지 않도록 제어 대상 비움 (조정 단계는 그대로 실행)
+        controller.process_commands = {}
+        engine = CycleEngine(EfficientMonitor(snapshot_service=snapshot_service), controller, snapshot_service)
+        return engine.run_cycle
+    raise ValueError(f"알 수 없는 모니터: {name}")
+
+
+def run_monitor(name, server, cycles, snapshot_service):
+    """모니터 하나를 cycles회 실행 → 사이클별 측정값"""
+    run_cycle = build_monitor(name, snapshot_service)
+    timer = ScanTimer(snapshot_service)
+    me = psutil.Process()
+    results = []
+
+    for cycle in range(cycles):
+        # 매 사이클 새로 스캔하도록 (스냅샷 max_age 캐시 제외)
+        snapshot_service.invalidate()
+        server.reset_stats()
+        timer.take()
+        cpu_before = me.cpu_times()
+        started = time.perf_counter()
+
+        run_cycle()
+
+        elapsed = time.perf_counter() - started
+        cpu_after = me.cpu_times()
+        stats = server.stats()
+        scan_time, scans = timer.take()
+        results.append({
+            "cycle": cycle + 1,
+            "api_calls": stats["requests"],
+            "api_calls_by_endpoint": stats["by_endpoint"],
+            "rate_limited": stats["rate_limited"],
+            "bytes_sent": stats["bytes_in"],
+            "bytes_received": stats["bytes_out"],
+            "scan_ms": round(scan_time * 1000, 2),
+            "scans": scans,
+            "tick_ms": round(elapsed * 1000, 2),
+            "cpu_ms": round(((cpu_after.user - cpu_before.user) + (cpu_after.system - cpu_before.system)) * 1000, 2),
+            "rss_mb": round(me.memory_info().rss / 1024 / 1024, 1),
+        })
+    return results
+
+
+def summarize(cycles):
+    """첫 사이클(캐시 워밍업)과 이후 정상 상태를 나눠 요약"""
+    keys = ("api_calls", "bytes_sent", "bytes_received", "scan_ms", "tick_ms", "cpu_ms", "rss_mb")
+    steady = cycles[1:] or cycles
+    return {
+        "first": {key: cycles[0][key] for key in keys},
+        "steady_median": {key: statistics.median(c[key] for c in steady) for key in keys},
+        "steady_max": {key: max(c[key] for c in steady) for key in keys},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="노션 모니터 벤치마크 (가짜 노션 서버 사용)")
+    parser.add_argument("--monitors", default=",".join(MONITORS), help=f"쉼표로 구분 ({', '.join(MONITORS)})")
+    parser.add_argument("--processes", type=int, default=10, help="가상 프로세스 수")
+    parser.add_argument("--cycles", type=int, default=5, help="모니터당 사이클 수")
+    parser.add_argument("--latency", type=float, default=0.0, help="가짜 노션 요청당 지연 (초)")
+    parser.add_argument("--rate-limit", type=float, default=0, help="가짜 노션 초당 허용 요청 수 (0 = 무제한)")
+    parser.add_argument("--out", help="JSON 결과 파일 (생략 시 표준 출력)")
+    args = parser.parse_args()
+
+    out_path = Path(args.out).resolve() if args.out else None
+    monitors = [m.strip() for m in args.monitors.split(",") if m.strip()]
+    unknown = [m for m in monitors if m not in MONITORS]
+    if unknown:
+        parser.error(f"알 수 없는 모니터: {', '.join(unknown)}")
+
+    server = FakeNotionServer(port=0, latency=args.latency, rate_limit=args.rate_limit).start()
+
+    # 모니터 모듈 import 전에 환경 설정 (load_dotenv는 기존 값을 덮어쓰지 않음)
+    cache_dir = tempfile.mkdtemp(prefix="notion-bench-")
+    os.environ.update({
+        "NOTION_TOKEN": "benchmark",
+        "NOTION_BASE_URL": server.url,
+        "AUTOMATION_DATABASE_ID": DATABASE_ID,
+        "PAGE_CACHE_FILE": os.path.join(cache_dir, "page_cache.json"),
+        "METRICS_DB_FILE": os.path.join(cache_dir, "metrics.db"),
+    })
+    # 모니터 로그는 stderr 경고만 (logs/ 파일에 벤치마크 기록이 섞이지 않도록)
+    import logging
+    logging.basicConfig(level=logging.WARNING, stream=sys.stderr)
+    os.chdir(SRC_DIR)
+
+    from process_snapshot import ProcessSnapshotService
+    from efficient_monitor import EfficientMonitor
+    from automation_monitor import AutomationMonitor
+
+    # 가상 프로세스 패턴 = 두 모니터의 감시 패턴 합집합
+    probe_service = ProcessSnapshotService()
+    registered = EfficientMonitor(snapshot_service=probe_service).registered_processes
+    patterns = []
+    for patterns_list in registered.values():
+        patterns.extend(p for p in patterns_list if p not in patterns)
+    automation = AutomationMonitor(snapshot_service=probe_service)
+    patterns.extend(p for p in automation.automation_patterns if p not in patterns)
+    titles = list(registered)
+
+    procs = spawn_synthetic_processes(patterns, args.processes)
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "host": platform.node(),
+            "python": platform.python_version(),
+            "processes": args.processes,
+            "cycles": args.cycles,
+            "latency": args.latency,
+            "rate_limit": args.rate_limit,
+        },
+        "results": {},
+    }
+    try:
+        time.sleep(0.5)  # 가상 프로세스 시작 대기
+        for name in monitors:
+            with server.store.lock:
+                server.store.reset()
+            seed_pages(server, titles)
+            # 모니터마다 새 스냅샷 서비스 (이전 모니터의 인덱스/샘플 재사용 방지)
+            cycles = run_monitor(name, server, args.cycles, ProcessSnapshotService())
+            report["results"][name] = {"cycles": cycles, "summary": summarize(cycles)}
+            steady = report["results"][name]["summary"]["steady_median"]
+            print(f"📊 {name}: API {steady['api_calls']}회/사이클, 틱 {steady['tick_ms']}ms, "
+                  f"스캔 {steady['scan_ms']}ms, CPU {steady['cpu_ms']}ms", file=sys.stderr)
+    finally:
+        stop_processes(procs)
+        server.stop()
+
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if out_path:
+        out_path.write_text(output)
+        print(f"💾 결과 저장: {out_path}", file=sys.stderr)
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,9 +1,13 @@
 #!/usr/bin/env python3
 
 import os
+import sys
 from dotenv import load_dotenv
 from notion_client import Client
 
+sys.path.append('src')
+from notion_pagination import iter_database_rows
+
 # 환경 변수 로드
 load_dotenv("config/.env")
 
@@ -15,20 +19,23 @@ def check_existing_pages():
         notion = Client(auth=os.environ["NOTION_TOKEN"])
         database_id = os.environ["AUTOMATION_DATABASE_ID"]
         
-        # 모든 페이지 조회 (아카이브된 것 포함)
-        response = notion.databases.query(
-            database_id=database_id,
+        # 모든 페이지 조회 (100개 초과 시 페이지네이션, 표시할 속성만 요청)
+        rows = iter_database_rows(
+            notion,
+            database_id,
             filter={
                 "or": [
                     {"property": "이름", "title": {"is_not_empty": True}},
                 ]
-            }
+            },
+            filter_properties=["이름", "상태", "제어"]
         )
         
-        print(f"📊 총 {len(response['results'])}개 페이지 발견")
         print("-" * 50)
         
-        for i, page in enumerate(response['results'], 1):
+        page_count = 0
+        for i, page in enumerate(rows, 1):
+            page_count = i
             # 페이지 정보 추출
             page_id = page['id']
             archived = page.get('archived', False)
@@ -59,12 +66,13 @@ def check_existing_pages():
             print(f"   상태: {status} | 제어: {control} | {archive_status}")
             print()
         
-        return response['results']
+        print(f"📊 총 {page_count}개 페이지 발견")
+        return page_count
         
     except Exception as e:
         print(f"❌ 페이지 확인 실패: {e}")
-        return []
+        return 0
 
 if __name__ == "__main__":
-    pages = check_existing_pages()
-    print(f"✅ 총 {len(pages)}개 페이지 확인 완료")
\ No newline at end of file
+    page_count = check_existing_pages()
+    print(f"✅ 총 {page_count}개 페이지 확인 완료")
\ No newline at end of file
@@ -1,10 +1,14 @@
 #!/usr/bin/env python3
 
 import os
+import sys
 from dotenv import load_dotenv
 from notion_client import Client
 from collections import defaultdict
 
+sys.path.append('src')
+from notion_pagination import iter_database_rows, page_title
+
 # 환경 변수 로드
 load_dotenv("config/.env")
 
@@ -16,21 +20,18 @@ def clean_duplicate_pages():
         notion = Client(auth=os.environ["NOTION_TOKEN"])
         database_id = os.environ["AUTOMATION_DATABASE_ID"]
         
-        # 데이터베이스의 모든 페이지 조회
-        response = notion.databases.query(database_id=database_id)
-        pages = response["results"]
-        
-        print(f"📊 총 {len(pages)}개 페이지 발견")
-        
-        # 이름별로 페이지 그룹화
+        # 이름별로 페이지 그룹화 (전체 페이지를 순회하며 id/생성 시각만 보관)
         pages_by_name = defaultdict(list)
+        page_count = 0
         
-        for page in pages:
+        for page in iter_database_rows(notion, database_id, filter_properties=["이름"]):
+            page_count += 1
             # 제목 속성에서 이름 추출
-            title_property = page["properties"].get("이름", {})
-            if title_property.get("title"):
-                page_name = title_property["title"][0]["text"]["content"]
-                pages_by_name[page_name].append(page)
+            page_name = page_title(page)
+            if page_name:
+                pages_by_name[page_name].append({"id": page["id"], "created_time": page["created_time"]})
+        
+        print(f"📊 총 {page_count}개 페이지 발견")
         
         # 중복 페이지 삭제
         deleted_count = 0
@@ -0,0 +1,505 @@
+#!/usr/bin/env python3
+"""
+로컬 가짜 노션 API 서버 (부하/지연/rate limit 테스트용)
+
+지원 엔드포인트 (노션 API v1과 같은 경로/응답 형식):
+- POST  /v1/databases/{id}/query  (필터, 정렬, 페이지네이션, filter_properties=속성 ID)
+- GET   /v1/databases/{id}, PATCH /v1/databases/{id}
+- POST  /v1/pages, GET /v1/pages/{id}, PATCH /v1/pages/{id}
+- GET   /v1/users/me
+
+관리 엔드포인트:
+- GET  /_stats        요청 수/바이트/429 횟수
+- POST /_reset        데이터와 통계 초기화
+- POST /_config       {"latency": 0.1, "jitter": 0.05, "rate_limit": 3, "inject_429_every": 0, "retry_after": 1}
+- POST /_user_edit    {"page_id": ..., "properties": {...}} 사용자 수정 흉내 (last_edited_by = 사용자)
+
+사용:
+    python3 fake_notion_server.py --port 8787 --latency 0.1 --rate-limit 3
+    config/.env 에 NOTION_BASE_URL=http://127.0.0.1:8787 설정 후 모니터 실행
+"""
+
+import sys
+import json
+import time
+import uuid
+import hashlib
+import random
+import argparse
+import threading
+from datetime import datetime, timezone
+from urllib.parse import urlparse, parse_qs
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+BOT_USER_ID = "00000000-0000-4000-8000-000000000b07"
+HUMAN_USER_ID = "00000000-0000-4000-8000-0000000005e7"
+
+
+class NotionError(Exception):
+    def __init__(self, status, code, message):
+        super().__init__(message)
+        self.status = status
+        self.code = code
+        self.message = message
+
+
+def _now_iso(minute_precision=True):
+    """노션처럼 last_edited_time은 분 단위로 반올림"""
+    now = datetime.now(timezone.utc)
+    if minute_precision:
+        now = now.replace(second=0, microsecond=0)
+    return now.strftime("%Y-%m-%dT%H:%M:%S.") + f"{now.microsecond // 1000:03d}Z"
+
+
+def _parse_time(value):
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def _normalize_property(value):
+    """요청의 속성값 → 응답 형식 (type, plain_text 추가)"""
+    value = dict(value)
+    kind = next((key for key in value if key not in ("id", "type")), None)
+    if kind:
+        value["type"] = kind
+    if kind in ("title", "rich_text"):
+        value[kind] = [
+            dict(part, type="text", plain_text=part.get("text", {}).get("content", ""))
+            for part in value[kind]
+        ]
+    return value
+
+
+def _property_id(name, kind=None):
+    """속성 ID (노션처럼 제목은 "title", 나머지는 짧은 고정 문자열 - 초기화 후에도 같은 값)"""
+    if kind == "title":
+        return "title"
+    return hashlib.md5(name.encode()).hexdigest()[:4]
+
+
+def _plain_text(prop):
+    kind = prop.get("type")
+    if kind in ("title", "rich_text"):
+        return "".join(part.get("plain_text", "") for part in prop[kind])
+    return None
+
+
+class FakeNotionStore:
+    """데이터베이스/페이지 저장소 + 요청 통계"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.databases = {}  # id → 데이터베이스 객체
+        self.pages = {}      # id → 페이지 객체 (생성 순서 유지)
+        self.stats = {
+            "requests": 0,
+            "by_endpoint": {},
+            "bytes_in": 0,
+            "bytes_out": 0,
+            "rate_limited": 0,
+            "errors": 0,
+        }
+
+    # --- 데이터 ---
+
+    def database(self, database_id):
+        """없는 데이터베이스는 첫 사용 시 생성 (토큰/ID 설정 없이 바로 테스트)"""
+        if database_id not in self.databases:
+            self.databases[database_id] = {
+                "object": "database",
+                "id": database_id,
+                "created_time": _now_iso(),
+                "last_edited_time": _now_iso(),
+                "title": [],
+                "properties": {},
+            }
+        return self.databases[database_id]
+
+    def page(self, page_id):
+        page = self.pages.get(page_id)
+        if page is None:
+            raise NotionError(404, "object_not_found", f"Could not find page with ID: {page_id}.")
+        return page
+
+    def create_page(self, body, editor=BOT_USER_ID):
+        parent = body.get("parent") or {}
+        if "database_id" not in parent:
+            raise NotionError(400, "validation_error", "body.parent.database_id should be defined")
+        self.database(parent["database_id"])
+        now = _now_iso()
+        page = {
+            "object": "page",
+            "id": str(uuid.uuid4()),
+            "created_time": now,
+            "last_edited_time": now,
+            "created_by": {"object": "user", "id": editor},
+            "last_edited_by": {"object": "user", "id": editor},
+            "archived": False,
+            "parent": {"type": "database_id", "database_id": parent["database_id"]},
+            "properties": {},
+        }
+        for name, value in body.get("properties", {}).items():
+            page["properties"][name] = self._page_property(parent["database_id"], name, value)
+        self.pages[page["id"]] = page
+        return page
+
+    def _page_property(self, database_id, name, value):
+        """페이지 속성값 정규화 + 데이터베이스 스키마에 없으면 추가 (노션처럼 값에 속성 ID 포함)"""
+        value = _normalize_property(value)
+        schema = self.database(database_id)["properties"]
+        if name not in schema:
+            schema[name] = {"id": _property_id(name, value.get("type")), "name": name,
+                            "type": value.get("type"), value.get("type"): {}}
+        value["id"] = schema[name]["id"]
+        return value
+
+    def update_page(self, page_id, body, editor=BOT_USER_ID):
+        page = self.page(page_id)
+        for name, value in (body.get("properties") or {}).items():
+            page["properties"][name] = self._page_property(page["parent"]["database_id"], name, value)
+        if "archived" in body:
+            page["archived"] = bool(body["archived"])
+        page["last_edited_time"] = _now_iso()
+        page["last_edited_by"] = {"object": "user", "id": editor}
+        return page
+
+    def update_database(self, database_id, body):
+        database = self.database(database_id)
+        for name, schema in (body.get("properties") or {}).items():
+            if schema is None:
+                database["properties"].pop(name, None)
+            else:
+                kind = next((key for key in schema if key not in ("id", "name", "type")), None)
+                database["properties"][name] = dict(schema, id=_property_id(name, kind), name=name, type=kind)
+        if "title" in body:
+            database["title"] = body["title"]
+        database["last_edited_time"] = _now_iso()
+        return database
+
+    # --- 조회 ---
+
+    def _match_condition(self, value, condition):
+        """단일 값과 조건 비교 (텍스트/숫자/체크박스/선택/날짜 공통)"""
+        for op, target in condition.items():
+            if op == "equals" and value != target:
+                return False
+            if op == "does_not_equal" and value == target:
+                return False
+            if op == "contains" and (value is None or target not in value):
+                return False
+            if op == "is_empty" and target and value not in (None, ""):
+                return False
+            if op == "is_not_empty" and target and value in (None, ""):
+                return False
+            if op in ("greater_than", "after") and not (value is not None and value > target):
+                return False
+            if op in ("less_than", "before") and not (value is not None and value < target):
+                return False
+            if op in ("greater_than_or_equal_to", "on_or_after") and not (value is not None and value >= target):
+                return False
+            if op in ("less_than_or_equal_to", "on_or_before") and not (value is not None and value <= target):
+                return False
+        return True
+
+    def _property_value(self, prop):
+        kind = prop.get("type")
+        if kind in ("title", "rich_text"):
+            return _plain_text(prop)
+        if kind == "select":
+            return (prop.get("select") or {}).get("name")
+        if kind == "date":
+            start = (prop.get("date") or {}).get("start")
+            return _parse_time(start) if start else None
+        return prop.get(kind)
+
+    def _matches(self, page, spec):
+        if not spec:
+            return True
+        if "and" in spec:
+            return all(self._matches(page, sub) for sub in spec["and"])
+        if "or" in spec:
+            return any(self._matches(page, sub) for sub in spec["or"])
+        if "timestamp" in spec:
+            field = spec["timestamp"]
+            condition = {op: _parse_time(v) if isinstance(v, str) else v for op, v in spec[field].items()}
+            return self._match_condition(_parse_time(page[field]), condition)
+
+        prop = page["properties"].get(spec.get("property"), {})
+        kind = next((key for key in spec if key != "property"), None)
+        condition = spec.get(kind, {})
+        if kind == "date":
+            condition = {op: _parse_time(v) if isinstance(v, str) else v for op, v in condition.items()}
+        return self._match_condition(self._property_value(prop) if prop else None, condition)
+
+    def _sort_key(self, sort):
+        def key(page):
+            if "timestamp" in sort:
+                value = page[sort["timestamp"]]
+            else:
+                prop = page["properties"].get(sort["property"])
+                value = self._property_value(prop) if prop else None
+            # None은 항상 마지막
+            return (value is None, value if value is not None else 0)
+        return key
+
+    def query(self, database_id, body, filter_properties):
+        self.database(database_id)
+        rows = [
+            page for page in self.pages.values()
+            if page["parent"]["database_id"] == database_id and not page["archived"]
+            and self._matches(page, body.get("filter"))
+        ]
+        for sort in reversed(body.get("sorts") or []):
+            rows.sort(key=self._sort_key(sort), reverse=sort.get("direction") == "descending")
+
+        # 커서 = 다음 페이지 첫 행의 ID
+        start = 0
+        if body.get("start_cursor"):
+            ids = [page["id"] for page in rows]
+            if body["start_cursor"] not in ids:
+                raise NotionError(400, "validation_error", "start_cursor provided is invalid")
+            start = ids.index(body["start_cursor"])
+        page_size = min(int(body.get("page_size") or 100), 100)
+        chunk = rows[start:start + page_size]
+        has_more = start + page_size < len(rows)
+
+        # filter_properties는 속성 ID 목록 (이름은 무시 - 실제 API와 동일)
+        if filter_properties:
+            chunk = [
+                dict(page, properties={k: v for k, v in page["properties"].items() if v.get("id") in filter_properties})
+                for page in chunk
+            ]
+        return {
+            "object": "list",
+            "results": chunk,
+            "next_cursor": rows[start + page_size]["id"] if has_more else None,
+            "has_more": has_more,
+            "type": "page_or_database",
+        }
+
+
+class FakeNotionServer:
+    """가짜 노션 서버 - 지연/429 주입/통계 (스크립트와 벤치마크에서 공용)"""
+
+    def __init__(self, host="127.0.0.1", port=8787, latency=0.0, jitter=0.0, rate_limit=0,
+                 inject_429_every=0, retry_after=1):
+        self.host = host
+        self.port = port
+        self.store = FakeNotionStore()
+        self.config = {
+            "latency": latency,                    # 요청마다 지연 (초)
+            "jitter": jitter,                      # 지연 편차 (초)
+            "rate_limit": rate_limit,              # 초당 허용 요청 수 (0 = 제한 없음)
+            "inject_429_every": inject_429_every,  # N번째 요청마다 429 (0 = 사용 안 함)
+            "retry_after": retry_after,            # 429 응답의 Retry-After (초)
+        }
+        self._tokens = None
+        self._tokens_at = time.monotonic()
+        self._server = None
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}"
+
+    def _rate_limited(self):
+        """토큰 버킷 (버스트 = rate_limit) + N번째 요청 강제 429 - 잠금 안에서 호출"""
+        every = self.config["inject_429_every"]
+        if every and self.store.stats["requests"] % every == 0:
+            return True
+        rate = self.config["rate_limit"]
+        if not rate:
+            return False
+        now = time.monotonic()
+        if self._tokens is None:
+            self._tokens = rate
+        self._tokens = min(rate, self._tokens + (now - self._tokens_at) * rate)
+        self._tokens_at = now
+        if self._tokens < 1:
+            return True
+        self._tokens -= 1
+        return False
+
+    def dispatch(self, method, path, query, body):
+        """API 요청 처리 → 응답 객체 (NotionError 발생 가능) - 잠금 안에서 호출"""
+        parts = [part for part in path.split("/") if part]
+        store = self.store
+
+        if parts[:1] != ["v1"]:
+            raise NotionError(404, "invalid_request_url", "Invalid request URL.")
+        parts = parts[1:]
+
+        if parts == ["users", "me"] and method == "GET":
+            return {"object": "user", "id": BOT_USER_ID, "type": "bot", "name": "Fake Notion"}
+        if parts == ["pages"] and method == "POST":
+            return store.create_page(body)
+        if len(parts) == 2 and parts[0] == "pages":
+            if method == "GET":
+                return store.page(parts[1])
+            if method == "PATCH":
+                return store.update_page(parts[1], body)
+        if len(parts) == 3 and parts[0] == "databases" and parts[2] == "query" and method == "POST":
+            return store.query(parts[1], body, query.get("filter_properties"))
+        if len(parts) == 2 and parts[0] == "databases":
+            if method == "GET":
+                return store.database(parts[1])
+            if method == "PATCH":
+                return store.update_database(parts[1], body)
+        raise NotionError(400, "invalid_request_url", f"Unsupported endpoint: {method} {path}")
+
+    def _endpoint_name(self, method, path):
+        """통계용 엔드포인트 이름 (ID 제거)"""
+        parts = [part for part in path.split("/") if part][1:]
+        if not parts:
+            return f"{method} /"
+        if parts[0] == "databases" and parts[-1] == "query":
+            return "databases.query"
+        if parts[0] in ("pages", "databases") and len(parts) == 2:
+            action = {"GET": "retrieve", "PATCH": "update"}.get(method, method.lower())
+            return f"{parts[0]}.{action}"
+        if parts == ["pages"]:
+            return "pages.create"
+        if parts == ["users", "me"]:
+            return "users.me"
+        return f"{method} /{'/'.join(parts)}"
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, status, payload, headers=None):
+                data = payload if isinstance(payload, bytes) else json.dumps(payload, ensure_ascii=False).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(data)
+                return len(data)
+
+            def _handle(self, method):
+                length = int(self.headers.get("Content-Length") or 0)
+                raw = self.rfile.read(length) if length else b""
+                parsed = urlparse(self.path)
+                query = parse_qs(parsed.query)
+                try:
+                    body = json.loads(raw) if raw else {}
+                except ValueError:
+                    self._send(400, {"object": "error", "status": 400, "code": "invalid_json", "message": "Invalid JSON"})
+                    return
+
+                if parsed.path.startswith("/_"):
+                    self._send(200, server.admin(method, parsed.path, body))
+                    return
+
+                # 지연은 잠금 밖에서 (동시 요청이 서로 막히지 않도록)
+                latency = server.config["latency"] + random.uniform(0, server.config["jitter"])
+                if latency > 0:
+                    time.sleep(latency)
+
+                endpoint = server._endpoint_name(method, parsed.path)
+                with server.store.lock:
+                    stats = server.store.stats
+                    stats["requests"] += 1
+                    stats["by_endpoint"][endpoint] = stats["by_endpoint"].get(endpoint, 0) + 1
+                    stats["bytes_in"] += len(raw)
+                    status, headers = 200, None
+                    if server._rate_limited():
+                        stats["rate_limited"] += 1
+                        status, headers = 429, {"Retry-After": str(server.config["retry_after"])}
+                        payload = {"object": "error", "status": 429, "code": "rate_limited",
+                                   "message": "You have been rate limited. Please try again in a few minutes."}
+                    else:
+                        try:
+                            payload = server.dispatch(method, parsed.path, query, body)
+                        except NotionError as e:
+                            stats["errors"] += 1
+                            status = e.status
+                            payload = {"object": "error", "status": e.status, "code": e.code, "message": e.message}
+                    # 잠금 안에서 직렬화 (다른 요청이 페이지를 수정하기 전 상태로 응답)
+                    data = json.dumps(payload, ensure_ascii=False).encode()
+                    stats["bytes_out"] += len(data)
+                self._send(status, data, headers)
+
+            def do_GET(self):
+                self._handle("GET")
+
+            def do_POST(self):
+                self._handle("POST")
+
+            def do_PATCH(self):
+                self._handle("PATCH")
+
+        return Handler
+
+    def admin(self, method, path, body):
+        """관리 엔드포인트 (통계/초기화/설정/사용자 수정)"""
+        with self.store.lock:
+            if path == "/_reset":
+                self.store.reset()
+                self._tokens = None
+            elif path == "/_config" and method == "POST":
+                self.config.update({k: v for k, v in body.items() if k in self.config})
+            elif path == "/_user_edit" and method == "POST":
+                return self.store.update_page(body["page_id"], body, editor=HUMAN_USER_ID)
+            return {"stats": json.loads(json.dumps(self.store.stats)), "config": dict(self.config),
+                    "pages": len(self.store.pages)}
+
+    def stats(self):
+        return self.admin("GET", "/_stats", {})["stats"]
+
+    def reset_stats(self):
+        """데이터는 유지하고 통계만 초기화"""
+        with self.store.lock:
+            self.store.stats.update(requests=0, by_endpoint={}, bytes_in=0, bytes_out=0, rate_limited=0, errors=0)
+
+    def start(self):
+        """백그라운드 스레드에서 실행 (port=0이면 빈 포트 자동 선택)"""
+        self._server = ThreadingHTTPServer((self.host, self.port), self._make_handler())
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        threading.Thread(target=self._server.serve_forever, name="fake-notion", daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="로컬 가짜 노션 API 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8787)
+    parser.add_argument("--latency", type=float, default=0.0, help="요청당 지연 (초)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="지연 편차 (초)")
+    parser.add_argument("--rate-limit", type=float, default=0, help="초당 허용 요청 수 (0 = 무제한, 노션은 평균 3)")
+    parser.add_argument("--inject-429-every", type=int, default=0, help="N번째 요청마다 429 응답")
+    parser.add_argument("--retry-after", type=float, default=1, help="429 응답의 Retry-After (초)")
+    args = parser.parse_args()
+
+    server = FakeNotionServer(
+        host=args.host, port=args.port, latency=args.latency, jitter=args.jitter,
+        rate_limit=args.rate_limit, inject_429_every=args.inject_429_every, retry_after=args.retry_after
+    ).start()
+    print(f"🧪 가짜 노션 서버 실행 중: {server.url}")
+    print(f"   NOTION_BASE_URL={server.url} 로 모니터 연결, 통계: {server.url}/_stats")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+        print("👋 가짜 노션 서버 종료")
+        return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+
+import json
+import asyncio
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class AdaptiveScheduler:
+    """고정 sleep 대신 활동에 따라 간격을 조절하는 폴링 스케줄러
+
+    - 사용자 수정/제어 동작이 있으면 min_interval로 빠르게 폴링
+    - 변화가 없으면 backoff배씩 늘려 max_interval까지 지수 백오프
+    - wake()로 대기 중인 틱을 즉시 깨움 (웹훅 수신 스레드에서 호출 가능)
+    """
+
+    def __init__(self, min_interval=2.0, max_interval=120.0, backoff=2.0, logger=None):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.interval = min_interval
+        self.logger = logger or logging.getLogger(__name__)
+        self._loop = None
+        self._event = None
+
+    def record(self, active):
+        """틱 결과 반영 → 다음 대기 간격"""
+        if active:
+            self.interval = self.min_interval
+        else:
+            self.interval = min(self.interval * self.backoff, self.max_interval)
+        return self.interval
+
+    async def wait(self):
+        """다음 틱까지 대기 → 'timer' 또는 'wake'"""
+        if self._event is None:
+            self._loop = asyncio.get_running_loop()
+            self._event = asyncio.Event()
+        try:
+            await asyncio.wait_for(self._event.wait(), timeout=self.interval)
+            reason = "wake"
+        except asyncio.TimeoutError:
+            reason = "timer"
+        self._event.clear()
+        return reason
+
+    def wake(self):
+        """대기 중인 틱을 즉시 실행 (스레드 안전) + 빠른 폴링으로 전환"""
+        self.interval = self.min_interval
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._event.set)
+
+
+class EditDetector:
+    """페이지의 last_edited_time 변화로 사용자 수정 감지 (이 통합이 쓴 수정은 제외)"""
+
+    def __init__(self, notion, logger=None):
+        self.notion = notion
+        self.logger = logger or logging.getLogger(__name__)
+        self._seen = {}         # 페이지 ID → 마지막으로 본 last_edited_time
+        self._bot_id = None
+        self._bot_checked = False
+
+    def _integration_id(self):
+        """이 통합(봇)의 사용자 ID - 조회 실패 시 None (모든 수정을 사용자 수정으로 간주)"""
+        if not self._bot_checked:
+            self._bot_checked = True
+            try:
+                self._bot_id = self.notion.users.me()["id"]
+            except Exception as e:
+                self.logger.warning(f"⚠️ 통합 사용자 조회 실패: {e}")
+        return self._bot_id
+
+    def observe(self, page):
+        """페이지 1개 확인 → 직전 관측 이후 사용자가 수정했으면 True (처음 본 페이지는 False)"""
+        edited_at = page.get("last_edited_time")
+        previous = self._seen.get(page["id"])
+        self._seen[page["id"]] = edited_at
+        if previous is None or edited_at == previous:
+            return False
+        editor = (page.get("last_edited_by") or {}).get("id")
+        bot_id = self._integration_id()
+        return bot_id is None or editor != bot_id
+
+
+class WebhookReceiver:
+    """로컬 웹훅 수신기 - POST를 받으면 스케줄러를 깨움
+
+    노션 웹훅(터널 경유)이나 단축어/자동화에서 http://127.0.0.1:<port>/ 로 POST
+    token을 지정하면 X-Webhook-Token 헤더 또는 ?token= 값이 일치해야 함
+    """
+
+    def __init__(self, scheduler, host="127.0.0.1", port=8765, token=None, logger=None):
+        self.scheduler = scheduler
+        self.host = host
+        self.port = port
+        self.token = token
+        self.logger = logger or logging.getLogger(__name__)
+        self.received_count = 0
+        self._server = None
+
+    def _make_handler(self):
+        receiver = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else b""
+
+                if receiver.token:
+                    query_token = self.path.partition("token=")[2].split("&")[0]
+                    if receiver.token not in (self.headers.get("X-Webhook-Token"), query_token):
+                        self.send_response(403)
+                        self.end_headers()
+                        return
+
+                # 노션 웹훅 구독 확인 요청: 토큰을 로그로 남겨 설정 화면에 입력
+                try:
+                    payload = json.loads(body) if body else {}
+                except ValueError:
+                    payload = {}
+                if isinstance(payload, dict) and payload.get("verification_token"):
+                    receiver.logger.info(f"🔑 웹훅 확인 토큰: {payload['verification_token']}")
+
+                receiver.received_count += 1
+                receiver.scheduler.wake()
+                self.send_response(200)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+        return Handler
+
+    def start(self):
+        """백그라운드 스레드에서 수신 시작 (포트 사용 중이면 경고 후 비활성)"""
+        try:
+            self._server = ThreadingHTTPServer((self.host, self.port), self._make_handler())
+        except OSError as e:
+            self.logger.warning(f"⚠️ 웹훅 수신기 시작 실패 ({self.host}:{self.port}): {e}")
+            return False
+        self.port = self._server.server_address[1]
+        threading.Thread(target=self._server.serve_forever, name="webhook-receiver", daemon=True).start()
+        self.logger.info(f"📡 웹훅 수신 대기: http://{self.host}:{self.port}/")
+        return True
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
@@ -1,37 +1,67 @@
 #!/usr/bin/env python3
 
 import os
-import psutil
-import time
+import sys
 from datetime import datetime, timezone
 from pathlib import Path
 import logging
 from dotenv import load_dotenv
-from notion_client import Client as NotionClient
+from process_snapshot import get_snapshot_service
+from notion_gateway import get_gateway
+from notion_writer import DiffNotionWriter
+from notion_page_index import NotionPageIndex
+from page_cache import get_page_cache, is_not_found
+from metrics_store import get_metrics_store, CPU_MAX_PROPERTY
+from service_registry import get_service_registry
+from health_probes import get_health_prober
+from instance_lock import InstanceLock, AUTOMATION_LOCK
 
 class AutomationMonitor:
-    def __init__(self):
+    def __init__(self, snapshot_service=None):
         load_dotenv(os.path.join(os.path.dirname(os.path.dirname(__file__)), "config", ".env"))
-        self.notion = NotionClient(auth=os.environ["NOTION_TOKEN"])
+        self.notion = get_gateway()
         self.database_id = os.environ["AUTOMATION_DATABASE_ID"]
         self.tracked_processes = {}
         self.logger = self._setup_logger()
+        self.writer = DiffNotionWriter(self.notion, self.logger)
+        self.page_index = NotionPageIndex(self.notion, self.database_id, cache=get_page_cache(), logger=self.logger)
+        # CPU/메모리 시계열 (노션에는 최근 1시간 최댓값만 표시)
+        self.metrics = get_metrics_store()
+        self._database_properties = None
         
-        # 감시할 프로세스 패턴
-        self.automation_patterns = [
-            "conversation_daemon.py",
-            "screenshot_monitor.py", 
-            "ftp_auto_monitor.py",
-            "background_memory_system.py",
-            "smart_calendar_system.py",
-            "para_organizer.py",
-            "ftpserver.py",
-            "automation_monitor.py",
-            "main_monitor.py",
-            "claude_monitor.py",
-            "realtime_memory_hook.py",
-            "ftp_icloud_photos_sync.py"
-        ]
+        # 프로세스 스냅샷 (틱당 1회 스캔, 다른 모니터와 공유)
+        self.snapshot_service = snapshot_service or get_snapshot_service()
+        
+        # 감시할 프로세스 패턴 (config/services.json의 모든 서비스, 파일이 바뀌면 다시 로드)
+        self.registry = get_service_registry()
+        self._registry_version = None
+        self.automation_patterns = []
+        self.sync_services()
+        
+        # 하트비트/로그/포트/대기열 프로브 (동시 실행, 결과는 틱 사이에 캐시)
+        self.prober = get_health_prober()
+        
+        # ProcessController의 감시기 (설정 시 재시작 횟수/종료 코드/크래시 루프를 건강도에 반영)
+        self.supervisor = None
+        
+        # 같은 데이터베이스를 제어하는 ProcessController (설정 시 제어 대상 서비스의 제어 체크박스는 쓰지 않음)
+        self.controller = None
+    
+    def is_user_controlled(self, process_name):
+        """제어 체크박스를 사용자가 정하는 서비스인지 (ProcessController의 제어 대상 또는 중단 진행 중)"""
+        if self.controller is None:
+            return False
+        return process_name in self.controller.process_commands or process_name in self.controller.stopping
+    
+    def sync_services(self):
+        """서비스 목록이 바뀌었으면 감시 패턴 다시 구성 (스캔 시작 시 호출, mtime 확인만)"""
+        self.registry.refresh()
+        if self._registry_version == self.registry.version:
+            return False
+        self._registry_version = self.registry.version
+        self.automation_patterns = self.registry.all_patterns()
+        self.snapshot_service.register(self.automation_patterns)
+        return True
     
     def _setup_logger(self):
         log_dir = Path("../logs")
@@ -49,103 +79,76 @@ class AutomationMonitor:
     
     def scan_automation_processes(self):
         """자동화 프로세스 스캔"""
-        found_processes = []
-        process_names = set()  # 중복 방지용
+        found_processes = {}  # 이름 → 프로세스 정보 (중복 방지용)
+        self.sync_services()
+        snapshot = self.snapshot_service.get()
         
-        for proc in psutil.process_iter(['pid', 'name', 'cmdline', 'create_time', 'cpu_percent', 'memory_info']):
-            try:
-                cmdline = ' '.join(proc.info['cmdline']) if proc.info['cmdline'] else ""
-                
-                # 자동화 프로세스 패턴 매칭
-                for pattern in self.automation_patterns:
-                    if pattern in cmdline:
-                        process_name = self._extract_process_name(cmdline, pattern)
-                        
-                        # 중복 프로세스는 메모리 합산으로 처리
-                        if process_name in process_names:
-                            # 기존 프로세스 찾아서 메모리 합산
-                            for existing in found_processes:
-                                if existing['name'] == process_name:
-                                    existing['memory_mb'] += round(proc.info['memory_info'].rss / 1024 / 1024, 1)
-                                    existing['memory_percent'] += round((proc.info['memory_info'].rss / (psutil.virtual_memory().total)) * 100, 2)
-                                    existing['cpu_percent'] = max(existing['cpu_percent'], proc.info['cpu_percent'])
-                                    break
-                        else:
-                            # 새 프로세스 추가
-                            process_info = {
-                                'pid': proc.info['pid'],
-                                'name': process_name,
-                                'type': self._classify_process_type(pattern),
-                                'cmdline': cmdline,
-                                'start_time': datetime.fromtimestamp(proc.info['create_time'], timezone.utc),
-                                'cpu_percent': proc.info['cpu_percent'],
-                                'memory_mb': round(proc.info['memory_info'].rss / 1024 / 1024, 1),
-                            'memory_percent': round((proc.info['memory_info'].rss / (psutil.virtual_memory().total)) * 100, 2),
-                                'status': '🟢 Running',
-                                'priority': self._get_process_priority(pattern),
-                                'working_dir': self._extract_working_dir(cmdline),
-                                'auto_restart': self._check_auto_restart(pattern)
-                            }
-                            
-                            found_processes.append(process_info)
-                            process_names.add(process_name)
-                        break
-                        
-            except (psutil.NoSuchProcess, psutil.AccessDenied):
+        for proc in snapshot.processes:
+            cmdline = proc['cmdline']
+            memory_mb = round(proc['memory_rss'] / 1024 / 1024, 1)
+            memory_percent = round((proc['memory_rss'] / snapshot.total_memory) * 100, 2)
+            
+            # 스냅샷이 매칭한 패턴 → 서비스 (다른 모니터만 쓰는 패턴이나 목록에서 빠진 패턴이면 건너뜀)
+            service = self.registry.service_for(proc['patterns'])
+            if service is None:
                 continue
+            process_name = service['name']
+            
+            # 중복 프로세스는 메모리 합산으로 처리
+            existing = found_processes.get(process_name)
+            if existing:
+                existing['memory_mb'] += memory_mb
+                existing['memory_percent'] += memory_percent
+                existing['cpu_percent'] = max(existing['cpu_percent'], proc['cpu_percent'])
+                existing['cpu_avg'] = max(existing['cpu_avg'], proc['cpu_avg'])
+            else:
+                # 새 프로세스 추가
+                found_processes[process_name] = {
+                    'pid': proc['pid'],
+                    'name': process_name,
+                    'type': self.registry.type_label(service),
+                    'notion_type': self.registry.notion_type(service),
+                    'cmdline': cmdline,
+                    'start_time': datetime.fromtimestamp(proc['create_time'], timezone.utc),
+                    'cpu_percent': proc['cpu_percent'],
+                    'cpu_avg': proc['cpu_avg'],
+                    'memory_mb': memory_mb,
+                    'memory_percent': memory_percent,
+                    'status': '🟢 Running',
+                    'priority': service['priority'],
+                    'working_dir': self._extract_working_dir(cmdline),
+                    'auto_restart': service['restart'].get('auto', False),
+                    'health': service['health']
+                }
         
-        return found_processes
-    
-    def _extract_process_name(self, cmdline, pattern):
-        """프로세스 이름 추출"""
-        if "conversation_daemon.py" in pattern:
-            return "🧠 BRAIN Daemon"
-        elif "screenshot_monitor.py" in pattern:
-            return "📷 Screenshot"
-        elif "ftp_auto_monitor.py" in pattern:
-            return "📁 FTP Monitor"
-        elif "background_memory_system.py" in pattern:
-            return "🧠 Background Memory"
-        elif "smart_calendar_system.py" in pattern:
-            return "📅 Calendar"
-        elif "para_organizer.py" in pattern:
-            return "🗂️ PARA"
-        elif "ftpserver.py" in pattern:
-            return "🌐 FTP Server"
-        elif "automation_monitor.py" in pattern:
-            return "📊 Automation Monitor"
-        elif "main_monitor.py" in pattern:
-            return "📊 Claude Monitor"
-        elif "claude_monitor.py" in pattern:
-            return "📊 Claude Monitor"
-        elif "realtime_memory_hook.py" in pattern:
-            return "🧠 Realtime Memory"
-        elif "ftp_icloud_photos_sync.py" in pattern:
-            return "📱 FTP → iCloud Photos"
-        else:
-            return f"🐍 {pattern}"
-    
-    def _classify_process_type(self, pattern):
-        """프로세스 타입 분류"""
-        if "daemon" in pattern or "memory" in pattern:
-            return "🧠 BRAIN"
-        elif "automation_monitor" in pattern or "main_monitor" in pattern or "claude_monitor" in pattern:
-            return "📊 Monitor"
-        elif "server" in pattern:
-            return "🌐 Server"
-        elif "organizer" in pattern or "calendar" in pattern or "ftp_icloud" in pattern:
-            return "🔄 Sync"
-        else:
-            return "🐍 Script"
-    
-    def _get_process_priority(self, pattern):
-        """프로세스 우선순위 결정"""
-        if "daemon" in pattern or "memory" in pattern:
-            return "🔥 Critical"
-        elif "monitor" in pattern or "server" in pattern:
-            return "⚡ High"
-        else:
-            return "🔧 Medium"
+        if self.supervisor:
+            for process_name, info in found_processes.items():
+                info.update(self.supervisor.health(process_name))
+            # 크래시 루프로 재시작이 멈춘 서비스도 중단 상태로 표시
+            for process_name in list(self.supervisor.services):
+                service = self.registry.get(process_name)
+                if process_name in found_processes or not service or not self.supervisor.in_crash_loop(process_name):
+                    continue
+                found_processes[process_name] = {
+                    'pid': None,
+                    'name': process_name,
+                    'type': self.registry.type_label(service),
+                    'notion_type': self.registry.notion_type(service),
+                    'cmdline': '',
+                    'start_time': None,
+                    'cpu_percent': 0.0,
+                    'cpu_avg': 0.0,
+                    'memory_mb': 0.0,
+                    'memory_percent': 0.0,
+                    'status': '🔴 Stopped',
+                    'priority': service['priority'],
+                    'working_dir': 'Unknown',
+                    'auto_restart': service['restart'].get('auto', False),
+                    'health': service['health'],
+                    **self.supervisor.health(process_name)
+                }
+        
+        return list(found_processes.values())
     
     def _extract_working_dir(self, cmdline):
         """작업 디렉토리 추출"""
@@ -157,121 +160,105 @@ class AutomationMonitor:
                 return f"/GM/{path_part}"
         return "Unknown"
     
-    def _check_auto_restart(self, pattern):
-        """자동 재시작 여부 확인"""
-        # daemon 프로세스는 보통 자동 재시작
-        return "daemon" in pattern or "server" in pattern
-    
-    def _get_type_emoji(self, type_name):
-        """타입을 이모지로 변환"""
-        if "BRAIN" in type_name:
-            return "🧠"
-        elif "Monitor" in type_name:
-            return "📊"
-        elif "Server" in type_name:
-            return "🌐"
-        elif "Sync" in type_name:
-            return "🔄"
-        else:
-            return "🐍"
-    
-    def _get_korean_type(self, type_name):
-        """타입을 한글로 변환"""
-        if "BRAIN" in type_name:
-            return "🧠 브레인"
-        elif "Monitor" in type_name:
-            return "📊 모니터"
-        elif "Server" in type_name:
-            return "🌐 서버"
-        elif "Sync" in type_name:
-            return "🔄 동기화"
-        else:
-            return "🐍 스크립트"
+    def has_database_property(self, name):
+        """데이터베이스에 속성이 있는지 (처음 한 번 조회 후 재사용, 실패 시 다음에 재시도)"""
+        if self._database_properties is None:
+            try:
+                database = self.notion.databases.retrieve(database_id=self.database_id)
+                self._database_properties = set(database["properties"])
+            except Exception as e:
+                self.logger.warning(f"⚠️ 데이터베이스 속성 조회 실패: {e}")
+                return False
+        return name in self._database_properties
     
     def calculate_health_score(self, process_info):
         """프로세스 건강성 점수 계산 (0-100)"""
+        if process_info['status'] != '🟢 Running':
+            return 0
+        
+        health = process_info.get('health', {})  # 서비스별 기준 (config/services.json)
         score = 100
         
-        # CPU 사용량 기준 (>50% 시 점수 감소)
-        if process_info['cpu_percent'] > 50:
+        # CPU 사용량 기준 (최근 5분 평균 >50% 시 점수 감소)
+        cpu = process_info.get('cpu_avg', process_info['cpu_percent'])
+        if cpu > health.get('cpu_critical', 50):
             score -= 20
-        elif process_info['cpu_percent'] > 20:
+        elif cpu > health.get('cpu_warn', 20):
             score -= 10
         
         # 메모리 사용량 기준 (>500MB 시 점수 감소)
-        if process_info['memory_mb'] > 500:
+        if process_info['memory_mb'] > health.get('memory_mb_critical', 500):
             score -= 15
-        elif process_info['memory_mb'] > 200:
+        elif process_info['memory_mb'] > health.get('memory_mb_warn', 200):
             score -= 5
         
+        # 프로브 실패 감점 (하트비트/로그 갱신, 포트 응답, 대기열 길이)
+        score -= self.prober.penalty(process_info['name'])
+        
         # 가동 시간 기준 (너무 오래 실행 중이면 약간 감소)
         uptime_hours = (datetime.now(timezone.utc) - process_info['start_time']).total_seconds() / 3600
         if uptime_hours > 24:
             score -= 5
         
+        # 감시기 기록 기준 (ProcessController가 직접 시작한 프로세스만)
+        score -= min(30, process_info.get('restarts', 0) * 10)  # 최근 1시간 재시작
+        if process_info.get('last_exit_code') not in (None, 0):
+            score -= 10
+        if process_info.get('crash_loop'):
+            score = min(score, 20)
+        
         return max(0, score)
     
     def find_existing_page(self, process_name):
-        """노션 데이터베이스에서 기존 페이지 찾기"""
-        try:
-            response = self.notion.databases.query(
-                database_id=self.database_id,
-                filter={
-                    "property": "이름",
-                    "title": {
-                        "equals": process_name
-                    }
-                }
-            )
-            
-            if response["results"]:
-                return response["results"][0]["id"]
-            return None
-            
-        except Exception as e:
-            self.logger.error(f"❌ 기존 페이지 검색 실패: {e}")
-            return None
+        """페이지 인덱스에서 기존 페이지 찾기 (API 호출 없음)"""
+        return self.page_index.page_id(process_name)
     
-    def _calculate_elapsed_time(self, page_id):
-        """경과시간 계산"""
-        if not page_id:
+    def _calculate_elapsed_time(self, last_update):
+        """경과시간 계산 (인덱스에 보관된 마지막 업데이트 시각 기준)"""
+        if not last_update:
             return "방금 전"
         
-        try:
-            # 기존 페이지에서 마지막 업데이트 시간 가져오기
-            page = self.notion.pages.retrieve(page_id=page_id)
-            update_property = page["properties"].get("업데이트", {})
-            
-            if update_property.get("date") and update_property["date"].get("start"):
-                last_update = datetime.fromisoformat(update_property["date"]["start"].replace('Z', '+00:00'))
-                elapsed_seconds = (datetime.now(timezone.utc) - last_update).total_seconds()
-                
-                if elapsed_seconds < 60:
-                    return f"{int(elapsed_seconds)}초 전"
-                elif elapsed_seconds < 3600:
-                    return f"{int(elapsed_seconds / 60)}분 전"
-                else:
-                    return f"{int(elapsed_seconds / 3600)}시간 전"
-            
-            return "방금 전"
-            
-        except Exception as e:
-            return "방금 전"
+        elapsed_seconds = (datetime.now(timezone.utc) - last_update).total_seconds()
+        
+        if elapsed_seconds < 60:
+            return f"{int(elapsed_seconds)}초 전"
+        elif elapsed_seconds < 3600:
+            return f"{int(elapsed_seconds / 60)}분 전"
+        else:
+            return f"{int(elapsed_seconds / 3600)}시간 전"
     
     def update_notion_database(self, processes):
-        """노션 데이터베이스 업데이트"""
+        """노션 데이터베이스 업데이트 - 인덱스 조회 1회 + 프로세스당 쓰기 1회"""
         self.logger.info(f"📊 {len(processes)}개 자동화 프로세스 발견")
         
+        # 사이클당 한 번 전체 조회 (실패 시 직전 인덱스 사용)
+        self.page_index.refresh()
+        
+        # 프로브는 주기가 지난 것만 동시 실행 (멈춘 프로브는 timeout 후 실패 처리)
+        try:
+            self.prober.check(self.registry.services)
+        except Exception as e:
+            self.logger.warning(f"⚠️ 프로브 실행 실패: {e}")
+        
+        updates = []  # (프로세스, 페이지 ID, 속성, 업데이트 시각)
         for proc in processes:
             try:
                 # 건강성 점수 계산
                 health_score = self.calculate_health_score(proc)
                 
-                # 가동 시간 계산
-                uptime_hours = round((datetime.now(timezone.utc) - proc['start_time']).total_seconds() / 3600, 1)
+                # 시계열 기록 (실행 중인 프로세스만)
+                running = proc['status'] == "🟢 Running"
+                if running:
+                    try:
+                        self.metrics.append(proc['name'], proc['cpu_percent'], proc['memory_percent'])
+                    except Exception as e:
+                        self.logger.warning(f"⚠️ 시계열 기록 실패 {proc['name']}: {e}")
                 
                 # 기존 페이지 검색
-                existing_page_id = self.find_existing_page(proc['name'])
+                entry = self.page_index.get(proc['name'])
+                existing_page_id = entry['id'] if entry else None
+                last_update = entry['updated_at'] if entry else None
+                now = datetime.now(timezone.utc)
                 
                 # 업데이트할 속성들
                 properties = {
@@ -279,7 +266,7 @@ class AutomationMonitor:
                         "title": [{"text": {"content": proc['name']}}]
                     },
                     "유형": {
-                        "select": {"name": self._get_korean_type(proc['type'])}
+                        "select": {"name": proc['notion_type']}
                     },
                     "메모리": {
                         "number": proc['memory_percent'] / 100  # 퍼센트를 소수점으로 변환
@@ -291,26 +278,27 @@ class AutomationMonitor:
                         "number": health_score
                     },
                     "상태": {
-                        "select": {"name": "🟢 실행중" if proc['status'] == "🟢 Running" else "🔴 중단"}
+                        "select": {"name": "🟢 실행중" if running else "🔴 중단"}
                     },
                     "업데이트": {
-                        "date": {"start": datetime.now(timezone.utc).isoformat()}
+                        "date": {"start": now.isoformat()}
                     },
                     "경과시간": {
-                        "rich_text": [{"text": {"content": self._calculate_elapsed_time(existing_page_id)}}]
-                    },
-                    "제어": {
-                        "checkbox": proc['status'] == "🟢 Running"  # 실행 상태와 동기화
+                        "rich_text": [{"text": {"content": self._calculate_elapsed_time(last_update)}}]
                     }
                 }
+                # 실행 중이면 제어 체크박스를 실행 상태와 동기화 (크래시 루프로 멈춘 서비스는 사용자 설정 유지)
+                # 제어 대상 서비스는 체크박스가 사용자 입력 - 중단 진행 중에 True로 되돌리지 않도록 쓰지 않음
+                if running and not self.is_user_controlled(proc['name']):
+                    properties["제어"] = {"checkbox": True}
+                
+                # 파생 값: 최근 1시간 CPU 최댓값 (속성이 추가된 데이터베이스에만)
+                if self.has_database_property(CPU_MAX_PROPERTY):
+                    cpu_max = self.metrics.max_value(proc['name'], "cpu", 3600)
+                    properties[CPU_MAX_PROPERTY] = {"number": (cpu_max or 0) / 100}
                 
                 if existing_page_id:
-                    # 기존 페이지 업데이트
-                    response = self.notion.pages.update(
-                        page_id=existing_page_id,
-                        properties=properties
-                    )
-                    self.logger.info(f"📝 프로세스 업데이트: {proc['name']}")
+                    updates.append((proc, existing_page_id, properties, now))
                 else:
                     # 새 페이지 생성
                     page_data = {
@@ -318,10 +306,23 @@ class AutomationMonitor:
                         "properties": properties
                     }
                     response = self.notion.pages.create(**page_data)
+                    self.page_index.record(proc['name'], response["id"], now)
                     self.logger.info(f"✅ 새 프로세스 등록: {proc['name']}")
                 
             except Exception as e:
                 self.logger.error(f"❌ 프로세스 업데이트 실패 {proc['name']}: {e}")
+        
+        # 기존 페이지 업데이트 - 변경된 페이지만 동시 전송
+        results = self.writer.update_many([(page_id, properties) for _, page_id, properties, _ in updates])
+        for (proc, page_id, _, now), result in zip(updates, results):
+            if isinstance(result, Exception):
+                self.logger.error(f"❌ 프로세스 업데이트 실패 {proc['name']}: {result}")
+                if is_not_found(result):
+                    self.page_index.discard(proc['name'])
+                    self.writer.forget(page_id)
+            elif result:
+                self.page_index.record(proc['name'], page_id, now)
+                self.logger.info(f"📝 프로세스 업데이트: {proc['name']}")
     
     def run_scan(self):
         """프로세스 스캔 실행"""
@@ -342,5 +343,9 @@ class AutomationMonitor:
             self.logger.warning("⚠️ 실행 중인 자동화 프로세스가 없습니다.")
 
 if __name__ == "__main__":
+    # 데몬이 실행 중이면 1회 실행 생략 (같은 페이지를 동시에 쓰지 않도록)
+    instance_lock = InstanceLock(AUTOMATION_LOCK)
+    if not instance_lock.acquire():
+        sys.exit(0)
     monitor = AutomationMonitor()
     monitor.run_scan()
\ No newline at end of file
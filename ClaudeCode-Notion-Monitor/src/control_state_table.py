@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+
+import logging
+from notion_pagination import iter_database_rows, page_title
+
+
+class ControlStateTable:
+    """노션 제어 상태의 로컬 사본 - last_edited_time 이후 수정된 페이지만 받아 병합
+
+    - 첫 동기화와 full_sync_interval회마다: 전체 조회 (삭제/아카이브된 페이지 정리)
+    - 그 외: 마지막으로 본 최대 last_edited_time 이후 수정된 페이지만 조회
+      (노션 타임스탬프는 분 단위라 on_or_after로 같은 분의 수정도 다시 받음)
+    """
+
+    PROPERTIES = ["이름", "제어"]
+
+    def __init__(self, notion, database_id, full_sync_interval=60, logger=None):
+        self.notion = notion
+        self.database_id = database_id
+        self.full_sync_interval = full_sync_interval
+        self.logger = logger or logging.getLogger(__name__)
+        self.rows = {}          # 페이지 ID → {'title', 'control', 'last_edited_time'}
+        self.cursor = None      # 지금까지 본 최대 last_edited_time (ISO 문자열)
+        self._syncs = 0
+
+    def _row(self, page):
+        return {
+            'title': page_title(page),
+            'control': page["properties"].get("제어", {}).get("checkbox", False),
+            'last_edited_time': page.get("last_edited_time"),
+        }
+
+    def sync(self):
+        """변경분 조회 후 병합 → 이번에 받은 페이지 목록 (조회 실패 시 예외, 테이블은 그대로)"""
+        full = self.cursor is None or self._syncs % self.full_sync_interval == 0
+        if full:
+            pages = list(iter_database_rows(self.notion, self.database_id, filter_properties=self.PROPERTIES))
+        else:
+            pages = list(iter_database_rows(
+                self.notion,
+                self.database_id,
+                filter={"timestamp": "last_edited_time", "last_edited_time": {"on_or_after": self.cursor}},
+                sorts=[{"timestamp": "last_edited_time", "direction": "ascending"}],
+                filter_properties=self.PROPERTIES
+            ))
+        self._syncs += 1
+
+        if full:
+            self.rows = {}
+        for page in pages:
+            self.rows[page["id"]] = self._row(page)
+
+        # ISO 8601(UTC) 문자열은 사전순 비교 = 시간순 비교
+        stamps = [row['last_edited_time'] for row in self.rows.values() if row['last_edited_time']]
+        if stamps:
+            self.cursor = max(stamps)
+        return pages
+
+    def control_states(self):
+        """제목 → 제어 체크박스 (중복 제목은 첫 번째 페이지)"""
+        states = {}
+        for row in self.rows.values():
+            if row['title'] and row['title'] not in states:
+                states[row['title']] = row['control']
+        return states
+
+    def page_rows(self):
+        """제목 → {'id', 'control'} (중복 제목은 첫 번째 페이지)"""
+        rows = {}
+        for page_id, row in self.rows.items():
+            if row['title'] and row['title'] not in rows:
+                rows[row['title']] = {'id': page_id, 'control': row['control']}
+        return rows
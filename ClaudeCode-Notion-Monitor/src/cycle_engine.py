@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+
+from datetime import datetime, timezone
+from adaptive_scheduler import EditDetector
+
+
+class CycleEngine:
+    """제어 + 상태 업데이트를 한 틱으로 통합
+
+    1) 데이터베이스 읽기 1회 (수정된 페이지의 이름/제어만) → 페이지 ID와 제어 상태를 함께 확보
+    2) 프로세스 스냅샷 1회
+    3) 조정: 제어 상태와 다른 프로세스만 시작/중단
+    4) 쓰기 1회: 변경된 페이지만 diff 전송 (제어 체크박스는 사용자가 정한 값 유지)
+       게시기가 연결되어 있으면 저널에 기록만 하고 전송은 게시 스레드가 담당
+    """
+
+    def __init__(self, efficient_monitor, process_controller, snapshot_service):
+        self.monitor = efficient_monitor
+        self.controller = process_controller
+        self.snapshot_service = snapshot_service
+        self.notion = efficient_monitor.notion
+        self.database_id = efficient_monitor.database_id
+        self.logger = efficient_monitor.logger
+        self.edit_detector = EditDetector(self.notion, self.logger)
+        self.user_edited = False  # 마지막 읽기에서 사용자 수정 감지 여부
+
+    def read_database(self):
+        """제목 → {'id': 페이지 ID, 'control': 제어 체크박스} (실패 시 None)"""
+        try:
+            # 컨트롤러의 제어 상태 테이블을 증분 동기화 (변경 없으면 거의 빈 응답)
+            changed = self.controller.control_table.sync()
+        except Exception as e:
+            self.logger.error(f"❌ 데이터베이스 조회 실패: {e}")
+            return None
+
+        user_edited = False
+        for page in changed:
+            user_edited = self.edit_detector.observe(page) or user_edited
+        self.user_edited = user_edited
+        rows = self.controller.control_table.page_rows()
+
+        # 읽은 페이지 ID는 공용 캐시에도 반영 (다른 모니터의 검색 생략)
+        self.monitor.page_cache.update({title: row['id'] for title, row in rows.items()})
+        return rows
+
+    def run_cycle(self):
+        """한 틱 실행 → {'started': [...], 'stopped': [...], 'updated': n, 'skipped': n, 'active': bool}
+
+        active: 사용자 수정 또는 시작/중단이 있었으면 True (스케줄러가 빠른 폴링 유지)
+        """
+        # 서비스 목록 변경 반영 (config/services.json mtime 확인만)
+        self.monitor.sync_services()
+        self.controller.sync_services()
+        self.monitor.run_probes()
+        rows = self.read_database()
+        snapshot = self.snapshot_service.refresh()
+
+        # 조정 - 조회 실패 시에는 제어하지 않음 (잘못된 중단 방지)
+        actions = {}
+        if rows is not None:
+            control_states = {title: row['control'] for title, row in rows.items()}
+            actions = self.controller.reconcile(control_states, snapshot)
+            if actions:
+                # 시작/중단 결과가 반영된 상태로 기록
+                snapshot = self.snapshot_service.refresh()
+
+        # 쓰기
+        updates = []
+        current_time = datetime.now(timezone.utc).isoformat()
+        for process_name, patterns in self.monitor.registered_processes.items():
+            row = rows.get(process_name) if rows is not None else None
+            page_id = row['id'] if row else self.monitor.get_page_id(process_name)
+            if not page_id:
+                self.logger.warning(f"⚠️ 페이지 없음 (삭제 금지): {process_name}")
+                continue
+
+            status = self.monitor.get_process_status(patterns, snapshot)
+            # 재시작 횟수/마지막 종료 코드를 건강도에 반영
+            status.update(self.controller.supervisor.health(process_name))
+            self.monitor.record_sample(process_name, status)
+            # 제어 가능한 프로세스는 사용자가 설정한 값을 유지 (시작 직후 아직 안 보이는 경우 포함)
+            control = None
+            if row and process_name in self.controller.process_commands:
+                control = row['control']
+            updates.append((process_name, page_id, self.monitor.build_properties(process_name, status, current_time, control)))
+
+        updated, skipped = self.monitor.write_updates(updates)
+
+        result = {
+            'started': [name for name, run in actions.items() if run],
+            'stopped': [name for name, run in actions.items() if not run],
+            'updated': updated,
+            'skipped': skipped,
+            # 중단 진행 중이면 결과를 빨리 수집하도록 빠른 폴링 유지
+            'active': bool(actions) or bool(self.controller.stopping) or (rows is not None and self.user_edited),
+        }
+        self.logger.info(
+            f"✅ 사이클 완료: 시작 {len(result['started'])}, 중단 {len(result['stopped'])}, "
+            f"전송 {updated}, 변경 없음 {skipped}"
+        )
+        return result
@@ -1,37 +1,69 @@
 #!/usr/bin/env python3
 
 import os
-import psutil
-import json
-import time
+import sys
 from datetime import datetime, timezone
 from pathlib import Path
 import logging
 from dotenv import load_dotenv
-from notion_client import Client as NotionClient
+from process_snapshot import get_snapshot_service
+from notion_writer import DiffNotionWriter
+from notion_gateway import get_gateway
+from page_cache import get_page_cache, is_not_found
+from metrics_store import get_metrics_store, CPU_MAX_PROPERTY
+from service_registry import get_service_registry
+from health_probes import get_health_prober
+from instance_lock import InstanceLock, AUTOMATION_LOCK
 
 class EfficientMonitor:
-    def __init__(self):
+    def __init__(self, snapshot_service=None):
         load_dotenv(os.path.join(os.path.dirname(os.path.dirname(__file__)), "config", ".env"))
-        self.notion = NotionClient(auth=os.environ["NOTION_TOKEN"])
+        self.notion = get_gateway()
         self.database_id = os.environ["AUTOMATION_DATABASE_ID"]
         self.logger = self._setup_logger()
         
-        # 등록된 프로세스 목록 (고정) - 최적화됨
-        self.registered_processes = {
-            "📊 Automation Monitor": ["efficient_monitor.py", "smart_efficient_monitor.py"],
-            "📷 Screenshot": ["screenshot_monitor.py"], 
-            "🌐 FTP Server": ["ftpserver.py"],
-            "🧠 BRAIN Daemon": ["conversation_daemon.py"],
-            "🧠 Background Memory": ["background_memory_system.py"],
-            "🧠 Realtime Memory": ["realtime_memory_hook.py"],
-            "🧠 Thinking Triggers": ["thinking_triggers.py"]
-        }
+        # 프로세스 스냅샷 (틱당 1회 스캔, 다른 모니터와 공유)
+        self.snapshot_service = snapshot_service or get_snapshot_service()
+        
+        # 등록된 프로세스 목록 (config/services.json의 pinned 서비스, 파일이 바뀌면 다시 로드)
+        self.registry = get_service_registry()
+        self._registry_version = None
+        self.registered_processes = {}
+        self.sync_services()
+        
+        # 하트비트/로그/포트/대기열 프로브 (동시 실행, 결과는 틱 사이에 캐시)
+        self.prober = get_health_prober()
+        
+        # 노션 페이지 ID 캐시 (TTL + 404 재검증, 다른 모니터와 공유)
+        self.page_cache = get_page_cache()
+        
+        # 변경된 속성이 있는 페이지만 전송
+        self.writer = DiffNotionWriter(self.notion, self.logger)
+        
+        # 게시기가 있으면 노션 전송 대신 저널에 기록 (JournalPublisher가 별도 스레드에서 전송)
+        self.publisher = None
         
-        # 노션 페이지 ID 캐시
-        self.page_cache = {}
-        self.cache_file = Path(os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "page_cache.json"))
-        self.load_cache()
+        # CPU/메모리 시계열 (노션에는 최근 1시간 최댓값만 표시)
+        self.metrics = get_metrics_store()
+        self._database_properties = None
+    
+    def sync_services(self):
+        """서비스 목록이 바뀌었으면 감시 대상 다시 구성 (틱 시작 시 호출, mtime 확인만)"""
+        self.registry.refresh()
+        if self._registry_version == self.registry.version:
+            return False
+        self._registry_version = self.registry.version
+        self.registered_processes = self.registry.pinned()
+        for patterns in self.registered_processes.values():
+            self.snapshot_service.register(patterns)
+        return True
+    
+    def run_probes(self):
+        """서비스별 프로브 실행 (주기가 지난 것만, 최대 프로브 timeout까지 대기)"""
+        try:
+            self.prober.check(self.registry.services)
+        except Exception as e:
+            self.logger.warning(f"⚠️ 프로브 실행 실패: {e}")
     
     def _setup_logger(self):
         log_dir = Path(os.path.join(os.path.dirname(os.path.dirname(__file__)), "logs"))
@@ -47,57 +79,34 @@ class EfficientMonitor:
         )
         return logging.getLogger(__name__)
     
-    def load_cache(self):
-        """페이지 ID 캐시 로드"""
-        try:
-            if self.cache_file.exists():
-                with open(self.cache_file, 'r') as f:
-                    self.page_cache = json.load(f)
-                self.logger.info(f"💾 캐시 로드됨: {len(self.page_cache)}개 페이지")
-        except Exception as e:
-            self.logger.warning(f"⚠️ 캐시 로드 실패: {e}")
-            self.page_cache = {}
-    
-    def save_cache(self):
-        """페이지 ID 캐시 저장"""
-        try:
-            self.cache_file.parent.mkdir(exist_ok=True)
-            with open(self.cache_file, 'w') as f:
-                json.dump(self.page_cache, f)
-        except Exception as e:
-            self.logger.error(f"❌ 캐시 저장 실패: {e}")
-    
-    def get_process_status(self, patterns):
-        """특정 프로세스 상태 조회 (빠른 검색)"""
+    def get_process_status(self, patterns, snapshot=None):
+        """특정 프로세스 상태 조회 (공유 스냅샷에서 검색)"""
         total_memory = 0
         total_cpu = 0
+        total_cpu_avg = 0
         process_count = 0
         pids = []
         
-        # patterns가 문자열이면 리스트로 변환
-        if isinstance(patterns, str):
-            patterns = [patterns]
+        if snapshot is None:
+            snapshot = self.snapshot_service.get()
         
-        for proc in psutil.process_iter(['pid', 'cmdline', 'create_time', 'cpu_percent', 'memory_info']):
-            try:
-                cmdline = ' '.join(proc.info['cmdline']) if proc.info['cmdline'] else ""
-                # 패턴 목록 중 하나라도 매치되면 포함
-                if any(pattern in cmdline for pattern in patterns):
-                    total_memory += proc.info['memory_info'].rss
-                    total_cpu = max(total_cpu, proc.info['cpu_percent'])
-                    process_count += 1
-                    pids.append(proc.info['pid'])
-            except (psutil.NoSuchProcess, psutil.AccessDenied):
-                continue
+        # 패턴 목록 중 하나라도 매치되면 포함
+        for proc in snapshot.find(patterns):
+            total_memory += proc['memory_rss']
+            total_cpu = max(total_cpu, proc['cpu_percent'])
+            total_cpu_avg = max(total_cpu_avg, proc['cpu_avg'])
+            process_count += 1
+            pids.append(proc['pid'])
         
         if process_count > 0:
             memory_mb = round(total_memory / 1024 / 1024, 1)
-            memory_percent = round((total_memory / psutil.virtual_memory().total) * 100, 2)
+            memory_percent = round((total_memory / snapshot.total_memory) * 100, 2)
             return {
                 'running': True,
                 'memory_mb': memory_mb,
                 'memory_percent': memory_percent,
                 'cpu_percent': total_cpu,
+                'cpu_avg': total_cpu_avg,
                 'process_count': process_count,
                 'pids': pids
             }
@@ -107,16 +116,18 @@ class EfficientMonitor:
                 'memory_mb': 0,
                 'memory_percent': 0,
                 'cpu_percent': 0,
+                'cpu_avg': 0,
                 'process_count': 0,
                 'pids': []
             }
     
     def get_page_id(self, process_name):
         """캐시된 페이지 ID 가져오기"""
-        if process_name in self.page_cache:
-            return self.page_cache[process_name]
+        page_id = self.page_cache.get(process_name)
+        if page_id:
+            return page_id
         
-        # 캐시에 없으면 노션에서 검색
+        # 캐시에 없거나 만료되었으면 노션에서 검색 (재검증)
         try:
             response = self.notion.databases.query(
                 database_id=self.database_id,
@@ -128,46 +139,112 @@ class EfficientMonitor:
             
             if response["results"]:
                 page_id = response["results"][0]["id"]
-                self.page_cache[process_name] = page_id
-                self.save_cache()
+                self.page_cache.set(process_name, page_id)
                 return page_id
+            # 검색 결과 없음 - 만료된 항목도 제거
+            self.page_cache.invalidate(process_name)
         except Exception as e:
             self.logger.error(f"❌ 페이지 검색 실패 {process_name}: {e}")
         
         return None
     
-    def calculate_health_score(self, status):
-        """건강성 점수 계산"""
+    def has_database_property(self, name):
+        """데이터베이스에 속성이 있는지 (처음 한 번 조회 후 재사용, 실패 시 다음에 재시도)"""
+        if self._database_properties is None:
+            try:
+                database = self.notion.databases.retrieve(database_id=self.database_id)
+                self._database_properties = set(database["properties"])
+            except Exception as e:
+                self.logger.warning(f"⚠️ 데이터베이스 속성 조회 실패: {e}")
+                return False
+        return name in self._database_properties
+    
+    def record_sample(self, process_name, status):
+        """시계열 저장소에 샘플 추가 (실패해도 노션 업데이트는 계속)"""
+        try:
+            self.metrics.append(process_name, status['cpu_percent'], status['memory_percent'])
+        except Exception as e:
+            self.logger.warning(f"⚠️ 시계열 기록 실패 {process_name}: {e}")
+    
+    def calculate_health_score(self, status, health=None):
+        """건강성 점수 계산 (health: 서비스별 기준, 없으면 기본값)"""
         if not status['running']:
             return 0
         
+        health = health or {}
         score = 100
         
-        # CPU 기준
-        if status['cpu_percent'] > 50:
+        # CPU 기준 (최근 5분 평균 - 순간 스파이크로 점수가 흔들리지 않도록)
+        cpu = status.get('cpu_avg', status['cpu_percent'])
+        if cpu > health.get('cpu_critical', 50):
             score -= 20
-        elif status['cpu_percent'] > 20:
+        elif cpu > health.get('cpu_warn', 20):
             score -= 10
         
         # 메모리 기준 (퍼센트)
-        if status['memory_percent'] > 2.0:  # 2% 이상
+        if status['memory_percent'] > health.get('memory_percent_critical', 2.0):
             score -= 15
-        elif status['memory_percent'] > 1.0:  # 1% 이상
+        elif status['memory_percent'] > health.get('memory_percent_warn', 1.0):
             score -= 5
         
+        # 감시기 기록 기준 (ProcessController가 직접 시작한 프로세스만)
+        score -= min(30, status.get('restarts', 0) * 10)  # 최근 1시간 재시작
+        if status.get('last_exit_code') not in (None, 0):
+            score -= 10
+        if status.get('crash_loop'):
+            score = min(score, 20)
+        
         return max(0, score)
     
+    def build_properties(self, process_name, status, current_time, control=None):
+        """프로세스 상태 → 노션 속성 (control이 없으면 실행 상태를 제어 체크박스에 반영)"""
+        service = self.registry.get(process_name)
+        
+        # 건강성 점수 계산
+        health_score = self.calculate_health_score(status, service['health'] if service else None)
+        if status['running']:
+            # 프로브 실패 감점 (하트비트/로그 갱신, 포트 응답, 대기열 길이)
+            health_score = max(0, health_score - self.prober.penalty(process_name))
+        
+        # 프로세스 유형 (서비스 목록에서 빠진 이름은 스크립트로 표시)
+        process_type = self.registry.notion_type(service) if service else "🐍 스크립트"
+        
+        # 업데이트 속성
+        properties = {
+            "유형": {"select": {"name": process_type}},
+            "메모리": {"number": status['memory_percent'] / 100},
+            "CPU": {"number": status['cpu_percent'] / 100},
+            "건강도": {"number": health_score},
+            "상태": {"select": {"name": "🟢 실행중" if status['running'] else "🔴 중단"}},
+            "업데이트": {"date": {"start": current_time}},
+            "경과시간": {"rich_text": [{"text": {"content": "방금 전"}}]},
+            "제어": {"checkbox": status['running'] if control is None else control}
+        }
+        
+        # 파생 값: 최근 1시간 CPU 최댓값 (속성이 추가된 데이터베이스에만)
+        if self.has_database_property(CPU_MAX_PROPERTY):
+            cpu_max = self.metrics.max_value(process_name, "cpu", 3600)
+            properties[CPU_MAX_PROPERTY] = {"number": (cpu_max or 0) / 100}
+        
+        return properties
+    
     def batch_update_notion(self):
         """배치로 노션 업데이트 (효율적) - 페이지 삭제 절대 금지"""
         self.logger.info("🔄 효율적 상태 업데이트 시작...")
+        self.sync_services()
+        self.run_probes()
         
-        update_count = 0
+        updates = []  # (프로세스 이름, 페이지 ID, 속성)
         current_time = datetime.now(timezone.utc).isoformat()
         
+        # 프로세스 테이블은 한 번만 스캔
+        snapshot = self.snapshot_service.get()
+        
         for process_name, patterns in self.registered_processes.items():
             try:
                 # 프로세스 상태 조회
-                status = self.get_process_status(patterns)
+                status = self.get_process_status(patterns, snapshot)
+                self.record_sample(process_name, status)
                 
                 # 페이지 ID 가져오기 (존재하지 않으면 경고만 출력, 절대 삭제하지 않음)
                 page_id = self.get_page_id(process_name)
@@ -175,43 +252,7 @@ class EfficientMonitor:
                     self.logger.warning(f"⚠️ 페이지 없음 (삭제 금지): {process_name}")
                     continue
                 
-                # 건강성 점수 계산
-                health_score = self.calculate_health_score(status)
-                
-                # 프로세스 유형 결정
-                if "BRAIN" in process_name or "Memory" in process_name:
-                    process_type = "🧠 브레인"
-                elif "Monitor" in process_name:
-                    process_type = "📊 모니터"
-                elif "Server" in process_name:
-                    process_type = "🌐 서버"
-                else:
-                    process_type = "🐍 스크립트"
-                
-                # 업데이트 속성
-                properties = {
-                    "유형": {"select": {"name": process_type}},
-                    "메모리": {"number": status['memory_percent'] / 100},
-                    "CPU": {"number": status['cpu_percent'] / 100},
-                    "건강도": {"number": health_score},
-                    "상태": {"select": {"name": "🟢 실행중" if status['running'] else "🔴 중단"}},
-                    "업데이트": {"date": {"start": current_time}},
-                    "경과시간": {"rich_text": [{"text": {"content": "방금 전"}}]},
-                    "제어": {"checkbox": status['running']}
-                }
-                
-                # 노션 업데이트 (rate limit 고려)
-                try:
-                    self.notion.pages.update(page_id=page_id, properties=properties)
-                    update_count += 1
-                    # 대기 시간 최소화 (0.2초)
-                    time.sleep(0.2)
-                except Exception as api_error:
-                    if "rate_limited" in str(api_error).lower():
-                        self.logger.warning(f"⚠️ API 제한 감지, 10초 대기...")
-                        time.sleep(10)
-                    else:
-                        raise api_error
+                updates.append((process_name, page_id, self.build_properties(process_name, status, current_time)))
                 
                 # 로그 출력
                 status_emoji = "🟢" if status['running'] else "🔴"
@@ -220,9 +261,42 @@ class EfficientMonitor:
             except Exception as e:
                 self.logger.error(f"❌ 업데이트 실패 {process_name}: {e}")
         
-        self.logger.info(f"✅ 배치 업데이트 완료: {update_count}/{len(self.registered_processes)}개")
+        update_count, skipped_count = self.write_updates(updates)
+        
+        self.logger.info(f"✅ 배치 업데이트 완료: {update_count}/{len(self.registered_processes)}개 전송, {skipped_count}개 변경 없음")
         return update_count
+    
+    def write_updates(self, updates):
+        """[(프로세스 이름, 페이지 ID, 속성)] 전송 → (전송 수, 변경 없음 수)"""
+        if self.publisher:
+            # 저널 기록만 하고 반환 (스캔 주기가 노션 응답 시간에 묶이지 않도록)
+            return self.publisher.submit(updates)
+        
+        # 노션 업데이트 - 변경된 페이지만 동시 전송 (rate limit은 게이트웨이가 처리)
+        results = self.writer.update_many([(page_id, properties) for _, page_id, properties in updates])
+        update_count = sum(1 for result in results if result is True)
+        skipped_count = sum(1 for result in results if result is False)
+        for (process_name, page_id, _), result in zip(updates, results):
+            if isinstance(result, Exception):
+                self.logger.error(f"❌ 업데이트 실패 {process_name}: {result}")
+                if is_not_found(result):
+                    # 페이지가 삭제/이동됨 → 다음 사이클에서 다시 검색
+                    self.page_cache.invalidate(process_name)
+                    self.writer.forget(page_id)
+        
+        # 캐시 변경 사항은 모아서 저장
+        self.page_cache.flush()
+        return update_count, skipped_count
+    
+    def handle_missing_page(self, process_name, page_id):
+        """게시 중 404 → 캐시에서 제거해 다음 사이클에서 다시 검색"""
+        self.page_cache.invalidate(process_name)
+        self.page_cache.flush()
 
 if __name__ == "__main__":
+    # 데몬이 실행 중이면 1회 실행 생략 (같은 페이지를 동시에 쓰지 않도록)
+    instance_lock = InstanceLock(AUTOMATION_LOCK)
+    if not instance_lock.acquire():
+        sys.exit(0)
     monitor = EfficientMonitor()
     monitor.batch_update_notion()
\ No newline at end of file
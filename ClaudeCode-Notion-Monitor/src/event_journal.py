@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+
+import os
+import json
+import time
+import logging
+import tempfile
+import threading
+from pathlib import Path
+from page_cache import is_not_found
+
+# EVENT_JOURNAL_FILE로 변경 가능 (벤치마크/테스트가 실제 저널을 덮어쓰지 않도록)
+DEFAULT_JOURNAL_FILE = Path(
+    os.environ.get("EVENT_JOURNAL_FILE")
+    or os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "events.jsonl")
+)
+
+
+class EventJournal:
+    """상태 변경 이벤트 저널 (추가 전용 JSONL + 게시 위치 체크포인트)
+
+    - 수집기는 append()로 이벤트를 기록하고 바로 다음 스캔으로 넘어감 (네트워크 대기 없음)
+    - 게시기는 체크포인트(바이트 오프셋) 이후를 read()로 읽고, 전송 후 commit()
+    - 체크포인트는 임시 파일 + rename으로 원자적 저장 → 비정상 종료 후 미게시분부터 재개
+    - 모두 게시된 상태에서 파일이 compact_bytes를 넘으면 비움
+    """
+
+    def __init__(self, path=DEFAULT_JOURNAL_FILE, compact_bytes=1024 * 1024, logger=None):
+        self.path = Path(path)
+        self.checkpoint_path = self.path.with_suffix(".offset")
+        self.compact_bytes = compact_bytes
+        self.logger = logger or logging.getLogger(__name__)
+        self._lock = threading.Lock()
+
+        self.path.parent.mkdir(exist_ok=True)
+        self.path.touch(exist_ok=True)
+        self._repair()
+        self.offset = self._load_checkpoint()
+
+    def _repair(self):
+        """기록 도중 종료되어 잘린 마지막 줄 제거"""
+        with open(self.path, 'rb+') as f:
+            data = f.read()
+            if data and not data.endswith(b"\n"):
+                end = data.rfind(b"\n") + 1
+                f.truncate(end)
+                self.logger.warning(f"⚠️ 저널 끝의 불완전한 이벤트 제거: {len(data) - end}바이트")
+
+    def _load_checkpoint(self):
+        try:
+            offset = int(self.checkpoint_path.read_text().strip() or 0)
+        except FileNotFoundError:
+            return 0
+        except Exception as e:
+            self.logger.warning(f"⚠️ 저널 체크포인트 로드 실패 (처음부터 게시): {e}")
+            return 0
+        # 비우기 직후 체크포인트 저장 전에 종료된 경우
+        return offset if offset <= self.path.stat().st_size else 0
+
+    def _save_checkpoint(self, offset):
+        fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, prefix=".events.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w') as f:
+                f.write(str(offset))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.checkpoint_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def append(self, events):
+        """이벤트 목록을 한 번에 기록 (fsync 후 반환)"""
+        if not events:
+            return
+        data = "".join(json.dumps(event, ensure_ascii=False) + "\n" for event in events).encode("utf-8")
+        with self._lock:
+            with open(self.path, 'ab') as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def read(self, limit=500):
+        """체크포인트 이후 이벤트 최대 limit개 → (이벤트 목록, 다음 오프셋)"""
+        with self._lock:
+            offset = self.offset
+            events = []
+            with open(self.path, 'rb') as f:
+                f.seek(offset)
+                while len(events) < limit:
+                    line = f.readline()
+                    if not line.endswith(b"\n"):
+                        break
+                    offset += len(line)
+                    try:
+                        events.append(json.loads(line))
+                    except ValueError:
+                        self.logger.warning("⚠️ 손상된 저널 이벤트 건너뜀")
+            return events, offset
+
+    def pending(self):
+        """아직 게시되지 않은 바이트 수"""
+        with self._lock:
+            return self.path.stat().st_size - self.offset
+
+    def commit(self, offset):
+        """offset까지 게시 완료로 기록 (모두 게시되었고 파일이 크면 비움)"""
+        with self._lock:
+            if self.path.stat().st_size == offset and offset >= self.compact_bytes:
+                with open(self.path, 'wb'):
+                    pass
+                offset = 0
+            self._save_checkpoint(offset)
+            self.offset = offset
+
+
+class JournalPublisher:
+    """저널 → 노션 게시 스레드
+
+    - 배치 단위로 읽어 페이지별로 합침 (같은 페이지의 여러 이벤트 → 마지막 값 기준 1회 전송)
+    - 전송 속도는 게이트웨이의 rate limit에 맡김
+    - 일시적 실패가 있으면 체크포인트를 옮기지 않고 백오프 후 같은 배치 재시도
+      (이미 성공한 페이지는 DiffNotionWriter가 변경 없음으로 건너뜀)
+    - 404 페이지는 on_not_found(프로세스 이름, 페이지 ID) 호출 후 버림
+    """
+
+    def __init__(self, journal, writer, on_not_found=None, batch_size=500,
+                 idle_interval=5.0, max_backoff=60.0, logger=None):
+        self.journal = journal
+        self.writer = writer
+        self.on_not_found = on_not_found
+        self.batch_size = batch_size
+        self.idle_interval = idle_interval
+        self.max_backoff = max_backoff
+        self.logger = logger or logging.getLogger(__name__)
+
+        self.published_count = 0
+        self.failed_batches = 0
+        self._queued = {}  # 페이지 ID → 저널에 기록했지만 아직 게시되지 않은 속성
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._thread = None
+
+    def submit(self, updates):
+        """수집기 쪽: [(프로세스 이름, 페이지 ID, 속성)] 중 상태가 바뀐 것만 저널에 기록
+
+        반환: (기록 수, 변경 없음 수)
+        """
+        now = time.time()
+        events = []
+        with self._lock:
+            for process_name, page_id, properties in updates:
+                queued = self._queued.get(page_id)
+                if queued is not None:
+                    # 게시 대기 중인 값과 비교 (같은 변경을 매 틱 다시 기록하지 않도록)
+                    if not self.writer.diff(queued, properties):
+                        continue
+                elif not self.writer.needs_update(page_id, properties):
+                    continue
+                self._queued[page_id] = properties
+                events.append({"ts": now, "process": process_name, "page_id": page_id, "properties": properties})
+            self.journal.append(events)
+        if events:
+            self._wake.set()
+        return len(events), len(updates) - len(events)
+
+    def coalesce(self, events):
+        """페이지별로 합침 → [(프로세스 이름, 페이지 ID, 속성)] (처음 나온 순서 유지)"""
+        merged = {}
+        for event in events:
+            page_id = event["page_id"]
+            if page_id in merged:
+                merged[page_id][1].update(event["properties"])
+            else:
+                merged[page_id] = (event["process"], dict(event["properties"]))
+        return [(process_name, page_id, properties) for page_id, (process_name, properties) in merged.items()]
+
+    def publish_once(self):
+        """배치 1개 게시 → 읽은 이벤트 수 (일시적 실패 시 예외, 체크포인트 유지)"""
+        events, next_offset = self.journal.read(self.batch_size)
+        if not events:
+            return 0
+
+        updates = self.coalesce(events)
+        results = self.writer.update_many([(page_id, properties) for _, page_id, properties in updates])
+
+        failures = []
+        for (process_name, page_id, properties), result in zip(updates, results):
+            if result is True:
+                self.published_count += 1
+            elif isinstance(result, Exception):
+                if is_not_found(result):
+                    self.logger.error(f"❌ 게시 실패 (페이지 없음) {process_name}: {result}")
+                    self.writer.forget(page_id)
+                    with self._lock:
+                        self._queued.pop(page_id, None)
+                    if self.on_not_found:
+                        self.on_not_found(process_name, page_id)
+                else:
+                    failures.append((process_name, result))
+
+        if failures:
+            process_name, error = failures[0]
+            raise RuntimeError(f"{len(failures)}개 페이지 게시 실패 (예: {process_name}: {error})")
+
+        with self._lock:
+            self.journal.commit(next_offset)
+            for _, page_id, properties in updates:
+                # 게시한 값 이후 새로 기록된 변경이 없으면 대기 목록에서 제거
+                queued = self._queued.get(page_id)
+                if queued is not None and not self.writer.diff(properties, queued):
+                    del self._queued[page_id]
+        return len(events)
+
+    def _run(self):
+        backoff = 1.0
+        while not self._stopping.is_set():
+            try:
+                if self.publish_once():
+                    backoff = 1.0
+                    continue  # 남은 이벤트가 있으면 바로 다음 배치
+            except Exception as e:
+                self.failed_batches += 1
+                self.logger.warning(f"⚠️ 노션 게시 실패, {backoff:.0f}초 후 재시도: {e}")
+                self._stopping.wait(backoff)
+                backoff = min(backoff * 2, self.max_backoff)
+                continue
+            self._wake.wait(self.idle_interval)
+            self._wake.clear()
+
+    def start(self):
+        """백그라운드 게시 시작 (이전 실행에서 남은 이벤트부터 게시)"""
+        if self._thread is None:
+            pending = self.journal.pending()
+            if pending:
+                self.logger.info(f"📒 미게시 저널 {pending}바이트부터 재개")
+            self._thread = threading.Thread(target=self._run, name="journal-publisher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=10.0):
+        """남은 이벤트 게시를 잠시 기다린 뒤 중지 (못 보낸 이벤트는 다음 실행에서 게시)"""
+        if self._thread is None:
+            return
+        deadline = time.monotonic() + timeout
+        while self.journal.pending() and time.monotonic() < deadline:
+            self._wake.set()
+            time.sleep(0.1)
+        self._stopping.set()
+        self._wake.set()
+        self._thread.join(max(0.0, deadline - time.monotonic()))
+        self._thread = None
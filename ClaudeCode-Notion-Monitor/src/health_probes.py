@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+
+import json
+import time
+import socket
+import logging
+import threading
+import urllib.request
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, wait
+
+
+def probe_file_age(spec, label):
+    """파일 수정 시각이 max_age초 이내인지 (하트비트 파일 / 로그 파일 공용)"""
+    path = Path(spec["path"]).expanduser()
+    try:
+        age = time.time() - path.stat().st_mtime
+    except FileNotFoundError:
+        return False, f"{label} 없음: {path}"
+    if age > spec["max_age"]:
+        return False, f"{label} {age / 60:.0f}분 동안 갱신 없음: {path.name}"
+    return True, f"{label} {age:.0f}초 전 갱신"
+
+
+def probe_heartbeat(spec):
+    return probe_file_age(spec, "하트비트")
+
+
+def probe_log(spec):
+    return probe_file_age(spec, "로그")
+
+
+def probe_tcp(spec):
+    """host:port 연결 가능 여부"""
+    host, port = spec.get("host", "127.0.0.1"), spec["port"]
+    try:
+        with socket.create_connection((host, port), timeout=spec["timeout"]):
+            return True, f"{host}:{port} 응답"
+    except OSError as e:
+        return False, f"{host}:{port} 연결 실패: {e}"
+
+
+def probe_queue(spec):
+    """메트릭 엔드포인트(JSON)의 대기열 길이가 max_depth 이하인지
+
+    엔드포인트에 연결할 수 없으면 판단 보류 (None) - 메트릭을 끈 실행과 구분하지 않음
+    """
+    try:
+        with urllib.request.urlopen(spec["url"], timeout=spec["timeout"]) as response:
+            metrics = json.load(response)
+    except (OSError, ValueError) as e:
+        return None, f"메트릭 조회 불가: {e}"
+    depth = metrics.get(spec.get("field", "queue_depth"))
+    if depth is None:
+        return None, f"메트릭에 {spec.get('field', 'queue_depth')} 없음"
+    if depth > spec["max_depth"]:
+        return False, f"대기열 {depth}개 (기준 {spec['max_depth']}개 초과)"
+    return True, f"대기열 {depth}개"
+
+
+# 프로브 유형 → 함수 (spec 하나를 받아 (ok, 설명) 반환, ok=None은 판단 보류)
+PROBES = {
+    "heartbeat": probe_heartbeat,
+    "log": probe_log,
+    "tcp": probe_tcp,
+    "queue": probe_queue,
+}
+
+DEFAULT_TIMEOUT = 2.0
+DEFAULT_PENALTY = 20
+
+
+class HealthProber:
+    """서비스별 프로브를 동시에 실행하고 결과를 틱 사이에 캐시
+
+    - 결과가 interval초보다 오래된 프로브만 다시 실행 (기본 30초)
+    - 스레드 풀에서 동시 실행, 틱은 가장 긴 프로브 timeout까지만 기다림
+    - 제한 시간 안에 끝나지 않은 프로브는 실패로 기록하고, 끝날 때까지 다시 제출하지 않음
+      (멈춘 프로브가 스레드를 계속 늘리거나 사이클을 막지 않도록)
+    """
+
+    def __init__(self, interval=30.0, max_workers=8, logger=None):
+        self.interval = interval
+        self.logger = logger or logging.getLogger(__name__)
+        self.results = {}       # (서비스 이름, 인덱스) → {'ok', 'detail', 'penalty', 'checked_at'}
+        self._in_flight = {}    # (서비스 이름, 인덱스) → Future
+        self._lock = threading.RLock()  # 타임아웃 프로브의 완료 콜백이 잠금 안에서 바로 실행될 수 있음
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="probe")
+
+    def _run_probe(self, spec):
+        return PROBES[spec["type"]](spec)
+
+    def _record(self, key, spec, ok, detail):
+        previous = self.results.get(key)
+        self.results[key] = {
+            'ok': ok,
+            'detail': detail,
+            'penalty': spec.get("penalty", DEFAULT_PENALTY) if ok is False else 0,
+            'checked_at': time.monotonic(),
+        }
+        # 상태가 바뀔 때만 로그
+        if ok is False and (previous is None or previous['ok'] is not False):
+            self.logger.warning(f"🩺 {key[0]} {spec['type']} 프로브 실패: {detail}")
+        elif ok and previous is not None and previous['ok'] is False:
+            self.logger.info(f"🩺 {key[0]} {spec['type']} 프로브 회복: {detail}")
+
+    def check(self, services):
+        """서비스 목록(registry 전체 항목)의 프로브 실행 → 이번에 실행한 프로브 수
+
+        services: [{'name', 'probes': [{'type', ...}]}] - 목록에서 빠진 프로브의 결과는 제거
+        """
+        now = time.monotonic()
+        submitted = {}
+        with self._lock:
+            current = {(service['name'], index) for service in services for index in range(len(service.get('probes', [])))}
+            for key in [k for k in self.results if k not in current]:
+                del self.results[key]
+            for service in services:
+                for index, raw in enumerate(service.get('probes', [])):
+                    key = (service['name'], index)
+                    if raw.get("type") not in PROBES:
+                        continue
+                    if key in self._in_flight:
+                        continue
+                    result = self.results.get(key)
+                    if result and now - result['checked_at'] < raw.get("interval", self.interval):
+                        continue
+                    spec = dict(raw, timeout=raw.get("timeout", DEFAULT_TIMEOUT))
+                    future = self._executor.submit(self._run_probe, spec)
+                    self._in_flight[key] = future
+                    submitted[future] = (key, spec)
+
+        if not submitted:
+            return 0
+
+        deadline = max(spec["timeout"] for _, spec in submitted.values())
+        done, not_done = wait(submitted, timeout=deadline)
+
+        with self._lock:
+            for future in done:
+                key, spec = submitted[future]
+                del self._in_flight[key]
+                try:
+                    ok, detail = future.result()
+                except Exception as e:
+                    ok, detail = False, f"프로브 오류: {e}"
+                self._record(key, spec, ok, detail)
+            for future in not_done:
+                key, spec = submitted[future]
+                self._record(key, spec, False, f"{spec['timeout']:g}초 안에 응답 없음")
+                # 실제로 끝나면 다음 check에서 다시 제출할 수 있도록 해제
+                future.add_done_callback(lambda _, key=key: self._release(key))
+        return len(submitted)
+
+    def _release(self, key):
+        with self._lock:
+            self._in_flight.pop(key, None)
+
+    def penalty(self, name):
+        """서비스의 최근 프로브 실패 감점 합계 (캐시된 결과 기준)"""
+        with self._lock:
+            return sum(result['penalty'] for key, result in self.results.items() if key[0] == name)
+
+    def failures(self, name):
+        """실패한 프로브 설명 목록"""
+        with self._lock:
+            return [result['detail'] for key, result in self.results.items() if key[0] == name and result['ok'] is False]
+
+
+_shared_prober = None
+_shared_lock = threading.Lock()
+
+
+def get_health_prober():
+    """프로세스 내 공용 프로버 (여러 모니터가 같은 캐시 사용)"""
+    global _shared_prober
+    with _shared_lock:
+        if _shared_prober is None:
+            _shared_prober = HealthProber()
+        return _shared_prober
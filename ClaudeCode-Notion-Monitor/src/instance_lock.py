@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+
+import os
+import json
+import time
+import fcntl
+import socket
+import logging
+from pathlib import Path
+
+import psutil
+
+DEFAULT_LOCK_DIR = Path(os.path.join(os.path.dirname(os.path.dirname(__file__)), "data"))
+
+# 같은 노션 데이터베이스를 쓰는 데몬/스크립트가 공유하는 잠금 이름
+AUTOMATION_LOCK = "automation_monitor"
+SESSION_LOCK = "session_monitor"
+
+
+class InstanceLock:
+    """flock 기반 단일 인스턴스 잠금 (data/<name>.lock)
+
+    - 잠금은 커널이 프로세스 종료 시 자동 해제 → 비정상 종료 후 남은 파일은 문제되지 않음
+    - 리더는 매 틱 heartbeat()로 파일 mtime 갱신
+      stale_after초 동안 갱신이 없으면 멈춘 리더로 보고 종료시킨 뒤 인계 (SIGTERM → SIGKILL)
+    - standby=True면 바로 종료하지 않고 대기하다가 리더가 사라지면 즉시 인계 (콜드 스탠바이)
+      대기 중에는 모듈 import까지만 마친 상태 - 저널/페이지 캐시 파일을 리더와 함께 열지 않도록
+      모니터 객체(게이트웨이, 서비스 목록, 캐시, DB)는 잠금을 얻은 뒤 생성
+    """
+
+    def __init__(self, name, lock_dir=DEFAULT_LOCK_DIR, stale_after=600, logger=None):
+        self.name = name
+        self.path = Path(lock_dir) / f"{name}.lock"
+        self.stale_after = stale_after
+        self.logger = logger or logging.getLogger(__name__)
+        self._fd = None
+
+    @property
+    def held(self):
+        return self._fd is not None
+
+    def _try_lock(self):
+        self.path.parent.mkdir(exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        self._fd = fd
+        # 소유자 기록 (대기 중인 인스턴스와 사람이 확인용)
+        owner = json.dumps({"pid": os.getpid(), "host": socket.gethostname(), "started": time.time()})
+        os.ftruncate(fd, 0)
+        os.pwrite(fd, owner.encode(), 0)
+        os.fsync(fd)
+        return True
+
+    def owner(self):
+        """현재 소유자 {'pid', 'host', 'started'} (읽을 수 없으면 {})"""
+        try:
+            return json.loads(self.path.read_text() or "{}")
+        except (OSError, ValueError):
+            return {}
+
+    def _take_over_if_stale(self):
+        """하트비트가 stale_after초 이상 멈춘 소유자 종료 → 종료시켰으면 True"""
+        try:
+            age = time.time() - self.path.stat().st_mtime
+        except OSError:
+            return False
+        if age < self.stale_after:
+            return False
+
+        pid = self.owner().get("pid")
+        if not pid or pid == os.getpid():
+            return False
+        try:
+            proc = psutil.Process(pid)
+            self.logger.warning(f"⚠️ {self.name} 잠금 소유자가 {age:.0f}초 동안 응답 없음 → 종료 후 인계 (PID: {pid})")
+            proc.terminate()
+            try:
+                proc.wait(timeout=10)
+            except psutil.TimeoutExpired:
+                proc.kill()
+                proc.wait(timeout=5)
+        except psutil.NoSuchProcess:
+            return False
+        except (psutil.AccessDenied, psutil.TimeoutExpired) as e:
+            self.logger.error(f"❌ 잠금 소유자 종료 실패 (PID: {pid}): {e}")
+            return False
+        return True
+
+    def acquire(self, standby=False, poll_interval=2.0):
+        """잠금 획득 → 획득했으면 True
+
+        standby=False: 다른 인스턴스가 실행 중이면 바로 False
+        standby=True: 획득할 때까지 poll_interval초마다 재시도 (콜드 스탠바이)
+        """
+        if self._try_lock() or (self._take_over_if_stale() and self._try_lock()):
+            self.logger.info(f"🔒 {self.name} 잠금 획득 (PID: {os.getpid()})")
+            return True
+
+        owner_pid = self.owner().get("pid", "?")
+        if not standby:
+            self.logger.warning(f"⛔ {self.name} 이미 실행 중 (PID: {owner_pid}) - 종료")
+            return False
+
+        self.logger.warning(f"⏸️ {self.name} 대기 모드: PID {owner_pid} 종료 시 인계")
+        while True:
+            time.sleep(poll_interval)
+            if self._try_lock() or (self._take_over_if_stale() and self._try_lock()):
+                self.logger.warning(f"🔒 {self.name} 인계 완료 (PID: {os.getpid()})")
+                return True
+
+    def heartbeat(self):
+        """리더 생존 표시 (틱마다 호출)"""
+        if self._fd is not None:
+            os.utime(self.path)
+
+    def release(self):
+        if self._fd is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+            self._fd = None
@@ -6,6 +6,7 @@ import sys
 from pathlib import Path
 from claude_monitor import ClaudeActivityMonitor, setup_file_monitoring
 from notion_client import NotionMonitor
+from instance_lock import InstanceLock, SESSION_LOCK
 import time
 import logging
 
@@ -16,6 +17,7 @@ class ClaudeNotionMonitor:
         self.file_observer = None
         self.running = False
         self.notion_page_id = None
+        self.instance_lock = None  # 설정 시 매 틱 하트비트
         self.logger = self._setup_logger()
         
     def _setup_logger(self):
@@ -72,6 +74,9 @@ class ClaudeNotionMonitor:
                     self.logger.info(f"📈 세션 업데이트 - 명령어: {current_session.get('commands_count')}, "
                                    f"지속시간: {current_session.get('duration', 0):.1f}초")
                 
+                if self.instance_lock:
+                    self.instance_lock.heartbeat()
+                
                 await asyncio.sleep(update_interval)
                 
             except Exception as e:
@@ -114,9 +119,10 @@ def signal_handler(signum, frame, monitor):
     monitor.stop_monitoring()
     sys.exit(0)
 
-async def main():
+async def main(instance_lock=None):
     """메인 함수"""
     monitor = ClaudeNotionMonitor()
+    monitor.instance_lock = instance_lock
     
     # 시그널 핸들러 등록
     signal.signal(signal.SIGINT, lambda s, f: signal_handler(s, f, monitor))
@@ -133,4 +139,8 @@ async def main():
         print("👋 Claude Code Notion Monitor 종료")
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    # 세션 페이지를 중복 생성하지 않도록 1개만 실행 (--standby: 대기하다가 인계)
+    instance_lock = InstanceLock(SESSION_LOCK)
+    if not instance_lock.acquire(standby="--standby" in sys.argv):
+        sys.exit(0)
+    asyncio.run(main(instance_lock))
\ No newline at end of file
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+
+import os
+import time
+import sqlite3
+import logging
+import threading
+from pathlib import Path
+
+# METRICS_DB_FILE로 변경 가능 (벤치마크/테스트가 실제 기록을 덮어쓰지 않도록)
+DEFAULT_METRICS_FILE = Path(
+    os.environ.get("METRICS_DB_FILE")
+    or os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "metrics.db")
+)
+
+# (테이블, 버킷 크기(초), 보관 기간(초)) - 원본 1시간, 1분 단위 1일, 15분 단위 30일
+TIERS = (
+    ("samples_raw", 1, 3600),
+    ("samples_1m", 60, 86400),
+    ("samples_15m", 900, 30 * 86400),
+)
+
+METRICS = ("cpu", "memory")
+
+# 노션에 표시하는 파생 값 속성 (add_cpu_history_property.py로 추가)
+CPU_MAX_PROPERTY = "CPU 1시간 최대"
+
+
+class MetricsStore:
+    """프로세스별 CPU/메모리 시계열 저장소 (SQLite)
+
+    - 샘플 추가 시 1분/15분 롤업을 함께 갱신 (별도 다운샘플링 작업 없음)
+    - 보관 기간이 지난 행은 compact_interval마다 삭제
+    - (series, bucket) 기본 키의 WITHOUT ROWID 테이블이라 범위 조회가 인덱스 스캔 한 번
+    """
+
+    def __init__(self, path=DEFAULT_METRICS_FILE, compact_interval=60, logger=None):
+        self.path = Path(path)
+        self.compact_interval = compact_interval
+        self.logger = logger or logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._last_compact = 0.0
+
+        self.path.parent.mkdir(exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        for table, _, _ in TIERS:
+            self.conn.execute(f'''
+                CREATE TABLE IF NOT EXISTS {table} (
+                    series TEXT NOT NULL,
+                    bucket INTEGER NOT NULL,
+                    count INTEGER NOT NULL,
+                    cpu_sum REAL NOT NULL,
+                    cpu_max REAL NOT NULL,
+                    memory_sum REAL NOT NULL,
+                    memory_max REAL NOT NULL,
+                    PRIMARY KEY (series, bucket)
+                ) WITHOUT ROWID
+            ''')
+        self.conn.commit()
+
+    def append_many(self, samples, ts=None):
+        """[(series, cpu%, memory%)] 한 트랜잭션으로 기록 (모든 계층 동시 갱신)"""
+        ts = int(ts if ts is not None else time.time())
+        with self._lock:
+            with self.conn:
+                for table, size, _ in TIERS:
+                    bucket = ts - ts % size
+                    self.conn.executemany(f'''
+                        INSERT INTO {table} (series, bucket, count, cpu_sum, cpu_max, memory_sum, memory_max)
+                        VALUES (?, ?, 1, ?, ?, ?, ?)
+                        ON CONFLICT (series, bucket) DO UPDATE SET
+                            count = count + 1,
+                            cpu_sum = cpu_sum + excluded.cpu_sum,
+                            cpu_max = MAX(cpu_max, excluded.cpu_max),
+                            memory_sum = memory_sum + excluded.memory_sum,
+                            memory_max = MAX(memory_max, excluded.memory_max)
+                    ''', [(series, bucket, cpu, cpu, memory, memory) for series, cpu, memory in samples])
+            if time.monotonic() - self._last_compact >= self.compact_interval:
+                self._compact(ts)
+
+    def append(self, series, cpu, memory, ts=None):
+        self.append_many([(series, cpu, memory)], ts)
+
+    def _compact(self, now):
+        """보관 기간이 지난 행 삭제 (잠금 안에서 호출)"""
+        with self.conn:
+            for table, _, retention in TIERS:
+                self.conn.execute(f"DELETE FROM {table} WHERE bucket < ?", (now - retention,))
+        self._last_compact = time.monotonic()
+
+    def _tier_for(self, start, now):
+        """조회 시작 시각을 보관 중인 가장 세밀한 계층"""
+        for table, size, retention in TIERS:
+            if start >= now - retention:
+                return table, size
+        return TIERS[-1][0], TIERS[-1][1]
+
+    def query(self, series, start, end=None, now=None):
+        """[start, end] 구간 시계열 → [{ts, cpu_avg, cpu_max, memory_avg, memory_max}]"""
+        now = now if now is not None else time.time()
+        end = end if end is not None else now
+        table, size = self._tier_for(start, now)
+        with self._lock:
+            rows = self.conn.execute(f'''
+                SELECT bucket, cpu_sum / count, cpu_max, memory_sum / count, memory_max
+                FROM {table} WHERE series = ? AND bucket >= ? AND bucket <= ?
+                ORDER BY bucket
+            ''', (series, int(start) - int(start) % size, int(end))).fetchall()
+        return [
+            {'ts': bucket, 'cpu_avg': cpu_avg, 'cpu_max': cpu_max, 'memory_avg': mem_avg, 'memory_max': mem_max}
+            for bucket, cpu_avg, cpu_max, mem_avg, mem_max in rows
+        ]
+
+    def max_value(self, series, metric="cpu", window=3600, now=None):
+        """최근 window초 최댓값 (기록 없으면 None) - 노션 파생 값용"""
+        if metric not in METRICS:
+            raise ValueError(f"알 수 없는 지표: {metric}")
+        now = now if now is not None else time.time()
+        start = now - window
+        table, size = self._tier_for(start, now)
+        with self._lock:
+            row = self.conn.execute(
+                f"SELECT MAX({metric}_max) FROM {table} WHERE series = ? AND bucket >= ?",
+                (series, int(start) - int(start) % size)
+            ).fetchone()
+        return row[0]
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+
+_shared_stores = {}
+_shared_lock = threading.Lock()
+
+
+def get_metrics_store(path=DEFAULT_METRICS_FILE):
+    """프로세스 내 공용 시계열 저장소 (파일 경로별 1개)"""
+    path = Path(path)
+    with _shared_lock:
+        if path not in _shared_stores:
+            _shared_stores[path] = MetricsStore(path)
+        return _shared_stores[path]
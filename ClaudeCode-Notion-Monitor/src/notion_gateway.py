@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+
+import os
+import asyncio
+import logging
+import threading
+import httpx
+from notion_client import AsyncClient
+from notion_client.errors import APIResponseError, APIErrorCode, RequestTimeoutError
+
+
+class AsyncTokenBucket:
+    """초당 rate개 요청을 허용하는 토큰 버킷 (노션 평균 3 req/s 제한)"""
+
+    def __init__(self, rate=3.0, capacity=3):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = None
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            loop = asyncio.get_running_loop()
+            while True:
+                now = loop.time()
+                if self.updated_at is not None:
+                    self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def pause(self, seconds):
+        """429 응답 시 버킷을 비워 모든 요청이 Retry-After 동안 대기하도록 함 (루프 스레드에서 호출)
+
+        충전 기준 시각도 지금으로 옮김 - 직전 acquire 이후 흐른 시간이 대기 시간에서 빠지지 않도록
+        """
+        self.tokens = -seconds * self.rate
+        self.updated_at = asyncio.get_running_loop().time()
+
+
+class _Endpoint:
+    """gateway.pages.update(...) 형태의 동기 호출 + submit()으로 동시 호출"""
+
+    def __init__(self, gateway, namespace, method):
+        self.gateway = gateway
+        self.namespace = namespace
+        self.method = method
+
+    def __call__(self, **kwargs):
+        return self.submit(**kwargs).result()
+
+    def submit(self, **kwargs):
+        """백그라운드 루프에 요청 예약 → concurrent.futures.Future"""
+        return self.gateway.submit(self.namespace, self.method, **kwargs)
+
+
+class _Namespace:
+    def __init__(self, gateway, namespace, methods):
+        for method in methods:
+            setattr(self, method, _Endpoint(gateway, namespace, method))
+
+
+class NotionGateway:
+    """모든 모니터가 공유하는 노션 API 게이트웨이
+
+    - AsyncClient + 커넥션 풀(httpx)을 전용 이벤트 루프 스레드에서 실행
+    - 토큰 버킷으로 초당 요청 수 제한, 세마포어로 동시 요청 수 제한
+    - 429 응답은 Retry-After 헤더만큼 전체 대기 후 재시도
+    - 기존 동기 코드는 notion_client.Client와 같은 형태로 호출 가능
+    """
+
+    def __init__(self, auth, base_url=None, rate=3.0, max_concurrency=3, max_retries=5, logger=None):
+        self.logger = logger or logging.getLogger(__name__)
+        self.max_retries = max_retries
+        self.request_count = 0
+        self.retry_count = 0
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="notion-gateway", daemon=True)
+        self._thread.start()
+
+        async def _setup():
+            http_client = httpx.AsyncClient(
+                limits=httpx.Limits(max_connections=max_concurrency, max_keepalive_connections=max_concurrency)
+            )
+            options = {"auth": auth}
+            if base_url:
+                options["base_url"] = base_url
+            self._client = AsyncClient(client=http_client, **options)
+            self._bucket = AsyncTokenBucket(rate=rate, capacity=max(1, int(rate)))
+            self._semaphore = asyncio.Semaphore(max_concurrency)
+
+        asyncio.run_coroutine_threadsafe(_setup(), self._loop).result()
+
+        self.databases = _Namespace(self, "databases", ("query", "retrieve", "update", "create"))
+        self.pages = _Namespace(self, "pages", ("create", "retrieve", "update"))
+        self.users = _Namespace(self, "users", ("me",))
+
+    async def _request(self, namespace, method, kwargs):
+        """제한을 지키며 요청, 429/타임아웃은 재시도"""
+        func = getattr(getattr(self._client, namespace), method)
+        for attempt in range(self.max_retries + 1):
+            await self._bucket.acquire()
+            try:
+                async with self._semaphore:
+                    self.request_count += 1
+                    return await func(**kwargs)
+            except APIResponseError as e:
+                if e.code != APIErrorCode.RateLimited or attempt == self.max_retries:
+                    raise
+                retry_after = float(e.headers.get("Retry-After", 2 ** attempt))
+                self.logger.warning(f"⚠️ API 제한 (429), {retry_after:.1f}초 대기 후 재시도")
+                self._bucket.pause(retry_after)
+            except RequestTimeoutError:
+                if attempt == self.max_retries:
+                    raise
+                await asyncio.sleep(2 ** attempt)
+            self.retry_count += 1
+
+    def submit(self, namespace, method, **kwargs):
+        """요청 예약 (즉시 반환) → concurrent.futures.Future"""
+        return asyncio.run_coroutine_threadsafe(self._request(namespace, method, kwargs), self._loop)
+
+    def close(self):
+        """HTTP 커넥션 정리 및 루프 종료"""
+        asyncio.run_coroutine_threadsafe(self._client.aclose(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+
+
+_shared_gateway = None
+_shared_lock = threading.Lock()
+
+
+def get_gateway():
+    """프로세스 내 공용 게이트웨이 (NOTION_TOKEN, NOTION_BASE_URL 사용)
+
+    NOTION_BASE_URL을 지정하면 로컬 가짜 노션 서버(fake_notion_server.py)로 연결
+    """
+    global _shared_gateway
+    with _shared_lock:
+        if _shared_gateway is None:
+            _shared_gateway = NotionGateway(
+                auth=os.environ["NOTION_TOKEN"],
+                base_url=os.environ.get("NOTION_BASE_URL") or None
+            )
+        return _shared_gateway
@@ -1,13 +1,14 @@
 import os
 from datetime import datetime
-from notion_client import Client
+from notion_gateway import get_gateway
+from notion_pagination import iter_database_rows
 from dotenv import load_dotenv
 import logging
 
 class NotionMonitor:
     def __init__(self):
         load_dotenv("../config/.env")
-        self.notion = Client(auth=os.environ["NOTION_TOKEN"])
+        self.notion = get_gateway()
         self.database_id = os.environ["NOTION_DATABASE_ID"]
         self.logger = self._setup_logger()
     
@@ -90,17 +91,21 @@ class NotionMonitor:
             self.logger.error(f"Failed to update session: {e}")
             return None
     
+    def iter_active_sessions(self):
+        """활성 세션을 한 행씩 조회 (100개 초과 시 페이지네이션)"""
+        return iter_database_rows(
+            self.notion,
+            self.database_id,
+            filter={
+                "property": "Status",
+                "select": {"equals": "Active"}
+            }
+        )
+    
     def get_active_sessions(self):
         """활성 세션 목록 조회"""
         try:
-            response = self.notion.databases.query(
-                database_id=self.database_id,
-                filter={
-                    "property": "Status",
-                    "select": {"equals": "Active"}
-                }
-            )
-            return response["results"]
+            return list(self.iter_active_sessions())
             
         except Exception as e:
             self.logger.error(f"Failed to get active sessions: {e}")
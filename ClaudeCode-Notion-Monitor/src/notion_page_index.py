@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+
+import logging
+from datetime import datetime
+from notion_pagination import iter_database_rows, page_title
+
+
+class NotionPageIndex:
+    """데이터베이스 전체를 한 번 조회해 제목 → (페이지 ID, 마지막 업데이트) 인덱스 구성
+
+    사이클마다 refresh() 1회 (페이지네이션 포함)로 프로세스별 검색/조회 호출을 대체
+    cache를 넘기면 조회 결과를 영구 페이지 캐시에도 반영 (조회 실패 시 캐시로 대체)
+    """
+
+    def __init__(self, notion, database_id, title_property="이름", date_property="업데이트", cache=None, logger=None):
+        self.notion = notion
+        self.cache = cache
+        self.database_id = database_id
+        self.title_property = title_property
+        self.date_property = date_property
+        self.logger = logger or logging.getLogger(__name__)
+        self.pages = {}  # 제목 → {'id': 페이지 ID, 'updated_at': datetime 또는 None}
+        self.complete = False  # 마지막 refresh() 성공 여부
+
+    def _parse_page(self, page):
+        """페이지에서 (제목, 항목) 추출"""
+        properties = page.get("properties", {})
+        title = page_title(page, self.title_property)
+
+        updated_at = None
+        date_value = (properties.get(self.date_property) or {}).get("date") or {}
+        if date_value.get("start"):
+            updated_at = datetime.fromisoformat(date_value["start"].replace('Z', '+00:00'))
+
+        return title, {'id': page["id"], 'updated_at': updated_at}
+
+    def refresh(self):
+        """start_cursor를 따라 전체 페이지 조회 → 인덱스 재구성 (조회 실패 시 기존 인덱스 유지)"""
+        pages = {}
+        rows = iter_database_rows(
+            self.notion, self.database_id,
+            filter_properties=[self.title_property, self.date_property]
+        )
+        try:
+            for page in rows:
+                title, entry = self._parse_page(page)
+                # 중복 제목은 첫 번째 페이지 사용 (기존 find_existing_page와 동일)
+                if title and title not in pages:
+                    pages[title] = entry
+        except Exception as e:
+            self.logger.error(f"❌ 페이지 인덱스 조회 실패: {e}")
+            self.complete = False
+            return False
+
+        self.pages = pages
+        self.complete = True
+        if self.cache is not None:
+            self.cache.update({title: entry['id'] for title, entry in pages.items()})
+            self.cache.flush()
+        return True
+
+    def get(self, title):
+        """제목으로 항목 조회 (인덱스가 불완전하면 영구 캐시로 대체)"""
+        entry = self.pages.get(title)
+        if entry is None and not self.complete and self.cache is not None:
+            page_id = self.cache.get(title)
+            if page_id:
+                entry = {'id': page_id, 'updated_at': None}
+        return entry
+
+    def page_id(self, title):
+        entry = self.get(title)
+        return entry['id'] if entry else None
+
+    def record(self, title, page_id, updated_at):
+        """쓰기 성공 후 인덱스 갱신 (다음 사이클까지 재조회 불필요)"""
+        self.pages[title] = {'id': page_id, 'updated_at': updated_at}
+        if self.cache is not None:
+            self.cache.set(title, page_id)
+
+    def discard(self, title):
+        """404를 받은 항목 제거 (인덱스 + 영구 캐시)"""
+        self.pages.pop(title, None)
+        if self.cache is not None:
+            self.cache.invalidate(title)
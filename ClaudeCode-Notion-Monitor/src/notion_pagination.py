@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+
+import time
+import threading
+
+SCHEMA_RECHECK_INTERVAL = 300  # 없는 속성 이름이 있을 때 스키마를 다시 읽는 최소 간격 (초)
+
+_property_ids = {}  # database_id → (조회 시각, {속성 이름: 속성 ID})
+_property_ids_lock = threading.Lock()
+
+
+def property_ids(notion, database_id, names):
+    """속성 이름 → 속성 ID 목록 (filter_properties는 ID만 받음)
+
+    - 데이터베이스별로 databases.retrieve 1회 후 캐시
+    - 캐시에 없는 이름이 있으면 스키마를 다시 읽음 (속성 추가 직후, SCHEMA_RECHECK_INTERVAL초에 최대 1회)
+    - 그래도 없거나 조회 실패 시 None → 호출자는 필터 없이 전체 속성 조회
+    """
+    with _property_ids_lock:
+        fetched_at, schema = _property_ids.get(database_id, (None, {}))
+        missing = any(name not in schema for name in names)
+        if fetched_at is None or (missing and time.monotonic() - fetched_at >= SCHEMA_RECHECK_INTERVAL):
+            try:
+                database = notion.databases.retrieve(database_id=database_id)
+            except Exception:
+                return None
+            schema = {name: prop["id"] for name, prop in database.get("properties", {}).items()}
+            _property_ids[database_id] = (time.monotonic(), schema)
+        if all(name in schema for name in names):
+            return [schema[name] for name in names]
+        return None
+
+
+def iter_database_rows(notion, database_id, filter=None, sorts=None, filter_properties=None, page_size=100):
+    """databases.query 결과를 next_cursor를 따라 끝까지 한 행씩 반환 (제너레이터)
+
+    - 응답 전체를 모으지 않고 페이지(최대 100행) 단위로 받아 바로 넘김
+    - filter_properties: 응답에 포함할 속성 이름 목록 (필요한 속성만 받아 응답 크기 축소)
+      이름은 property_ids()로 ID로 바꿔 전달, 노션이 거부하면(validation_error) 필터 없이 다시 조회
+    """
+    query = {"database_id": database_id, "page_size": page_size}
+    if filter:
+        query["filter"] = filter
+    if sorts:
+        query["sorts"] = sorts
+    if filter_properties:
+        ids = property_ids(notion, database_id, list(filter_properties))
+        if ids:
+            query["filter_properties"] = ids
+
+    while True:
+        try:
+            response = notion.databases.query(**query)
+        except Exception as e:
+            if "filter_properties" not in query or getattr(e, "code", None) != "validation_error":
+                raise
+            # 스키마가 바뀌어 ID가 맞지 않는 경우 - 다음 조회에서 다시 읽도록 캐시 제거
+            with _property_ids_lock:
+                _property_ids.pop(database_id, None)
+            del query["filter_properties"]
+            continue
+        yield from response["results"]
+
+        if not response.get("has_more") or not response.get("next_cursor"):
+            return
+        query["start_cursor"] = response["next_cursor"]
+
+
+def page_title(page, title_property="이름"):
+    """페이지 제목 (plain_text 우선, 없으면 빈 문자열)"""
+    parts = page["properties"].get(title_property, {}).get("title", [])
+    return "".join(part.get("plain_text") or part.get("text", {}).get("content", "") for part in parts)
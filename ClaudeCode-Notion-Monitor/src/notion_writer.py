@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+
+import time
+import logging
+
+
+class DiffNotionWriter:
+    """마지막으로 보낸 속성값을 기억하고 의미 있게 바뀐 페이지만 pages.update"""
+
+    # 숫자 속성별 변경 임계값 (노션 저장 단위 기준: CPU/메모리는 0~1 비율)
+    DEFAULT_THRESHOLDS = {
+        "CPU": 0.05,      # 5%p
+        "메모리": 0.001,   # 0.1%p
+        "건강도": 5,
+        "CPU 1시간 최대": 0.05,
+    }
+
+    # 매 틱 바뀌지만 그 자체로는 전송 사유가 아닌 속성 (전송 시에는 함께 보냄)
+    DEFAULT_VOLATILE = ("업데이트", "경과시간")
+
+    def __init__(self, notion, logger=None, thresholds=None, volatile=None, heartbeat_seconds=600):
+        self.notion = notion
+        self.logger = logger or logging.getLogger(__name__)
+        self.thresholds = dict(self.DEFAULT_THRESHOLDS, **(thresholds or {}))
+        self.volatile = set(self.DEFAULT_VOLATILE if volatile is None else volatile)
+        self.heartbeat_seconds = heartbeat_seconds
+
+        self._last_pushed = {}   # page_id → {속성명: 값}
+        self._last_sent_at = {}  # page_id → time.monotonic()
+        self.sent_count = 0
+        self.skipped_count = 0
+
+    def _property_changed(self, name, old, new):
+        """속성 하나의 변경 여부 (숫자는 임계값, 나머지는 값 비교)"""
+        if old is None:
+            return True
+        if "number" in new and name in self.thresholds:
+            old_value, new_value = old.get("number"), new.get("number")
+            if old_value is None or new_value is None:
+                return old_value != new_value
+            return abs(new_value - old_value) >= self.thresholds[name]
+        return old != new
+
+    def diff(self, previous, properties):
+        """previous 대비 바뀐 속성 이름 목록 (휘발성 속성 제외)"""
+        return [
+            name for name, value in properties.items()
+            if name not in self.volatile and self._property_changed(name, previous.get(name), value)
+        ]
+
+    def changed_properties(self, page_id, properties):
+        """지난 전송 이후 바뀐 속성 이름 목록 (휘발성 속성 제외)"""
+        return self.diff(self._last_pushed.get(page_id, {}), properties)
+
+    def needs_update(self, page_id, properties):
+        """전송 필요 여부 - 변경이 있거나 heartbeat 주기가 지났을 때"""
+        if page_id not in self._last_pushed:
+            return True
+        if self.changed_properties(page_id, properties):
+            return True
+        last_sent = self._last_sent_at.get(page_id, 0)
+        return time.monotonic() - last_sent >= self.heartbeat_seconds
+
+    def _remember(self, page_id, properties):
+        """성공한 경우에만 캐시 갱신 (write-through)"""
+        self._last_pushed[page_id] = dict(properties)
+        self._last_sent_at[page_id] = time.monotonic()
+        self.sent_count += 1
+
+    def update(self, page_id, properties):
+        """필요할 때만 pages.update → 전송했으면 True (실패 시 예외)"""
+        result = self.update_many([(page_id, properties)])[0]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def update_many(self, updates):
+        """[(page_id, properties)] 중 변경된 것만 동시에 전송
+
+        반환: 입력 순서대로 True(전송) / False(변경 없음) / Exception(실패)
+        """
+        results = [False] * len(updates)
+        futures = {}
+
+        for i, (page_id, properties) in enumerate(updates):
+            if not self.needs_update(page_id, properties):
+                self.skipped_count += 1
+                continue
+            submit = getattr(self.notion.pages.update, "submit", None)
+            if submit:
+                # 게이트웨이: 요청을 모두 예약한 뒤 한꺼번에 결과 수집
+                futures[i] = submit(page_id=page_id, properties=properties)
+            else:
+                try:
+                    self.notion.pages.update(page_id=page_id, properties=properties)
+                    self._remember(page_id, properties)
+                    results[i] = True
+                except Exception as e:
+                    results[i] = e
+
+        for i, future in futures.items():
+            page_id, properties = updates[i]
+            try:
+                future.result()
+                self._remember(page_id, properties)
+                results[i] = True
+            except Exception as e:
+                results[i] = e
+
+        return results
+
+    def forget(self, page_id):
+        """페이지 캐시 제거 (페이지 ID가 바뀌었거나 외부에서 수정된 경우)"""
+        self._last_pushed.pop(page_id, None)
+        self._last_sent_at.pop(page_id, None)
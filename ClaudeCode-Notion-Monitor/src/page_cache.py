@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+
+import os
+import json
+import time
+import atexit
+import logging
+import tempfile
+import threading
+from pathlib import Path
+
+# PAGE_CACHE_FILE로 변경 가능 (가짜 노션 서버/벤치마크가 실제 캐시를 덮어쓰지 않도록)
+DEFAULT_CACHE_FILE = Path(
+    os.environ.get("PAGE_CACHE_FILE")
+    or os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "page_cache.json")
+)
+
+CACHE_VERSION = 2
+
+
+class PageCache:
+    """제목 → 노션 페이지 ID 영구 캐시
+
+    - TTL이 지난 항목은 조회 시 miss 처리 → 호출자가 다시 검색해 재검증
+    - 404(object_not_found) 응답을 받으면 invalidate()로 즉시 제거
+    - 변경 사항은 모아두었다가 flush()에서 임시 파일 + rename으로 원자적 저장
+    - 예전 {제목: ID} 형식 파일은 만료된 항목으로 읽어 첫 조회 때 재검증
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_FILE, ttl=86400, flush_interval=30, logger=None):
+        self.path = Path(path)
+        self.ttl = ttl
+        self.flush_interval = flush_interval
+        self.logger = logger or logging.getLogger(__name__)
+        self.entries = {}  # 제목 → {'id': 페이지 ID, 'cached_at': epoch 초}
+        self._dirty = False
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+        self.load()
+        atexit.register(self.flush, force=True)
+
+    def load(self):
+        """캐시 파일 로드 (손상된 파일은 빈 캐시로 시작)"""
+        try:
+            if not self.path.exists():
+                return
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+        except Exception as e:
+            self.logger.warning(f"⚠️ 캐시 로드 실패: {e}")
+            return
+
+        if data.get("version") == CACHE_VERSION:
+            self.entries = data.get("pages", {})
+        else:
+            # 예전 형식: 검증 시각을 알 수 없으므로 만료 상태로 가져옴
+            self.entries = {title: {'id': page_id, 'cached_at': 0} for title, page_id in data.items()}
+            self._dirty = True
+        self.logger.info(f"💾 캐시 로드됨: {len(self.entries)}개 페이지")
+
+    def _is_fresh(self, entry):
+        return time.time() - entry['cached_at'] < self.ttl
+
+    def get(self, title):
+        """유효한 페이지 ID (없거나 TTL이 지났으면 None)"""
+        with self._lock:
+            entry = self.entries.get(title)
+            if entry and self._is_fresh(entry):
+                return entry['id']
+            return None
+
+    def set(self, title, page_id):
+        """검색/생성으로 확인된 페이지 ID 저장 (파일 쓰기는 flush에서)"""
+        with self._lock:
+            entry = self.entries.get(title)
+            if entry and entry['id'] == page_id and self._is_fresh(entry):
+                return
+            self.entries[title] = {'id': page_id, 'cached_at': time.time()}
+            self._dirty = True
+
+    def update(self, pages):
+        """{제목: 페이지 ID} 일괄 저장 (전체 조회 결과 반영)"""
+        for title, page_id in pages.items():
+            self.set(title, page_id)
+
+    def invalidate(self, title):
+        """404 등으로 더 이상 유효하지 않은 항목 제거"""
+        with self._lock:
+            if self.entries.pop(title, None) is not None:
+                self._dirty = True
+
+    def invalidate_page(self, page_id):
+        """페이지 ID로 항목 제거 (업데이트 중 404를 받은 경우)"""
+        with self._lock:
+            for title in [t for t, entry in self.entries.items() if entry['id'] == page_id]:
+                del self.entries[title]
+                self._dirty = True
+
+    def flush(self, force=False):
+        """변경 사항이 있으면 원자적으로 저장 (force가 아니면 flush_interval마다 최대 1회)"""
+        with self._lock:
+            if not self._dirty:
+                return False
+            if not force and time.monotonic() - self._last_flush < self.flush_interval:
+                return False
+
+            # 만료된 항목은 저장하지 않음 (더 이상 조회되지 않는 제목 정리)
+            pages = {title: entry for title, entry in self.entries.items() if self._is_fresh(entry)}
+            try:
+                self.path.parent.mkdir(exist_ok=True)
+                fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, prefix=".page_cache.", suffix=".tmp")
+                try:
+                    with os.fdopen(fd, 'w') as f:
+                        json.dump({"version": CACHE_VERSION, "pages": pages}, f, ensure_ascii=False)
+                        f.flush()
+                        os.fsync(f.fileno())
+                    os.replace(tmp_path, self.path)
+                except BaseException:
+                    os.unlink(tmp_path)
+                    raise
+            except Exception as e:
+                self.logger.error(f"❌ 캐시 저장 실패: {e}")
+                return False
+
+            self.entries = pages
+            self._dirty = False
+            self._last_flush = time.monotonic()
+            return True
+
+
+def is_not_found(error):
+    """노션 404 (삭제/아카이브되었거나 권한이 없는 페이지) 여부"""
+    return getattr(error, "code", None) == "object_not_found"
+
+
+_shared_caches = {}
+_shared_lock = threading.Lock()
+
+
+def get_page_cache(path=DEFAULT_CACHE_FILE):
+    """프로세스 내 공용 페이지 캐시 (파일 경로별 1개)"""
+    path = Path(path)
+    with _shared_lock:
+        if path not in _shared_caches:
+            _shared_caches[path] = PageCache(path)
+        return _shared_caches[path]
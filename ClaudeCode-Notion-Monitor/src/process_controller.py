@@ -1,34 +1,58 @@
 #!/usr/bin/env python3
 
 import os
-import psutil
-import subprocess
-import signal
+import sys
 from datetime import datetime, timezone
 from pathlib import Path
 import logging
 from dotenv import load_dotenv
-from notion_client import Client as NotionClient
+from process_snapshot import get_snapshot_service
+from notion_gateway import get_gateway
+from adaptive_scheduler import EditDetector
+from control_state_table import ControlStateTable
+from process_supervisor import ProcessSupervisor
+from process_terminator import ProcessTerminator
+from service_registry import get_service_registry
+from instance_lock import InstanceLock, AUTOMATION_LOCK
 
 class ProcessController:
-    def __init__(self):
+    def __init__(self, snapshot_service=None):
         load_dotenv(os.path.join(os.path.dirname(os.path.dirname(__file__)), "config", ".env"))
-        self.notion = NotionClient(auth=os.environ["NOTION_TOKEN"])
+        self.notion = get_gateway()
         self.database_id = os.environ["AUTOMATION_DATABASE_ID"]
         self.logger = self._setup_logger()
+        self.edit_detector = EditDetector(self.notion, self.logger)
+        self.user_edited = False  # 마지막 조회에서 사용자 수정 감지 여부
+        # 제어 상태 로컬 테이블 (수정된 페이지만 받아 병합)
+        self.control_table = ControlStateTable(self.notion, self.database_id, logger=self.logger)
         
-        # 제어 가능한 프로세스 명령어 매핑
-        self.process_commands = {
-            "📷 Screenshot": {
-                "start": "python3 /Volumes/990\\ PRO\\ 2TB/GM/03_Areas/System_Automation/screenshot_monitor.py &",
-                "pattern": "screenshot_monitor.py"
-            },
-            "🧠 BRAIN Daemon": {
-                "start": "python3 /Volumes/990\\ PRO\\ 2TB/GM/02_Projects/Claude_Personal_Assistant/conversation_daemon.py start &",
-                "pattern": "conversation_daemon.py"
-            }
-            # FTP Server는 외부 앱이라 제어하지 않음
-        }
+        # 프로세스 스냅샷 (틱당 1회 스캔, 다른 모니터와 공유)
+        self.snapshot_service = snapshot_service or get_snapshot_service()
+        
+        # 제어 가능한 프로세스 = config/services.json에서 start 명령이 있는 서비스
+        # (FTP Server처럼 외부 앱은 start가 없어 제어하지 않음)
+        self.registry = get_service_registry()
+        self._registry_version = None
+        self.process_commands = {}
+        self.sync_services()
+        
+        # 직접 시작한 프로세스 감시 (종료 즉시 감지 → 백오프 재시작, 크래시 루프 차단)
+        self.supervisor = ProcessSupervisor(on_change=self.snapshot_service.invalidate, logger=self.logger)
+        # 중단: 프로세스 트리/그룹 전체에 SIGTERM → 10초 후 SIGKILL, 여러 서비스 동시 처리
+        # 종료 대기는 백그라운드 스레드에서 (틱/이벤트 루프를 막지 않도록 다음 틱에 결과 수집)
+        self.terminator = ProcessTerminator(timeout=10, logger=self.logger)
+        self.stopping = {}  # 이름 → (Future, 대상 {이름: [PID]}) - 중단 진행 중
+    
+    def sync_services(self):
+        """서비스 목록이 바뀌었으면 제어 대상 다시 구성 (틱 시작 시 호출, mtime 확인만)"""
+        self.registry.refresh()
+        if self._registry_version == self.registry.version:
+            return False
+        self._registry_version = self.registry.version
+        self.process_commands = self.registry.controllable()
+        for command in self.process_commands.values():
+            self.snapshot_service.register(command["patterns"])
+        return True
     
     def _setup_logger(self):
         log_dir = Path("../logs")
@@ -46,38 +70,28 @@ class ProcessController:
     
     def get_control_states(self):
         """노션에서 제어 상태 확인"""
+        self.sync_services()
         try:
-            response = self.notion.databases.query(database_id=self.database_id)
-            control_states = {}
+            # 지난 조회 이후 수정된 페이지만 받아 로컬 테이블에 병합
+            changed = self.control_table.sync()
             
-            for page in response["results"]:
-                # 프로세스 이름 가져오기
-                title_property = page["properties"].get("이름", {})
-                if title_property.get("title"):
-                    process_name = title_property["title"][0]["text"]["content"]
-                    
-                    # 제어 체크박스 상태 가져오기
-                    control_property = page["properties"].get("제어", {})
-                    is_enabled = control_property.get("checkbox", False)
-                    
-                    control_states[process_name] = is_enabled
+            user_edited = False
+            for page in changed:
+                user_edited = self.edit_detector.observe(page) or user_edited
+            self.user_edited = user_edited
             
-            return control_states
+            return self.control_table.control_states()
             
         except Exception as e:
             self.logger.error(f"❌ 제어 상태 확인 실패: {e}")
             return {}
     
-    def is_process_running(self, pattern):
-        """프로세스가 실행 중인지 확인"""
-        for proc in psutil.process_iter(['pid', 'cmdline']):
-            try:
-                cmdline = ' '.join(proc.info['cmdline']) if proc.info['cmdline'] else ""
-                if pattern in cmdline:
-                    return proc.info['pid']
-            except (psutil.NoSuchProcess, psutil.AccessDenied):
-                continue
-        return None
+    def is_process_running(self, patterns, snapshot=None):
+        """프로세스가 실행 중인지 확인 (공유 스냅샷 사용) → 첫 번째 PID"""
+        if snapshot is None:
+            snapshot = self.snapshot_service.get()
+        found = snapshot.find(patterns)
+        return found[0]['pid'] if found else None
     
     def start_process(self, process_name):
         """프로세스 시작"""
@@ -86,10 +100,8 @@ class ProcessController:
             return False
         
         try:
-            command = self.process_commands[process_name]["start"]
-            subprocess.Popen(command, shell=True)
-            self.logger.info(f"🚀 프로세스 시작: {process_name}")
-            return True
+            command = self.process_commands[process_name]
+            return self.supervisor.start(process_name, command["start"], command["cwd"], command["restart"])
             
         except Exception as e:
             self.logger.error(f"❌ 프로세스 시작 실패 {process_name}: {e}")
@@ -97,56 +109,136 @@ class ProcessController:
     
     def stop_process(self, process_name):
         """프로세스 중단"""
-        if process_name not in self.process_commands:
-            self.logger.warning(f"⚠️ 제어 불가능한 프로세스: {process_name}")
-            return False
+        return self.stop_processes([process_name]).get(process_name, False)
+    
+    def stop_processes(self, process_names, snapshot=None):
+        """여러 프로세스 동시 중단 후 종료까지 대기 → {이름: 종료 확인 여부} (1회 실행용)"""
+        self.request_stop(process_names, snapshot)
+        return self.collect_stops(wait=True)
+    
+    def request_stop(self, process_names, snapshot=None):
+        """여러 프로세스 중단 요청 (중복 인스턴스, 자식, 프로세스 그룹 포함) - 기다리지 않음
         
-        try:
-            pattern = self.process_commands[process_name]["pattern"]
-            pid = self.is_process_running(pattern)
+        재시작은 바로 중단하고 시그널/종료 대기는 terminator 스레드에서 진행, 결과는 collect_stops()로 수집
+        """
+        if snapshot is None:
+            snapshot = self.snapshot_service.get()
+        
+        targets = {}
+        for process_name in process_names:
+            if process_name not in self.process_commands:
+                self.logger.warning(f"⚠️ 제어 불가능한 프로세스: {process_name}")
+                continue
+            # 패턴이 일치하는 모든 인스턴스 + 감시 중인 자식 (재시작도 중단)
+            patterns = self.process_commands[process_name]["patterns"]
+            pids = {proc['pid'] for proc in snapshot.find(patterns)}
+            child_pid = self.supervisor.stop(process_name)
+            if child_pid:
+                pids.add(child_pid)
+            targets[process_name] = sorted(pids)
+        
+        if targets:
+            future = self.terminator.submit(targets)
+            for process_name in targets:
+                self.stopping[process_name] = (future, targets)
+    
+    def collect_stops(self, wait=False):
+        """끝난 중단 요청의 결과 → {이름: 종료 확인 여부} (wait=True면 진행 중인 요청이 끝날 때까지 대기)"""
+        stopped = {}
+        batches = {id(future): (future, targets) for future, targets in self.stopping.values()}
+        for future, targets in batches.values():
+            if not wait and not future.done():
+                continue
+            for process_name in targets:
+                del self.stopping[process_name]
+            try:
+                results = future.result()
+            except Exception as e:
+                self.logger.error(f"❌ 프로세스 중단 실패 {', '.join(targets)}: {e}")
+                stopped.update({process_name: False for process_name in targets})
+                continue
+            finally:
+                self.snapshot_service.invalidate()
             
-            if pid:
-                os.kill(pid, signal.SIGTERM)
-                self.logger.info(f"🛑 프로세스 중단: {process_name} (PID: {pid})")
-                return True
-            else:
-                self.logger.info(f"ℹ️ 프로세스가 이미 중단됨: {process_name}")
-                return True
-                
-        except Exception as e:
-            self.logger.error(f"❌ 프로세스 중단 실패 {process_name}: {e}")
-            return False
+            for process_name, result in results.items():
+                if not targets[process_name]:
+                    self.logger.info(f"ℹ️ 프로세스가 이미 중단됨: {process_name}")
+                elif result['alive']:
+                    self.logger.error(f"❌ 프로세스 중단 실패 {process_name}: 남은 PID {result['alive']}")
+                else:
+                    self.logger.info(
+                        f"🛑 프로세스 중단: {process_name} (PID: {targets[process_name]}, "
+                        f"종료 {result['terminated']}개, 강제 종료 {result['killed']}개)"
+                    )
+                stopped[process_name] = not result['alive']
+        return stopped
     
     def control_processes(self):
-        """노션 설정에 따라 프로세스 제어"""
+        """노션 설정에 따라 프로세스 제어 → 실행한 동작 {이름: 실행 여부}"""
         self.logger.info("🎛️ 프로세스 제어 시작...")
         
-        control_states = self.get_control_states()
+        actions = self.reconcile(self.get_control_states(), self.snapshot_service.get())
+        
+        self.logger.info("🎛️ 프로세스 제어 완료")
+        return actions
+    
+    def reconcile(self, control_states, snapshot):
+        """제어 상태와 스냅샷 비교 → 시작/중단 실행, 실행한 동작 {이름: 실행 여부} 반환
+        
+        중단은 요청만 하고 다음 틱에 결과를 수집 (끝난 중단은 이번 틱의 동작에 포함)
+        """
+        actions = {process_name: False for process_name, stopped in self.collect_stops().items() if stopped}
+        to_stop = []
         
         for process_name, should_run in control_states.items():
             if process_name not in self.process_commands:
                 continue
+            if process_name in self.stopping:
+                # 중단 진행 중 → 끝난 뒤 다음 틱에 다시 판단
+                self.logger.debug(f"⏳ {process_name}: 중단 진행 중")
+                continue
+            
+            patterns = self.process_commands[process_name]["patterns"]
+            is_running = self.is_process_running(patterns, snapshot) is not None
             
-            pattern = self.process_commands[process_name]["pattern"]
-            is_running = self.is_process_running(pattern) is not None
+            if not should_run:
+                # 사용자가 끈 프로세스는 크래시 루프 기록 초기화 (다시 켜면 바로 시작)
+                self.supervisor.reset(process_name)
             
-            if should_run and not is_running:
+            if should_run and not is_running and self.supervisor.is_active(process_name):
+                # 재시작 백오프 대기 중 → 감시기에 맡김
+                self.logger.debug(f"⏳ {process_name}: 재시작 대기 중")
+                
+            elif should_run and not is_running and self.supervisor.in_crash_loop(process_name):
+                # 크래시 루프 → 대기 시간이 지나거나 사용자가 껐다 켤 때까지 시작하지 않음
+                self.logger.debug(f"🔁 {process_name}: 크래시 루프로 시작 보류")
+                
+            elif should_run and not is_running:
                 # 체크되었는데 실행 안됨 → 시작
                 self.logger.info(f"✅ {process_name} 시작 요청")
-                self.start_process(process_name)
+                if self.start_process(process_name):
+                    actions[process_name] = True
                 
-            elif not should_run and is_running:
-                # 체크 해제되었는데 실행 중 → 중단
+            elif not should_run and (is_running or self.supervisor.is_active(process_name)):
+                # 체크 해제되었는데 실행 중(또는 재시작 대기 중) → 아래에서 한꺼번에 중단
                 self.logger.info(f"☐ {process_name} 중단 요청")
-                self.stop_process(process_name)
+                to_stop.append(process_name)
                 
             else:
                 # 상태 일치 → 유지
                 status = "실행 중" if is_running else "중단됨"
                 self.logger.debug(f"🔄 {process_name}: {status} (설정과 일치)")
         
-        self.logger.info("🎛️ 프로세스 제어 완료")
+        if to_stop:
+            self.request_stop(to_stop, snapshot)
+        
+        return actions
 
 if __name__ == "__main__":
+    # 데몬이 실행 중이면 1회 실행 생략 (같은 페이지를 동시에 쓰지 않도록)
+    instance_lock = InstanceLock(AUTOMATION_LOCK)
+    if not instance_lock.acquire():
+        sys.exit(0)
     controller = ProcessController()
-    controller.control_processes()
\ No newline at end of file
+    controller.control_processes()
+    controller.collect_stops(wait=True)
\ No newline at end of file
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+
+import time
+from collections import deque
+import psutil
+
+
+class ProcessSampler:
+    """누적 CPU 시간 차이로 구간 CPU%를 계산하고 프로세스별 시계열을 링 버퍼에 보관"""
+
+    def __init__(self, history_size=120):
+        self.history_size = history_size
+        self._last = {}       # (pid, create_time) → (monotonic 시각, 누적 CPU 초)
+        self._history = {}    # (pid, create_time) → deque[(시각, cpu%, rss)]
+
+    def sample(self, key, proc):
+        """유지 중인 psutil.Process 핸들로 샘플 1개 기록 (sleep 없음)"""
+        with proc.oneshot():
+            cpu_times = proc.cpu_times()
+            rss = proc.memory_info().rss
+        now = time.monotonic()
+        cpu_total = cpu_times.user + cpu_times.system
+
+        previous = self._last.get(key)
+        if previous and now > previous[0]:
+            # 직전 틱 이후 구간 CPU%
+            cpu_percent = (cpu_total - previous[1]) / (now - previous[0]) * 100
+        else:
+            # 첫 샘플: 0.0 대신 프로세스 시작 이후 평균 CPU%
+            lifetime = time.time() - key[1]
+            cpu_percent = cpu_total / lifetime * 100 if lifetime > 0 else 0.0
+        cpu_percent = round(max(cpu_percent, 0.0), 1)
+        self._last[key] = (now, cpu_total)
+
+        history = self._history.get(key)
+        if history is None:
+            history = self._history[key] = deque(maxlen=self.history_size)
+        history.append((time.time(), cpu_percent, rss))
+
+        return {'cpu_percent': cpu_percent, 'memory_rss': rss}
+
+    def history(self, key):
+        """(시각, cpu%, rss) 시계열 (오래된 순)"""
+        return list(self._history.get(key, ()))
+
+    def average_cpu(self, key, window=300):
+        """최근 window초 평균 CPU% (순간 스파이크 완화용)"""
+        cutoff = time.time() - window
+        values = [cpu for ts, cpu, _ in self._history.get(key, ()) if ts >= cutoff]
+        return round(sum(values) / len(values), 1) if values else 0.0
+
+    def retain(self, keys):
+        """추적 중인 프로세스만 남기고 나머지 기록 삭제"""
+        keys = set(keys)
+        for key in list(self._last):
+            if key not in keys:
+                self._last.pop(key, None)
+                self._history.pop(key, None)
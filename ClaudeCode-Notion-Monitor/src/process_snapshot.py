@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+
+import re
+import time
+import threading
+import psutil
+from process_sampler import ProcessSampler
+
+
+class ProcessSnapshot:
+    """한 시점의 프로세스 테이블 - 등록된 패턴에 매칭된 프로세스만 보관"""
+
+    def __init__(self, processes, total_memory):
+        self.processes = processes          # 매칭된 프로세스 정보 목록
+        self.total_memory = total_memory    # 시스템 전체 메모리 (bytes)
+        self.taken_at = time.monotonic()
+
+    def find(self, patterns):
+        """패턴 목록 중 하나라도 매칭된 프로세스 (PID 중복 없음)"""
+        if isinstance(patterns, str):
+            patterns = [patterns]
+        return [proc for proc in self.processes if any(p in proc['patterns'] for p in patterns)]
+
+    def first_pid(self, pattern):
+        """패턴에 매칭된 첫 번째 PID (없으면 None)"""
+        for proc in self.processes:
+            if pattern in proc['patterns']:
+                return proc['pid']
+        return None
+
+
+class ProcessIndex:
+    """(pid, create_time) 키의 영구 프로세스 인덱스 - 새 PID만 cmdline 파싱/분류
+
+    exec는 PID/create_time을 바꾸지 않으므로 미매칭 항목은 full_check_interval 틱마다 cmdline을 다시 읽음
+    """
+
+    def __init__(self, full_check_interval=20):
+        self.entries = {}           # pid → 인덱스 항목
+        self.full_check_interval = full_check_interval
+        self._ticks = 0
+
+    def _read(self, proc):
+        """(name, cmdline) 읽기 (cmdline 권한이 없으면 빈 문자열)"""
+        with proc.oneshot():
+            name = proc.name()
+            try:
+                cmdline = ' '.join(proc.cmdline())
+            except psutil.AccessDenied:
+                cmdline = ""
+        return name, cmdline
+
+    def _add(self, pid, patterns, matcher):
+        """새로 발견된 PID 등록 (cmdline은 여기서 읽고, 이후에는 full check 때 미매칭 항목만 다시 읽음)"""
+        try:
+            proc = psutil.Process(pid)
+            create_time = proc.create_time()
+            name, cmdline = self._read(proc)
+        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+            return
+
+        entry = {'key': (pid, create_time), 'name': name, 'cmdline': cmdline, 'process': proc}
+        self._classify(entry, patterns, matcher)
+        self.entries[pid] = entry
+
+    def _reread(self, entry, patterns, matcher):
+        """exec로 명령이 바뀌었을 수 있는 항목의 name/cmdline 다시 읽어 재분류 (래퍼 스크립트 → 실제 명령)"""
+        try:
+            name, cmdline = self._read(entry['process'])
+        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+            return
+        if cmdline != entry['cmdline'] or name != entry['name']:
+            entry['name'] = name
+            entry['cmdline'] = cmdline
+            self._classify(entry, patterns, matcher)
+
+    def _classify(self, entry, patterns, matcher):
+        """패턴 분류 - 결합 정규식으로 후보만 골라 정확히 판정"""
+        cmdline = entry['cmdline']
+        if matcher and matcher.search(cmdline):
+            entry['patterns'] = {p for p in patterns if p in cmdline}
+        else:
+            entry['patterns'] = set()
+
+    def reclassify(self, patterns, matcher):
+        """패턴이 추가되면 저장된 cmdline으로 다시 분류 (프로세스 재조회 없음)"""
+        for entry in self.entries.values():
+            self._classify(entry, patterns, matcher)
+
+    def update(self, patterns, matcher):
+        """PID 목록만 읽어 새 PID 추가, 종료된 PID 제거 → 추적 대상 항목 반환"""
+        self._ticks += 1
+        current = set(psutil.pids())
+
+        # 종료된 PID 제거
+        for pid in self.entries.keys() - current:
+            del self.entries[pid]
+
+        # PID 재사용 확인: 추적 대상은 매 틱, 나머지는 full_check_interval 틱마다
+        # full check 때는 미매칭 항목의 cmdline도 다시 읽음 (등록 후 exec한 프로세스)
+        full_check = self._ticks % self.full_check_interval == 0
+        for pid, entry in list(self.entries.items()):
+            if not (entry['patterns'] or full_check):
+                continue
+            # is_running()은 create_time까지 비교하므로 재사용된 PID를 걸러냄
+            if not entry['process'].is_running():
+                del self.entries[pid]
+            elif not entry['patterns']:
+                self._reread(entry, patterns, matcher)
+
+        # 새 PID 등록
+        for pid in current - self.entries.keys():
+            self._add(pid, patterns, matcher)
+
+        return [entry for entry in self.entries.values() if entry['patterns']]
+
+
+class ProcessSnapshotService:
+    """틱당 한 번 인덱스를 갱신하고 모든 모니터가 결과를 공유"""
+
+    def __init__(self, max_age=5.0):
+        self.max_age = max_age
+        self.patterns = []
+        self._matcher = None
+        self._snapshot = None
+        self._index = ProcessIndex()
+        self.sampler = ProcessSampler()
+        self._lock = threading.Lock()
+
+    def register(self, patterns):
+        """감시할 패턴 추가 (결합 정규식 재컴파일)"""
+        if isinstance(patterns, str):
+            patterns = [patterns]
+        with self._lock:
+            added = [p for p in patterns if p not in self.patterns]
+            if not added:
+                return
+            self.patterns.extend(added)
+            # 긴 패턴 우선 - 결합 정규식은 후보 프로세스를 C 레벨에서 빠르게 걸러냄
+            alternatives = sorted(self.patterns, key=len, reverse=True)
+            self._matcher = re.compile("|".join(re.escape(p) for p in alternatives))
+            self._index.reclassify(self.patterns, self._matcher)
+            self._snapshot = None
+
+    def _scan(self):
+        """인덱스 갱신 후 추적 대상 프로세스의 CPU/메모리만 조회"""
+        processes = []
+        tracked = self._index.update(self.patterns, self._matcher)
+
+        for entry in tracked:
+            try:
+                sample = self.sampler.sample(entry['key'], entry['process'])
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+            processes.append({
+                'pid': entry['key'][0],
+                'name': entry['name'],
+                'cmdline': entry['cmdline'],
+                'patterns': entry['patterns'],
+                'create_time': entry['key'][1],
+                'cpu_percent': sample['cpu_percent'],
+                'cpu_avg': self.sampler.average_cpu(entry['key']),
+                'memory_rss': sample['memory_rss'],
+            })
+
+        self.sampler.retain(entry['key'] for entry in tracked)
+
+        return ProcessSnapshot(processes, psutil.virtual_memory().total)
+
+    def get(self, max_age=None):
+        """최근 스냅샷 반환 (max_age 초보다 오래되었으면 다시 스캔)"""
+        max_age = self.max_age if max_age is None else max_age
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is None or time.monotonic() - snapshot.taken_at > max_age:
+                snapshot = self._snapshot = self._scan()
+            return snapshot
+
+    def refresh(self):
+        """강제로 다시 스캔"""
+        return self.get(max_age=0)
+
+    def invalidate(self):
+        """프로세스 시작/중단 후 호출 - 다음 get()에서 다시 스캔"""
+        with self._lock:
+            self._snapshot = None
+
+
+_shared_service = None
+
+
+def get_snapshot_service():
+    """프로세스 내 공용 스냅샷 서비스"""
+    global _shared_service
+    if _shared_service is None:
+        _shared_service = ProcessSnapshotService()
+    return _shared_service
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+
+import time
+import logging
+import threading
+import subprocess
+
+
+class ProcessSupervisor:
+    """직접 시작한 자식 프로세스 관리 - 종료 감지, 재시작 백오프, 크래시 루프 차단
+
+    - 서비스마다 감시 스레드 1개가 Popen.wait()로 종료를 기다림 (스캔/폴링 없이 즉시 감지)
+      macOS에는 pidfd가 없고 SIGCHLD 핸들러는 다른 subprocess 호출과 충돌하므로 wait 스레드 사용
+    - 비정상 종료(코드 != 0, 시그널) 시 base_delay × 2^(연속 실패-1)초 후 재시작 (max_delay 상한)
+      stable_after초 이상 실행된 뒤 종료되면 연속 실패를 1부터 다시 셈
+    - crash_loop_window초 안에 crash_loop_threshold회 재시작하면 크래시 루프로 보고
+      crash_loop_cooldown초 동안 시작 요청 거부 (제어 체크 해제 시 즉시 해제)
+    - 정상 종료(코드 0)는 재시작하지 않음 (자체 데몬화하는 스크립트 포함)
+    - start(policy=...)로 서비스별 재시작 정책 지정 (config/services.json의 restart, auto=false면 재시작 안 함)
+    """
+
+    def __init__(self, base_delay=2.0, max_delay=300.0, stable_after=60.0,
+                 crash_loop_threshold=5, crash_loop_window=600.0, crash_loop_cooldown=1800.0,
+                 on_change=None, logger=None):
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.stable_after = stable_after
+        self.crash_loop_threshold = crash_loop_threshold
+        self.crash_loop_window = crash_loop_window
+        self.crash_loop_cooldown = crash_loop_cooldown
+        self.on_change = on_change  # 자식 시작/종료 시 호출 (스냅샷 무효화 등)
+        self.logger = logger or logging.getLogger(__name__)
+        self.services = {}  # 이름 → 상태 dict
+        self._lock = threading.Lock()
+
+    def _service(self, name):
+        if name not in self.services:
+            self.services[name] = {
+                'argv': None,
+                'proc': None,
+                'thread': None,
+                'wanted': False,
+                'wake': threading.Event(),
+                'failures': 0,            # 연속 비정상 종료 수
+                'restart_count': 0,       # 누적 재시작 수
+                'restart_times': [],      # 최근 1시간 재시작 시각 (time.time())
+                'last_exit_code': None,   # 음수 = 시그널 번호
+                'last_exit_at': None,
+                'crash_loop_until': 0.0,
+                'policy': {},
+            }
+        return self.services[name]
+
+    def _policy(self, service, key):
+        """서비스별 정책 값 (없으면 감시기 기본값)"""
+        return service['policy'].get(key, getattr(self, key))
+
+    def _notify(self):
+        if self.on_change:
+            try:
+                self.on_change()
+            except Exception as e:
+                self.logger.warning(f"⚠️ 상태 변경 콜백 실패: {e}")
+
+    def in_crash_loop(self, name):
+        service = self.services.get(name)
+        return bool(service) and time.time() < service['crash_loop_until']
+
+    def is_active(self, name):
+        """실행 중이거나 재시작 대기 중이면 True"""
+        service = self.services.get(name)
+        return bool(service) and service['thread'] is not None and service['thread'].is_alive()
+
+    def start(self, name, argv, cwd=None, policy=None):
+        """argv로 시작하고 감시 시작 → 시작했거나 이미 감시 중이면 True"""
+        with self._lock:
+            service = self._service(name)
+            if self.in_crash_loop(name):
+                remaining = service['crash_loop_until'] - time.time()
+                self.logger.warning(f"🔁 크래시 루프로 시작 보류: {name} ({remaining:.0f}초 남음)")
+                return False
+            if self.is_active(name):
+                return True
+            service.update(argv=list(argv), cwd=cwd, policy=dict(policy or {}), wanted=True, failures=0)
+            service['wake'].clear()
+            service['thread'] = threading.Thread(target=self._supervise, args=(name,), name=f"supervise-{name}", daemon=True)
+            service['thread'].start()
+        return True
+
+    def _spawn(self, name, service):
+        """자식 실행 → Popen (실패 시 None)"""
+        try:
+            # 새 세션/프로세스 그룹으로 실행 (중단 시 자식의 하위 프로세스까지 함께 종료)
+            proc = subprocess.Popen(service['argv'], cwd=service['cwd'], start_new_session=True)
+        except OSError as e:
+            self.logger.error(f"❌ 프로세스 실행 실패 {name}: {e}")
+            return None
+        self.logger.info(f"🚀 프로세스 시작: {name} (PID: {proc.pid})")
+        return proc
+
+    def _supervise(self, name):
+        service = self.services[name]
+        while service['wanted']:
+            started = time.monotonic()
+            proc = self._spawn(name, service)
+            if proc is None:
+                exit_code = None
+            else:
+                service['proc'] = proc
+                self._notify()
+                exit_code = proc.wait()  # 종료 알림 대기
+                service['proc'] = None
+            service['last_exit_code'] = exit_code
+            service['last_exit_at'] = time.time()
+            self._notify()
+
+            if not service['wanted']:
+                self.logger.info(f"🛑 프로세스 종료: {name} (코드: {exit_code})")
+                break
+            if exit_code == 0:
+                self.logger.info(f"ℹ️ 프로세스 정상 종료 (재시작 안 함): {name}")
+                service['wanted'] = False
+                break
+            if not service['policy'].get('auto', True):
+                self.logger.warning(f"⚠️ 프로세스 비정상 종료: {name} (코드: {exit_code}) - 자동 재시작 꺼짐")
+                service['wanted'] = False
+                break
+
+            # 비정상 종료 → 백오프 후 재시작
+            ran = time.monotonic() - started
+            service['failures'] = 1 if ran >= self._policy(service, 'stable_after') else service['failures'] + 1
+            now = time.time()
+            service['restart_times'] = [t for t in service['restart_times'] if now - t < 3600] + [now]
+            window = self._policy(service, 'crash_loop_window')
+            cooldown = self._policy(service, 'crash_loop_cooldown')
+            recent = [t for t in service['restart_times'] if now - t < window]
+            if len(recent) >= self._policy(service, 'crash_loop_threshold'):
+                service['crash_loop_until'] = now + cooldown
+                service['wanted'] = False
+                self.logger.error(
+                    f"🔁 크래시 루프 감지: {name} ({window:.0f}초 안에 {len(recent)}회 종료, "
+                    f"마지막 코드 {exit_code}) - {cooldown:.0f}초 동안 재시작 중단"
+                )
+                break
+
+            delay = min(self._policy(service, 'base_delay') * 2 ** (service['failures'] - 1), self._policy(service, 'max_delay'))
+            self.logger.warning(f"⚠️ 프로세스 비정상 종료: {name} (코드: {exit_code}) - {delay:.0f}초 후 재시작")
+            if service['wake'].wait(delay):
+                break  # 대기 중 stop()
+            service['restart_count'] += 1
+
+    def stop(self, name):
+        """재시작 중단 → 실행 중인 자식 PID (없으면 None)
+
+        종료 시그널은 호출자가 ProcessTerminator로 보냄 (프로세스 그룹/트리 전체, SIGKILL 단계 포함)
+        """
+        service = self.services.get(name)
+        if not service:
+            return None
+        service['wanted'] = False
+        service['wake'].set()
+        proc = service['proc']
+        if proc is None or proc.poll() is not None:
+            return None
+        return proc.pid
+
+    def reset(self, name):
+        """크래시 루프/재시작 기록 초기화 (사용자가 제어를 해제한 경우)"""
+        service = self.services.get(name)
+        if service and not self.is_active(name) and (service['crash_loop_until'] or service['restart_times']):
+            service['crash_loop_until'] = 0.0
+            service['restart_times'] = []
+            service['failures'] = 0
+            self.logger.info(f"🔄 재시작 기록 초기화: {name}")
+
+    def health(self, name):
+        """건강도 계산용 상태 → {'restarts', 'restart_count', 'last_exit_code', 'crash_loop'} (감시한 적 없으면 {})"""
+        service = self.services.get(name)
+        if not service:
+            return {}
+        now = time.time()
+        return {
+            'restarts': sum(1 for t in service['restart_times'] if now - t < 3600),  # 최근 1시간
+            'restart_count': service['restart_count'],
+            'last_exit_code': service['last_exit_code'],
+            'crash_loop': self.in_crash_loop(name),
+        }
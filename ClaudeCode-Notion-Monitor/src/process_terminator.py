@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+
+import os
+import signal
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+import psutil
+
+
+class ProcessTerminator:
+    """프로세스 트리/그룹 단위 중단 - SIGTERM → 마감 시간까지 대기 → SIGKILL → 종료 확인
+
+    - 대상 PID마다 자식 프로세스 전체 + (그룹 리더라면) 같은 프로세스 그룹 전체를 함께 종료
+      (데몬화로 부모가 바뀐 하위 프로세스도 그룹으로 찾음)
+    - 여러 서비스를 한 번에 시그널하고 한 번의 wait_procs로 함께 대기 (서비스 수와 무관하게 최대 timeout)
+    - 자기 자신과 자기 프로세스 그룹은 대상에서 제외
+    """
+
+    def __init__(self, timeout=10.0, kill_timeout=3.0, logger=None):
+        self.timeout = timeout
+        self.kill_timeout = kill_timeout
+        self.logger = logger or logging.getLogger(__name__)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="terminator")
+
+    def collect(self, pids):
+        """PID 목록 → 함께 종료할 {PID: psutil.Process} (자식 + 프로세스 그룹 구성원)"""
+        own_pid = os.getpid()
+        own_pgid = os.getpgid(0)
+        procs = {}
+        leaders = set()
+
+        for pid in pids:
+            try:
+                proc = psutil.Process(pid)
+                procs[pid] = proc
+                for child in proc.children(recursive=True):
+                    procs[child.pid] = child
+                if os.getpgid(pid) == pid and pid != own_pgid:
+                    leaders.add(pid)
+            except (psutil.NoSuchProcess, psutil.AccessDenied, ProcessLookupError):
+                continue
+
+        if leaders:
+            for proc in psutil.process_iter():
+                try:
+                    if proc.pid not in procs and os.getpgid(proc.pid) in leaders:
+                        procs[proc.pid] = proc
+                except (psutil.NoSuchProcess, ProcessLookupError, PermissionError):
+                    continue
+
+        procs.pop(own_pid, None)
+        return procs
+
+    def _signal(self, procs, sig):
+        for proc in procs:
+            try:
+                proc.send_signal(sig)
+            except psutil.NoSuchProcess:
+                pass
+            except psutil.AccessDenied as e:
+                self.logger.warning(f"⚠️ 시그널 권한 없음 (PID: {proc.pid}): {e}")
+
+    def stop_many(self, targets, timeout=None):
+        """{서비스 이름: [PID]} 동시 중단 → {이름: {'terminated': n, 'killed': n, 'alive': [PID]}}
+
+        timeout 안에 SIGTERM으로 끝나지 않은 프로세스는 SIGKILL 후 kill_timeout까지 확인
+        """
+        timeout = self.timeout if timeout is None else timeout
+        owner = {}  # PID → 서비스 이름
+        procs = {}
+        for name, pids in targets.items():
+            for pid, proc in self.collect(pids).items():
+                if pid not in owner:
+                    owner[pid] = name
+                    procs[pid] = proc
+
+        results = {name: {'terminated': 0, 'killed': 0, 'alive': []} for name in targets}
+        if not procs:
+            return results
+
+        self._signal(procs.values(), signal.SIGTERM)
+        gone, alive = psutil.wait_procs(list(procs.values()), timeout=timeout)
+        for proc in gone:
+            results[owner[proc.pid]]['terminated'] += 1
+
+        if alive:
+            self.logger.warning(f"⚠️ {timeout:.0f}초 안에 종료되지 않음 → SIGKILL: {[p.pid for p in alive]}")
+            self._signal(alive, signal.SIGKILL)
+            gone, alive = psutil.wait_procs(alive, timeout=self.kill_timeout)
+            for proc in gone:
+                results[owner[proc.pid]]['killed'] += 1
+            for proc in alive:
+                results[owner[proc.pid]]['alive'].append(proc.pid)
+                self.logger.error(f"❌ 종료 실패 (PID: {proc.pid}, 서비스: {owner[proc.pid]})")
+
+        return results
+
+    def stop(self, pids, timeout=None):
+        """PID 목록 중단 → {'terminated', 'killed', 'alive'}"""
+        return self.stop_many({None: pids}, timeout)[None]
+
+    def submit(self, targets, timeout=None):
+        """stop_many를 백그라운드에서 실행 → Future (호출자는 기다리지 않고 진행 가능)"""
+        return self._executor.submit(self.stop_many, targets, timeout)
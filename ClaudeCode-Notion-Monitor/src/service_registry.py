@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+
+import os
+import re
+import json
+import logging
+import threading
+from pathlib import Path
+from health_probes import PROBES
+
+# SERVICES_FILE로 변경 가능 (벤치마크/테스트용 목록)
+DEFAULT_SERVICES_FILE = Path(
+    os.environ.get("SERVICES_FILE")
+    or os.path.join(os.path.dirname(os.path.dirname(__file__)), "config", "services.json")
+)
+
+
+class ServiceRegistry:
+    """config/services.json의 서비스 정의 (이름, 매칭 패턴, 유형, 우선순위, 시작 명령, 건강도 기준, 재시작 정책, 프로브)
+
+    - 로드 시 모든 패턴을 결합 정규식 1개 + 패턴 → 서비스 dict로 컴파일 (if 체인 없이 조회)
+    - refresh()가 파일 mtime을 확인해 바뀌었으면 다시 로드, version 증가
+      (잘못된 파일이면 경고만 남기고 기존 정의 유지)
+    - 모니터들은 version이 바뀐 것을 보고 자기 목록을 다시 구성
+    """
+
+    def __init__(self, path=DEFAULT_SERVICES_FILE, logger=None):
+        self.path = Path(path)
+        self.logger = logger or logging.getLogger(__name__)
+        self.version = 0
+        self.services = []      # 정의 순서 (기본값 병합 완료)
+        self.types = {}
+        self._by_name = {}
+        self._by_pattern = {}   # 패턴 → (순서, 서비스)
+        self._matcher = None
+        self._mtime = None
+        self._lock = threading.Lock()
+        self.refresh()
+
+    def _compile(self, data):
+        """JSON → (서비스 목록, 유형, 이름 dict, 패턴 dict, 결합 정규식) (형식 오류 시 ValueError)"""
+        defaults = data.get("defaults", {})
+        types = data.get("types", {})
+        services = []
+        by_name = {}
+        by_pattern = {}
+
+        for order, raw in enumerate(data.get("services", [])):
+            if not raw.get("name") or not raw.get("patterns"):
+                raise ValueError(f"{order + 1}번째 서비스에 name/patterns 없음")
+            service = {
+                'name': raw["name"],
+                'patterns': list(raw["patterns"]),
+                'type': raw.get("type", defaults.get("type", "script")),
+                'priority': raw.get("priority", defaults.get("priority", "🔧 Medium")),
+                'pinned': raw.get("pinned", defaults.get("pinned", False)),
+                'start': raw.get("start"),
+                'cwd': raw.get("cwd"),
+                'health': dict(defaults.get("health", {}), **raw.get("health", {})),
+                'restart': dict(defaults.get("restart", {}), **raw.get("restart", {})),
+                'probes': list(raw.get("probes", [])),
+            }
+            if service['type'] not in types:
+                raise ValueError(f"알 수 없는 유형 {service['type']}: {service['name']}")
+            if service['start'] is not None and not isinstance(service['start'], list):
+                raise ValueError(f"start는 인자 목록이어야 함 (셸 문자열 불가): {service['name']}")
+            for probe in service['probes']:
+                if probe.get("type") not in PROBES:
+                    raise ValueError(f"알 수 없는 프로브 유형 {probe.get('type')}: {service['name']}")
+            if service['name'] in by_name:
+                raise ValueError(f"중복된 서비스 이름: {service['name']}")
+            for pattern in service['patterns']:
+                if pattern in by_pattern:
+                    raise ValueError(f"패턴 {pattern}이 {by_pattern[pattern][1]['name']}와 중복: {service['name']}")
+                by_pattern[pattern] = (order, service)
+            services.append(service)
+            by_name[service['name']] = service
+
+        # 긴 패턴 우선 - 포함 관계인 패턴이 있어도 더 구체적인 쪽이 먼저 매칭
+        alternatives = sorted(by_pattern, key=len, reverse=True)
+        matcher = re.compile("|".join(re.escape(p) for p in alternatives)) if alternatives else None
+        return services, types, by_name, by_pattern, matcher
+
+    def refresh(self):
+        """파일이 바뀌었으면 다시 로드 → 다시 로드했으면 True"""
+        try:
+            mtime = self.path.stat().st_mtime_ns
+        except OSError as e:
+            if self._mtime is None and not self.services:
+                self.logger.error(f"❌ 서비스 목록 없음: {e}")
+            return False
+        if mtime == self._mtime:
+            return False
+
+        with self._lock:
+            self._mtime = mtime
+            try:
+                with open(self.path, 'r') as f:
+                    compiled = self._compile(json.load(f))
+            except Exception as e:
+                self.logger.error(f"❌ 서비스 목록 로드 실패 (기존 정의 유지): {e}")
+                return False
+            self.services, self.types, self._by_name, self._by_pattern, self._matcher = compiled
+            self.version += 1
+        self.logger.info(f"📋 서비스 목록 로드: {len(self.services)}개 (v{self.version})")
+        return True
+
+    def get(self, name):
+        return self._by_name.get(name)
+
+    def all_patterns(self):
+        return list(self._by_pattern)
+
+    def match(self, cmdline):
+        """cmdline → 서비스 (여러 패턴이 있으면 정의 순서가 앞선 서비스, 없으면 None)"""
+        if self._matcher is None:
+            return None
+        found = {m.group(0) for m in self._matcher.finditer(cmdline)}
+        return self.service_for(found)
+
+    def service_for(self, patterns):
+        """스냅샷이 매칭해 둔 패턴 집합 → 서비스 (정의 순서가 앞선 서비스)"""
+        candidates = [self._by_pattern[p] for p in patterns if p in self._by_pattern]
+        return min(candidates, key=lambda c: c[0])[1] if candidates else None
+
+    def type_label(self, service):
+        return self.types[service['type']]['label']
+
+    def notion_type(self, service):
+        return self.types[service['type']]['notion']
+
+    def pinned(self):
+        """항상 표시하는 서비스 {이름: 패턴 목록} (실행 중이 아니어도 노션 행 유지)"""
+        return {service['name']: service['patterns'] for service in self.services if service['pinned']}
+
+    def controllable(self):
+        """시작 명령이 있는 서비스 {이름: {'start', 'cwd', 'patterns', 'restart'}}"""
+        return {
+            service['name']: {
+                'start': service['start'],
+                'cwd': service['cwd'],
+                'patterns': service['patterns'],
+                'restart': service['restart'],
+            }
+            for service in self.services if service['start']
+        }
+
+
+_shared_registries = {}
+_shared_lock = threading.Lock()
+
+
+def get_service_registry(path=DEFAULT_SERVICES_FILE):
+    """프로세스 내 공용 서비스 목록 (파일 경로별 1개)"""
+    path = Path(path)
+    with _shared_lock:
+        if path not in _shared_registries:
+            _shared_registries[path] = ServiceRegistry(path)
+        return _shared_registries[path]
@@ -1,42 +1,73 @@
 #!/usr/bin/env python3
 
+import os
 import asyncio
 import signal
 import sys
 from efficient_monitor import EfficientMonitor
 from process_controller import ProcessController
+from process_snapshot import get_snapshot_service
+from cycle_engine import CycleEngine
+from adaptive_scheduler import AdaptiveScheduler, WebhookReceiver
+from event_journal import EventJournal, JournalPublisher
+from instance_lock import InstanceLock, AUTOMATION_LOCK
 
 class SmartEfficientMonitor:
     def __init__(self):
-        self.efficient_monitor = EfficientMonitor()
-        self.process_controller = ProcessController()
+        # 두 컴포넌트가 같은 프로세스 스냅샷을 공유
+        self.snapshot_service = get_snapshot_service()
+        self.efficient_monitor = EfficientMonitor(snapshot_service=self.snapshot_service)
+        # 상태 변경은 저널에 기록하고 별도 스레드가 노션에 게시 (비정상 종료 시 미게시분부터 재개)
+        self.publisher = JournalPublisher(
+            EventJournal(logger=self.efficient_monitor.logger),
+            self.efficient_monitor.writer,
+            on_not_found=self.efficient_monitor.handle_missing_page,
+            logger=self.efficient_monitor.logger
+        )
+        self.efficient_monitor.publisher = self.publisher
+        self.process_controller = ProcessController(snapshot_service=self.snapshot_service)
+        # DB 읽기 1회 + 스냅샷 1회 + 조정 + diff 쓰기 1회
+        self.engine = CycleEngine(self.efficient_monitor, self.process_controller, self.snapshot_service)
+        # 수정 직후 빠르게, 변화가 없으면 최대 2분까지 점점 느리게 폴링
+        self.scheduler = AdaptiveScheduler(min_interval=2, max_interval=120)
+        self.webhook = None
+        if os.environ.get("WEBHOOK_PORT"):
+            self.webhook = WebhookReceiver(
+                self.scheduler,
+                port=int(os.environ["WEBHOOK_PORT"]),
+                token=os.environ.get("WEBHOOK_TOKEN") or None
+            )
+        self.instance_lock = None  # 설정 시 매 틱 하트비트 (멈춘 리더를 대기 인스턴스가 인계)
         self.running = False
     
     async def run_efficient_monitoring(self):
         """효율적인 스마트 모니터링"""
         print("⚡ 효율적 자동화 모니터링 시작!")
         print("🎛️ 노션 체크박스로 원격 제어")
-        print("🚀 30초마다 안전한 업데이트")
+        print("🚀 수정 감지 시 2초, 변화 없으면 최대 2분 간격으로 업데이트")
         print("💾 캐시 기반 효율적 동작")
         print("📊 등록된 프로세스만 모니터링")
         print("종료: Ctrl+C")
         print("-" * 60)
         
         self.running = True
+        self.publisher.start()
+        if self.webhook:
+            self.webhook.start()
         
         while self.running:
             try:
-                # 1단계: 노션 제어 설정 확인 및 프로세스 제어
-                self.process_controller.control_processes()
+                # 제어 + 상태 업데이트를 한 사이클로 처리
+                result = self.engine.run_cycle()
+                if self.instance_lock:
+                    self.instance_lock.heartbeat()
                 
-                # 2단계: 효율적 상태 업데이트
-                updated = self.efficient_monitor.batch_update_notion()
-                
-                print(f"🔄 업데이트 완료 ({updated}개) - 다음: 30초 후")
+                interval = self.scheduler.record(result['active'])
+                print(f"🔄 변경 기록 완료 ({result['updated']}개) - 다음: {interval:.0f}초 후")
                 print("-" * 60)
                 
-                # 30초 대기 (API 제한 고려)
-                await asyncio.sleep(30)
+                # 다음 틱까지 대기 (웹훅 수신 시 즉시 실행)
+                await self.scheduler.wait()
                 
             except KeyboardInterrupt:
                 self.running = False
@@ -45,18 +76,35 @@ class SmartEfficientMonitor:
                 print(f"❌ 오류: {e}")
                 await asyncio.sleep(5)
         
+        self.publisher.stop()
         print("🛑 효율적 모니터링 종료")
+    
+    def stop(self):
+        """루프 종료 요청 - 현재 틱을 마치고 publisher.stop()으로 미게시분 게시/체크포인트 저장"""
+        self.running = False
+        self.scheduler.wake()
 
-def signal_handler(signum, frame):
+def signal_handler(signum, frame, monitor=None):
     print("\n🛑 종료 신호 수신...")
-    sys.exit(0)
+    if monitor is None:
+        sys.exit(0)  # 모니터 생성 전 (대기 모드 등)
+    monitor.stop()
 
 if __name__ == "__main__":
     # 시그널 핸들러 등록
     signal.signal(signal.SIGINT, signal_handler)
     signal.signal(signal.SIGTERM, signal_handler)
     
+    # 단일 인스턴스 보장 (--standby: 종료하지 않고 대기하다가 리더가 사라지면 인계)
+    # 저널/캐시 파일을 리더와 함께 열지 않도록 잠금을 얻은 뒤에 모니터 생성
+    instance_lock = InstanceLock(AUTOMATION_LOCK)
+    if not instance_lock.acquire(standby="--standby" in sys.argv):
+        sys.exit(0)
+    
     monitor = SmartEfficientMonitor()
+    monitor.instance_lock = instance_lock
+    signal.signal(signal.SIGINT, lambda s, f: signal_handler(s, f, monitor))
+    signal.signal(signal.SIGTERM, lambda s, f: signal_handler(s, f, monitor))
     try:
         asyncio.run(monitor.run_efficient_monitoring())
     except KeyboardInterrupt:
@@ -8,36 +8,66 @@ sys.path.append(os.path.dirname(__file__))
 
 from automation_monitor import AutomationMonitor
 from process_controller import ProcessController
+from process_snapshot import get_snapshot_service
+from adaptive_scheduler import AdaptiveScheduler, WebhookReceiver
+from instance_lock import InstanceLock, AUTOMATION_LOCK
 
 class SmartMonitor:
     def __init__(self):
-        self.automation_monitor = AutomationMonitor()
-        self.process_controller = ProcessController()
+        # 두 컴포넌트가 같은 프로세스 스냅샷을 공유
+        self.snapshot_service = get_snapshot_service()
+        self.automation_monitor = AutomationMonitor(snapshot_service=self.snapshot_service)
+        self.process_controller = ProcessController(snapshot_service=self.snapshot_service)
+        # 재시작 횟수/종료 코드/크래시 루프를 건강도에 반영 (CycleEngine과 동일)
+        self.automation_monitor.supervisor = self.process_controller.supervisor
+        # 제어 대상 서비스의 제어 체크박스는 사용자 설정 유지 (중단 진행 중에 되돌리지 않도록)
+        self.automation_monitor.controller = self.process_controller
+        # 수정 직후 빠르게, 변화가 없으면 최대 1분까지 점점 느리게 폴링
+        self.scheduler = AdaptiveScheduler(min_interval=2, max_interval=60)
+        self.webhook = None
+        if os.environ.get("WEBHOOK_PORT"):
+            self.webhook = WebhookReceiver(
+                self.scheduler,
+                port=int(os.environ["WEBHOOK_PORT"]),
+                token=os.environ.get("WEBHOOK_TOKEN") or None
+            )
+        self.instance_lock = None  # 설정 시 매 틱 하트비트
     
     async def run_smart_monitoring(self):
         """스마트 모니터링 실행 (제어 + 모니터링)"""
         print("🧠 스마트 자동화 모니터링 시작!")
         print("🎛️ 노션에서 체크박스로 프로세스를 제어할 수 있습니다")
-        print("🔄 10초마다 자동 업데이트")
+        print("🔄 수정 감지 시 2초, 변화 없으면 최대 1분 간격으로 자동 업데이트")
         print("종료하려면 Ctrl+C를 눌러주세요.")
         print("-" * 60)
         
+        if self.webhook:
+            self.webhook.start()
+        
         while True:
             try:
+                # 0단계: 이번 틱의 프로세스 스냅샷 (1회 스캔)
+                self.snapshot_service.refresh()
+                
                 # 1단계: 노션 설정에 따라 프로세스 제어
-                self.process_controller.control_processes()
+                actions = self.process_controller.control_processes()
                 
-                # 잠시 대기 (프로세스 시작 완료 대기)
-                await asyncio.sleep(3)
+                # 시작/중단한 경우에만 잠시 대기 (프로세스 시작 완료 대기)
+                if actions:
+                    await asyncio.sleep(3)
                 
                 # 2단계: 현재 상태 모니터링 및 노션 업데이트
                 self.automation_monitor.run_scan()
+                if self.instance_lock:
+                    self.instance_lock.heartbeat()
                 
-                print(f"✅ 모니터링 완료 - 다음 업데이트: 10초 후")
+                active = bool(actions) or bool(self.process_controller.stopping) or self.process_controller.user_edited
+                interval = self.scheduler.record(active)
+                print(f"✅ 모니터링 완료 - 다음 업데이트: {interval:.0f}초 후")
                 print("-" * 60)
                 
-                # 10초 대기
-                await asyncio.sleep(10)
+                # 다음 틱까지 대기 (웹훅 수신 시 즉시 실행)
+                await self.scheduler.wait()
                 
             except KeyboardInterrupt:
                 print("\n🛑 모니터링 중지...")
@@ -49,5 +79,10 @@ class SmartMonitor:
         print("👋 스마트 모니터링 종료")
 
 if __name__ == "__main__":
+    # smart_efficient_monitor와 같은 잠금 - 같은 노션 DB를 제어하는 데몬은 1개만
+    instance_lock = InstanceLock(AUTOMATION_LOCK)
+    if not instance_lock.acquire(standby="--standby" in sys.argv):
+        sys.exit(0)
     monitor = SmartMonitor()
+    monitor.instance_lock = instance_lock
     asyncio.run(monitor.run_smart_monitoring())
\ No newline at end of file
@@ -5,6 +5,7 @@ import os
 sys.path.append('src')
 
 from src.main_monitor import ClaudeNotionMonitor
+from src.instance_lock import InstanceLock, SESSION_LOCK
 import asyncio
 
 if __name__ == "__main__":
@@ -12,8 +13,15 @@ if __name__ == "__main__":
     print("종료하려면 Ctrl+C를 눌러주세요.")
     print("-" * 50)
     
+    # src/main_monitor.py와 같은 잠금 (--standby: 대기하다가 인계)
+    instance_lock = InstanceLock(SESSION_LOCK)
+    if not instance_lock.acquire(standby="--standby" in sys.argv):
+        sys.exit(0)
+    
     try:
-        asyncio.run(ClaudeNotionMonitor().start_monitoring())
+        monitor = ClaudeNotionMonitor()
+        monitor.instance_lock = instance_lock
+        asyncio.run(monitor.start_monitoring())
     except KeyboardInterrupt:
         print("\n👋 모니터링을 종료합니다.")
     except Exception as e:
@@ -33,5 +33,5 @@ echo "🎛️ 노션 체크박스로 원격 제어"
 echo "종료: Ctrl+C"
 echo "=========================="
 
-# 스마트 효율 모니터 실행
-exec python3 src/smart_efficient_monitor.py
\ No newline at end of file
+# 스마트 효율 모니터 실행 (이미 실행 중이면 대기하다가 기존 인스턴스가 종료되면 인계)
+exec python3 src/smart_efficient_monitor.py --standby
\ No newline at end of file
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+제어 체크박스 회귀 테스트 - 사용자가 해제한 제어가 중단 진행 중인 틱에 True로 되돌아가지 않는지 확인
+
+- 로컬 가짜 노션 서버(fake_notion_server.py)와 임시 서비스 목록 사용 (토큰 불필요)
+- 패턴이 cmdline에 포함된 sleep 프로세스를 제어 대상 서비스로 등록
+
+실행:
+    python3 -m pytest tests/test_control_checkbox.py
+"""
+
+import os
+import sys
+import json
+import subprocess
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+SRC_DIR = PROJECT_DIR / "src"
+DATABASE_ID = "control-test-database"
+SERVICE_NAME = "🧪 Control Test"
+# 테스트 명령줄에 들어가지 않도록 조합 (패턴 매칭으로 pytest 자신이 종료되지 않게)
+PATTERN = "control_test_" + "target.py"
+
+sys.path.insert(0, str(PROJECT_DIR))
+sys.path.insert(0, str(SRC_DIR))
+
+from fake_notion_server import FakeNotionServer
+
+
+def write_services(path):
+    """기본 설정의 유형/기본값 + 제어 대상 서비스 1개"""
+    data = json.loads((PROJECT_DIR / "config" / "services.json").read_text())
+    data["services"] = [{
+        "name": SERVICE_NAME,
+        "patterns": [PATTERN],
+        "start": [sys.executable, "-c", "import time; time.sleep(86400)", f"/tmp/{PATTERN}"],
+        "restart": {"auto": False},
+    }]
+    path.write_text(json.dumps(data, ensure_ascii=False))
+
+
+def control_value(server):
+    with server.store.lock:
+        for page in server.store.pages.values():
+            title = page["properties"]["이름"]["title"][0]["text"]["content"]
+            if title == SERVICE_NAME:
+                return page["id"], page["properties"]["제어"]["checkbox"]
+    raise AssertionError(f"페이지 없음: {SERVICE_NAME}")
+
+
+def tick(monitor):
+    """SmartMonitor 한 틱 (스냅샷 → 제어 → 모니터링)"""
+    monitor.snapshot_service.refresh()
+    actions = monitor.process_controller.control_processes()
+    monitor.automation_monitor.run_scan()
+    return actions
+
+
+def test_unchecked_control_stays_false_while_stopping(tmp_path, monkeypatch):
+    server = FakeNotionServer(port=0).start()
+    services_file = tmp_path / "services.json"
+    write_services(services_file)
+    # 모니터 모듈 import 전에 환경 설정 (load_dotenv는 기존 값을 덮어쓰지 않음)
+    for key, value in {
+        "NOTION_TOKEN": "test",
+        "NOTION_BASE_URL": server.url,
+        "AUTOMATION_DATABASE_ID": DATABASE_ID,
+        "SERVICES_FILE": str(services_file),
+        "PAGE_CACHE_FILE": str(tmp_path / "page_cache.json"),
+        "METRICS_DB_FILE": str(tmp_path / "metrics.db"),
+        "EVENT_JOURNAL_FILE": str(tmp_path / "events.jsonl"),
+    }.items():
+        monkeypatch.setenv(key, value)
+    monkeypatch.chdir(SRC_DIR)
+
+    target = subprocess.Popen(
+        [sys.executable, "-c", "import time; time.sleep(86400)", f"/tmp/{PATTERN}"],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        from smart_monitor import SmartMonitor
+        monitor = SmartMonitor()
+        assert SERVICE_NAME in monitor.process_controller.process_commands
+        # 매 틱 전체 속성 전송 (CPU 변화/heartbeat 주기 경과와 같은 상황)
+        monitor.automation_monitor.writer.heartbeat_seconds = 0
+
+        # 실행 중인 서비스의 페이지 (제어 켜짐)
+        with server.store.lock:
+            server.store.create_page({
+                "parent": {"database_id": DATABASE_ID},
+                "properties": {
+                    "이름": {"title": [{"text": {"content": SERVICE_NAME}}]},
+                    "제어": {"checkbox": True},
+                },
+            })
+        assert not tick(monitor)
+        page_id, control = control_value(server)
+        assert control is True
+
+        # 사용자가 제어 해제 → 중단 요청, 같은 틱의 스캔은 아직 실행 중인 프로세스를 봄
+        server.admin("POST", "/_user_edit", {"page_id": page_id, "properties": {"제어": {"checkbox": False}}})
+        tick(monitor)
+        assert SERVICE_NAME in monitor.process_controller.stopping
+        assert control_value(server)[1] is False
+
+        # 중단 완료 후 다음 틱에도 사용자 설정 유지
+        monitor.process_controller.collect_stops(wait=True)
+        tick(monitor)
+        assert target.wait(timeout=10) is not None
+        assert control_value(server)[1] is False
+    finally:
+        if target.poll() is None:
+            target.kill()
+            target.wait()
+        server.stop()
@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+asyncio 기반 동기화 런타임 (--asyncio)
+감시 스레드 + 배치 스레드 + 백필 스레드 + sleep 루프를 하나의 이벤트 루프로 통합
+
+특징:
+- watchdog 이벤트는 call_soon_threadsafe로 루프에 전달 (감시 스레드를 막지 않음)
+- 업로드 완료 대기는 asyncio.sleep으로 처리 (파일마다 스레드가 묶이지 않음)
+- 해시/검증/Photos 추가 등 블로킹 작업은 executor에서 실행
+- 실시간 파일이 백필 파일보다 먼저 처리되는 우선순위 큐
+- SIGTERM/SIGINT 시 진행 중 배치와 대기 중 실시간 파일을 처리한 뒤 종료
+- SYNC_METRICS_PORT 설정 시 127.0.0.1:<port>에서 큐 길이 등 상태를 JSON으로 제공 (모니터 건강도 프로브용)
+"""
+
+import os
+import json
+import signal
+import asyncio
+import threading
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Optional, Set
+from watchdog.observers import Observer
+from watchdog.events import FileSystemEventHandler
+
+# 우선순위 (작을수록 먼저 처리)
+PRIORITY_LIVE = 0
+PRIORITY_BACKFILL = 1
+
+
+class AsyncFTPFileHandler(FileSystemEventHandler):
+    """watchdog 스레드 → 이벤트 루프 브리지"""
+
+    def __init__(self, runtime: "AsyncSyncRuntime"):
+        self.runtime = runtime
+
+    def on_created(self, event):
+        if event.is_directory:
+            return
+        self.runtime.loop.call_soon_threadsafe(self.runtime.on_file_created, Path(event.src_path))
+
+    def on_modified(self, event):
+        if not event.is_directory:
+            self.runtime.sync_manager.io_throttle.note_live_activity()
+
+
+class AsyncSyncRuntime:
+    """FTPiCloudPhotoSync용 asyncio 런타임"""
+
+    def __init__(self, sync_manager, max_workers: int = 4, stable_seconds: int = 3, max_wait: int = 30):
+        self.sync_manager = sync_manager
+        self.logger = sync_manager.logger
+        self.max_workers = max_workers
+        self.stable_seconds = stable_seconds
+        self.max_wait = max_wait
+
+        self.loop: asyncio.AbstractEventLoop = None
+        self.queue: asyncio.PriorityQueue = None
+        self.stopping: asyncio.Event = None
+        self._seq = itertools.count()  # 같은 우선순위 내 FIFO 보장
+        self._pending_checks: Set[asyncio.Task] = set()
+        self._scan_stop = threading.Event()  # executor에서 실행 중인 스캔 중단용
+        self._backfill_remaining = 0
+        self._backfill_success = 0
+        self._backfill_failed = 0  # 배치 처리 중 예외로 실패한 파일 수
+
+    # --- 이벤트 수신 (루프 스레드에서만 실행) ---
+
+    def on_file_created(self, file_path: Path):
+        """새 파일 이벤트 - 업로드 완료 대기 태스크 생성"""
+        if self.stopping.is_set():
+            return
+        self.sync_manager.io_throttle.note_live_activity()
+        task = self.loop.create_task(self._enqueue_when_stable(file_path))
+        self._pending_checks.add(task)
+        task.add_done_callback(self._pending_checks.discard)
+
+    async def _enqueue_when_stable(self, file_path: Path):
+        """파일 크기가 stable_seconds 동안 변하지 않으면 큐에 추가"""
+        last_size = 0
+        stable_count = 0
+        for _ in range(self.max_wait):
+            try:
+                current_size = file_path.stat().st_size
+                if current_size == last_size and current_size > 0:
+                    stable_count += 1
+                    if stable_count >= self.stable_seconds:
+                        break
+                else:
+                    stable_count = 0
+                last_size = current_size
+            except OSError:
+                pass
+            await asyncio.sleep(1)
+
+        if file_path.suffix.lower() in self.sync_manager.supported_extensions:
+            self.logger.info(f"📁 새 파일 감지: {file_path.name}")
+            self.queue.put_nowait((PRIORITY_LIVE, next(self._seq), file_path))
+
+    # --- 워커 ---
+
+    async def _batch_worker(self):
+        """큐에서 최대 batch_size개씩 모아 executor에서 처리"""
+        while True:
+            priority, _, first = await self.queue.get()
+            batch: List[Path] = [first]
+            backfill = priority == PRIORITY_BACKFILL
+            # 같은 우선순위끼리만 묶음 (백필 항목은 I/O 제한 대상)
+            while len(batch) < self.sync_manager.batch_size and not self.queue.empty():
+                item = self.queue.get_nowait()
+                if item[0] != priority:
+                    self.queue.put_nowait(item)
+                    self.queue.task_done()
+                    break
+                batch.append(item[2])
+
+            success = None  # 예외/취소로 끝나면 None
+            try:
+                if backfill:
+                    for file_path in batch:
+                        await self.loop.run_in_executor(None, self.sync_manager._throttle_staging, file_path)
+                success = await self.loop.run_in_executor(None, self.sync_manager._process_batch, batch)
+            except Exception as e:
+                self.logger.error(f"❌ 배치 처리 오류: {e}")
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+                if backfill:
+                    # 실패한 배치도 남은 수에서 빼야 백필 완료 시점을 알 수 있음
+                    self._record_backfill_batch(len(batch), success)
+
+            if backfill:
+                try:
+                    await self._sync_if_backfill_done()
+                except Exception as e:
+                    self.logger.error(f"❌ 백필 완료 후 iCloud 동기화 오류: {e}")
+
+    def _record_backfill_batch(self, count: int, success: Optional[int]):
+        """백필 배치 결과 반영 (success=None이면 배치 전체 실패로 집계)"""
+        self._backfill_remaining -= count
+        if success is None:
+            self._backfill_failed += count
+        else:
+            self._backfill_success += success
+
+    async def _sync_if_backfill_done(self):
+        """백필 전체 완료 시 한번에 iCloud 동기화 (스레드 모드와 동일)"""
+        if self._backfill_remaining == 0 and self._backfill_success > 0:
+            self.logger.info(
+                f"🎉 기존 파일 처리 완료! 성공: {self._backfill_success}개, 실패: {self._backfill_failed}개 - iCloud 동기화 시작..."
+            )
+            await self.loop.run_in_executor(None, self.sync_manager._trigger_icloud_sync)
+
+    async def _backfill(self):
+        """기존 파일 스캔 후 저우선순위로 큐에 추가"""
+        files = await self.loop.run_in_executor(None, self.sync_manager.scan_existing_files, self._scan_stop)
+        if self.stopping.is_set():
+            return
+        self._backfill_remaining = len(files)
+        for file_path in files:
+            self.queue.put_nowait((PRIORITY_BACKFILL, next(self._seq), file_path))
+        self.logger.info(f"📂 백필 대기열 등록: {len(files)}개 파일")
+
+    async def _status_reporter(self):
+        """주기적 상태 출력"""
+        while True:
+            await asyncio.sleep(60)
+            if self.queue.qsize() > 0:
+                self.logger.info(f"📋 대기 중인 파일: {self.queue.qsize()}개")
+                self.logger.info(f"💽 I/O 제한: {self.sync_manager.io_throttle.format_metrics()}")
+
+    def metrics(self) -> dict:
+        """현재 상태 (메트릭 엔드포인트 응답)"""
+        return {
+            "queue_depth": self.queue.qsize(),
+            "pending_checks": len(self._pending_checks),
+            "backfill_remaining": self._backfill_remaining,
+            "backfill_failed": self._backfill_failed,
+            "stopping": self.stopping.is_set(),
+        }
+
+    async def _handle_metrics(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """HTTP GET 하나에 JSON으로 응답 (요청 경로와 관계없이 같은 내용)"""
+        try:
+            # 요청 줄과 헤더는 읽고 버림
+            while (await asyncio.wait_for(reader.readline(), timeout=5)).strip():
+                pass
+            body = json.dumps(self.metrics()).encode()
+            writer.write(
+                b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                + f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode()
+                + body
+            )
+            await writer.drain()
+        except (asyncio.TimeoutError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def _start_metrics_server(self):
+        """SYNC_METRICS_PORT가 있으면 메트릭 엔드포인트 시작 (실패해도 동기화는 계속)"""
+        port = os.environ.get("SYNC_METRICS_PORT")
+        if not port:
+            return None
+        try:
+            server = await asyncio.start_server(self._handle_metrics, "127.0.0.1", int(port))
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"⚠️ 메트릭 엔드포인트 시작 실패 (포트 {port}): {e}")
+            return None
+        self.logger.info(f"📈 메트릭 엔드포인트: http://127.0.0.1:{port}/metrics")
+        return server
+
+    # --- 실행 / 종료 ---
+
+    def _request_stop(self, signame: str):
+        if not self.stopping.is_set():
+            self.logger.info(f"🛑 종료 신호 받음 ({signame}) - 진행 중인 배치 마무리 후 종료")
+            self.stopping.set()
+            self._scan_stop.set()
+
+    def _drop_backfill_items(self) -> int:
+        """종료 시 남은 백필 항목 제거 (다음 실행 때 다시 스캔됨)"""
+        kept, dropped = [], 0
+        while not self.queue.empty():
+            item = self.queue.get_nowait()
+            self.queue.task_done()
+            if item[0] == PRIORITY_BACKFILL:
+                dropped += 1
+            else:
+                kept.append(item)
+        for item in kept:
+            self.queue.put_nowait(item)
+        return dropped
+
+    async def run(self, backfill: bool = True) -> int:
+        self.loop = asyncio.get_running_loop()
+        self.loop.set_default_executor(ThreadPoolExecutor(max_workers=self.max_workers))
+        self.queue = asyncio.PriorityQueue()
+        self.stopping = asyncio.Event()
+
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            self.loop.add_signal_handler(sig, self._request_stop, sig.name)
+
+        observer = Observer()
+        observer.schedule(AsyncFTPFileHandler(self), str(self.sync_manager.ftp_root), recursive=True)
+        observer.start()
+        self.logger.info(f"👁️ FTP 폴더 감시 시작 (asyncio): {self.sync_manager.ftp_root}")
+
+        metrics_server = await self._start_metrics_server()
+        worker = self.loop.create_task(self._batch_worker())
+        reporter = self.loop.create_task(self._status_reporter())
+        backfill_task = self.loop.create_task(self._backfill()) if backfill else None
+
+        await self.stopping.wait()
+
+        # 1) 새 이벤트 수신 중단
+        await self.loop.run_in_executor(None, lambda: (observer.stop(), observer.join()))
+        reporter.cancel()
+        if backfill_task:
+            backfill_task.cancel()
+
+        # 2) 업로드 완료 대기 중인 파일은 마저 기다려서 큐에 추가
+        if self._pending_checks:
+            await asyncio.gather(*self._pending_checks, return_exceptions=True)
+
+        # 3) 백필 항목은 버리고, 실시간 파일과 진행 중 배치는 모두 처리
+        dropped = self._drop_backfill_items()
+        if dropped:
+            self.logger.info(f"⏭️ 백필 {dropped}개는 다음 실행 때 처리")
+        await self.queue.join()
+        worker.cancel()
+        await asyncio.gather(worker, reporter, return_exceptions=True)
+        if metrics_server:
+            metrics_server.close()
+            await metrics_server.wait_closed()
+
+        if self.sync_manager.preview_generator:
+            await self.loop.run_in_executor(None, self.sync_manager.preview_generator.shutdown)
+        self.logger.info("✅ FTP → iCloud Photos 동기화 시스템 종료 (asyncio)")
+        return 0
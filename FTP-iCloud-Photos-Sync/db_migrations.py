@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+sync_history.db 스키마 마이그레이션
+PRAGMA user_version으로 버전을 관리하고, 미적용 마이그레이션만 순서대로 실행
+
+버전:
+1. 기본 sync_history 테이블 (기존 스키마)
+2. 압축 레이아웃 - 디렉토리 분리, 해시 BLOB, 시간 정수(epoch), 복합 인덱스
+"""
+
+import os
+import sqlite3
+import logging
+from typing import Callable, List, Optional, Tuple
+
+
+def _migrate_baseline(conn: sqlite3.Connection):
+    """v1: 기존 스키마 (이미 있으면 그대로 둠)"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS sync_history (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            file_path TEXT UNIQUE NOT NULL,
+            file_size INTEGER NOT NULL,
+            file_hash TEXT NOT NULL,
+            upload_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            status TEXT DEFAULT 'completed'
+        )
+    ''')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_file_hash ON sync_history(file_hash)')
+
+
+def hash_to_blob(value: Optional[str]) -> Optional[bytes]:
+    """16진수 해시 → BLOB (비었거나 잘못된 해시는 NULL - 서로 중복으로 판정되지 않도록)"""
+    try:
+        return bytes.fromhex(value) or None
+    except (TypeError, ValueError):
+        return None
+
+
+def _migrate_compact_layout(conn: sqlite3.Connection):
+    """v2: 디렉토리 정규화 + 해시 BLOB + epoch 시간 + 복합 인덱스"""
+    conn.create_function('py_dirname', 1, os.path.dirname, deterministic=True)
+    conn.create_function('py_basename', 1, os.path.basename, deterministic=True)
+    conn.create_function('py_unhex', 1, hash_to_blob, deterministic=True)
+
+    conn.execute('''
+        CREATE TABLE directories (
+            id INTEGER PRIMARY KEY,
+            path TEXT UNIQUE NOT NULL
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE sync_history_v2 (
+            id INTEGER PRIMARY KEY,
+            dir_id INTEGER NOT NULL REFERENCES directories(id),
+            file_name TEXT NOT NULL,
+            file_size INTEGER NOT NULL,
+            file_hash BLOB,  -- 해시 계산 실패/잘못된 기존 값은 NULL
+            upload_time INTEGER NOT NULL DEFAULT (CAST(strftime('%s', 'now') AS INTEGER)),
+            status TEXT NOT NULL DEFAULT 'completed',
+            UNIQUE (dir_id, file_name)
+        )
+    ''')
+
+    # 기존 데이터 이전
+    conn.execute('''
+        INSERT INTO directories (path)
+        SELECT DISTINCT py_dirname(file_path) FROM sync_history
+    ''')
+    conn.execute('''
+        INSERT INTO sync_history_v2 (id, dir_id, file_name, file_size, file_hash, upload_time, status)
+        SELECT s.id, d.id, py_basename(s.file_path), s.file_size, py_unhex(s.file_hash),
+               COALESCE(CAST(strftime('%s', s.upload_time) AS INTEGER), CAST(strftime('%s', 'now') AS INTEGER)),
+               COALESCE(s.status, 'completed')
+        FROM sync_history s
+        JOIN directories d ON d.path = py_dirname(s.file_path)
+    ''')
+
+    # 기존 테이블과 중복 인덱스(idx_file_path는 UNIQUE 제약과 중복) 제거
+    conn.execute('DROP TABLE sync_history')
+    conn.execute('ALTER TABLE sync_history_v2 RENAME TO sync_history')
+
+    conn.execute('CREATE INDEX idx_file_hash ON sync_history(file_hash)')
+    conn.execute('CREATE INDEX idx_upload_time ON sync_history(upload_time)')
+    conn.execute('CREATE INDEX idx_status_time ON sync_history(status, upload_time)')
+
+    # 사람이 읽는 용도의 호환 뷰 (인덱스 조회에는 sync_history 직접 사용)
+    conn.execute('''
+        CREATE VIEW sync_history_view AS
+        SELECT s.id,
+               d.path || '/' || s.file_name AS file_path,
+               s.file_size,
+               lower(hex(s.file_hash)) AS file_hash,
+               datetime(s.upload_time, 'unixepoch') AS upload_time,
+               s.status
+        FROM sync_history s JOIN directories d ON d.id = s.dir_id
+    ''')
+
+
+# (버전, 설명, 함수) - 버전은 1부터 연속, 한번 배포된 항목은 수정하지 않음
+MIGRATIONS: List[Tuple[int, str, Callable[[sqlite3.Connection], None]]] = [
+    (1, "기본 sync_history 테이블", _migrate_baseline),
+    (2, "압축 레이아웃 (디렉토리 분리, 해시 BLOB, 복합 인덱스)", _migrate_compact_layout),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def get_version(conn: sqlite3.Connection) -> int:
+    return conn.execute('PRAGMA user_version').fetchone()[0]
+
+
+def migrate(conn: sqlite3.Connection, logger: Optional[logging.Logger] = None) -> int:
+    """미적용 마이그레이션을 버전별 트랜잭션으로 실행 → 최종 버전 반환"""
+    logger = logger or logging.getLogger(__name__)
+    current = get_version(conn)
+    pending = [m for m in MIGRATIONS if m[0] > current]
+    if not pending:
+        return current
+
+    # DDL까지 한 트랜잭션으로 묶기 위해 수동 트랜잭션 사용
+    isolation_level = conn.isolation_level
+    conn.isolation_level = None
+    applied = 0
+    try:
+        for version, description, func in pending:
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                # 잠금을 얻은 뒤 다시 확인 - 동시에 시작한 다른 프로세스가 이미 적용했으면 건너뜀
+                if get_version(conn) >= version:
+                    conn.execute('COMMIT')
+                    continue
+                logger.info(f"🗄️ DB 마이그레이션 v{version}: {description}")
+                func(conn)
+                conn.execute(f'PRAGMA user_version = {version}')
+                conn.execute('COMMIT')
+                applied += 1
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+
+        # 테이블 재작성 후 빈 공간 회수 (이번에 적용한 마이그레이션이 있을 때만)
+        if applied:
+            conn.execute('VACUUM')
+    finally:
+        conn.isolation_level = isolation_level
+
+    return get_version(conn)
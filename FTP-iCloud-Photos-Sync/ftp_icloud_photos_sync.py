@@ -9,6 +9,8 @@ Sony 카메라 → FTP → Photos 앱 → iCloud 자동 업로드
 - 중복 방지 (SQLite 기반 이력 관리)
 - 배치 업로드 (순차 처리)
 - iCloud 동기화 강제 실행
+- 미리보기 생성 (선택, --previews)
+- 백필 I/O 속도 제한 (실시간 업로드 중 자동 저속)
 """
 
 import os
@@ -25,9 +27,14 @@ from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
 import threading
 import queue
+import asyncio
+from preview_generator import PreviewGenerator
+from io_throttle import IOThrottle, lower_backfill_priority
+from db_migrations import migrate, hash_to_blob
+from async_runtime import AsyncSyncRuntime
 
 class FTPiCloudPhotoSync:
-    def __init__(self):
+    def __init__(self, enable_previews: bool = False):
         # 경로 설정
         self.ftp_root = Path("/Volumes/990 PRO 2TB/FTP")
         self.project_dir = Path("/Volumes/990 PRO 2TB/GM/01_Projects/FTP-iCloud-Photos-Sync")
@@ -51,6 +58,15 @@ class FTPiCloudPhotoSync:
         # 데이터베이스 초기화
         self._init_database()
         
+        # 백필 I/O 제한 (실시간 업로드 마커는 프로세스 간 공유)
+        self.io_throttle = IOThrottle(marker_file=self.project_dir / ".live_upload")
+        
+        # 미리보기 생성기 (선택)
+        self.preview_generator = None
+        if enable_previews:
+            self.preview_generator = PreviewGenerator(self.project_dir / "previews", logger=self.logger)
+            self.logger.info("🖼️ 미리보기 생성 활성화")
+        
         self.logger.info("🎯 FTP → iCloud Photos 동기화 시스템 시작")
 
     def _setup_logging(self):
@@ -68,26 +84,12 @@ class FTPiCloudPhotoSync:
         self.logger = logging.getLogger(__name__)
 
     def _init_database(self):
-        """SQLite 데이터베이스 초기화"""
+        """SQLite 데이터베이스 초기화 (스키마 마이그레이션 적용)"""
         self.project_dir.mkdir(exist_ok=True)
         
         with sqlite3.connect(self.db_path) as conn:
-            conn.execute('''
-                CREATE TABLE IF NOT EXISTS sync_history (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    file_path TEXT UNIQUE NOT NULL,
-                    file_size INTEGER NOT NULL,
-                    file_hash TEXT NOT NULL,
-                    upload_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    status TEXT DEFAULT 'completed'
-                )
-            ''')
-            conn.execute('''
-                CREATE INDEX IF NOT EXISTS idx_file_hash ON sync_history(file_hash)
-            ''')
-            conn.execute('''
-                CREATE INDEX IF NOT EXISTS idx_file_path ON sync_history(file_path)
-            ''')
+            version = migrate(conn, self.logger)
+            self.logger.debug(f"🗄️ DB 스키마 버전: v{version}")
 
     def _get_file_hash(self, file_path: Path) -> str:
         """파일 해시값 계산 (중복 감지용) - 성능 최적화"""
@@ -101,14 +103,22 @@ class FTPiCloudPhotoSync:
             return ""
 
     def _is_duplicate(self, file_path: Path, file_size: int, file_hash: str) -> bool:
-        """중복 파일 체크"""
+        """중복 파일 체크 (해시 인덱스 또는 (디렉토리, 파일명) UNIQUE 인덱스 조회)
+
+        해시가 없으면(NULL) 경로로만 판정
+        """
+        hash_blob = hash_to_blob(file_hash)
         try:
             with sqlite3.connect(self.db_path) as conn:
                 cursor = conn.execute(
-                    "SELECT COUNT(*) FROM sync_history WHERE file_hash = ? OR file_path = ?",
-                    (file_hash, str(file_path))
+                    """
+                    SELECT (? IS NOT NULL AND EXISTS(SELECT 1 FROM sync_history WHERE file_hash = ?))
+                        OR EXISTS(SELECT 1 FROM sync_history s JOIN directories d ON d.id = s.dir_id
+                                  WHERE d.path = ? AND s.file_name = ?)
+                    """,
+                    (hash_blob, hash_blob, str(file_path.parent), file_path.name)
                 )
-                return cursor.fetchone()[0] > 0
+                return bool(cursor.fetchone()[0])
         except Exception as e:
             self.logger.error(f"❌ 중복 체크 실패: {e}")
             return False
@@ -214,9 +224,13 @@ class FTPiCloudPhotoSync:
         """업로드 이력 기록"""
         try:
             with sqlite3.connect(self.db_path) as conn:
+                conn.execute("INSERT OR IGNORE INTO directories (path) VALUES (?)", (str(file_path.parent),))
                 conn.execute(
-                    "INSERT OR REPLACE INTO sync_history (file_path, file_size, file_hash) VALUES (?, ?, ?)",
-                    (str(file_path), file_size, file_hash)
+                    """
+                    INSERT OR REPLACE INTO sync_history (dir_id, file_name, file_size, file_hash)
+                    VALUES ((SELECT id FROM directories WHERE path = ?), ?, ?, ?)
+                    """,
+                    (str(file_path.parent), file_path.name, file_size, hash_to_blob(file_hash))
                 )
                 self.logger.debug(f"📝 업로드 이력 기록: {file_path.name}")
         except Exception as e:
@@ -252,6 +266,40 @@ class FTPiCloudPhotoSync:
             self.logger.error(f"❌ 파일 처리 실패 {file_path}: {e}")
             return False
 
+    def _throttle_staging(self, file_path: Path):
+        """백필 스테이징 전 I/O 예산 확보 (파일 크기 + 검증/해시 stat)"""
+        try:
+            file_size = file_path.stat().st_size
+        except OSError:
+            file_size = 0
+        self.io_throttle.acquire(nbytes=file_size, ops=3)
+
+    def _submit_preview(self, file_path: Path):
+        """미리보기 생성 요청 (활성화된 경우에만, 즉시 반환)"""
+        if self.preview_generator:
+            self.preview_generator.submit(file_path)
+
+    def _process_batch(self, files_to_process: List[Path]) -> int:
+        """수집된 파일 배치 처리 → 성공 개수 (스레드/asyncio 런타임 공용)"""
+        self.processing = True
+        self.logger.info(f"📦 배치 처리 시작: {len(files_to_process)}개 파일 (대기하지 않고 즉시 처리)")
+        
+        # 파일들 순차 처리
+        success_count = 0
+        try:
+            for file_path in files_to_process:
+                if self._process_file(file_path):
+                    success_count += 1
+                    self._submit_preview(file_path)
+            
+            # 배치 처리 완료 후 iCloud 동기화 트리거
+            if success_count > 0:
+                self.logger.info(f"🎯 배치 완료: {success_count}/{len(files_to_process)}개 성공")
+        finally:
+            self.processing = False
+        
+        return success_count
+
     def _batch_processor(self):
         """배치 처리 워커"""
         while True:
@@ -275,20 +323,7 @@ class FTPiCloudPhotoSync:
                         break  # 더 이상 파일이 없으면 현재 파일들로 바로 처리
                 
                 if files_to_process:
-                    self.processing = True
-                    self.logger.info(f"📦 배치 처리 시작: {len(files_to_process)}개 파일 (대기하지 않고 즉시 처리)")
-                    
-                    # 파일들 순차 처리
-                    success_count = 0
-                    for file_path in files_to_process:
-                        if self._process_file(file_path):
-                            success_count += 1
-                    
-                    # 배치 처리 완료 후 iCloud 동기화 트리거
-                    if success_count > 0:
-                        self.logger.info(f"🎯 배치 완료: {success_count}/{len(files_to_process)}개 성공")
-                            
-                    self.processing = False
+                    self._process_batch(files_to_process)
                     
                     # 큐 완료 신호
                     for _ in files_to_process:
@@ -299,7 +334,7 @@ class FTPiCloudPhotoSync:
                 self.processing = False
                 time.sleep(5)
 
-    def scan_existing_files(self) -> List[Path]:
+    def scan_existing_files(self, stop_event: Optional[threading.Event] = None) -> List[Path]:
         """기존 파일들을 생성 시간 순으로 스캔 (모든 하위 폴더 포함) - 성능 최적화"""
         self.logger.info("📂 기존 파일 스캔 시작...")
         self.logger.info(f"🔍 검색 경로: {self.ftp_root}")
@@ -312,6 +347,10 @@ class FTPiCloudPhotoSync:
         
         # 모든 하위 폴더를 재귀적으로 스캔
         for file_path in self.ftp_root.rglob("*"):
+            if stop_event and stop_event.is_set():
+                self.logger.info("⏹️ 종료 요청으로 스캔 중단")
+                return []
+            self.io_throttle.acquire(ops=1)
             if file_path.is_file():
                 total_files_found += 1
                 
@@ -329,7 +368,8 @@ class FTPiCloudPhotoSync:
                 if file_path.suffix.lower() in self.supported_extensions:
                     try:
                         processed_count += 1
-                        # 빠른 파일 정보 수집
+                        # 빠른 파일 정보 수집 (stat + 해시용 stat)
+                        self.io_throttle.acquire(ops=2)
                         stat = file_path.stat()
                         file_size = stat.st_size
                         file_hash = self._get_file_hash(file_path)
@@ -383,9 +423,11 @@ class FTPiCloudPhotoSync:
             batch_success = 0
             for file_path in batch:
                 self.logger.info(f"📤 업로드: {file_path.name} ({file_path.parent.name}/)")
+                self._throttle_staging(file_path)
                 if self._process_file(file_path):
                     batch_success += 1
                     success_count += 1
+                    self._submit_preview(file_path)
                 processed += 1
                 
             
@@ -396,6 +438,7 @@ class FTPiCloudPhotoSync:
                 # 진행률 표시
                 progress = (processed / total_files) * 100
                 self.logger.info(f"📈 전체 진행률: {progress:.1f}% ({processed}/{total_files})")
+                self.logger.info(f"💽 I/O 제한: {self.io_throttle.format_metrics()}")
                 
             
         # 모든 배치 완료 후 한번에 iCloud 동기화
@@ -419,6 +462,9 @@ class FTPFileHandler(FileSystemEventHandler):
             
         file_path = Path(event.src_path)
         
+        # 실시간 업로드 알림 → 백필 I/O 저속 전환
+        self.sync_manager.io_throttle.note_live_activity()
+        
         # 파일 생성 완료 대기 (카메라 업로드가 완료될 때까지)
         self._wait_for_file_complete(file_path)
         
@@ -428,6 +474,11 @@ class FTPFileHandler(FileSystemEventHandler):
             # 큐에 추가
             self.sync_manager.upload_queue.put(file_path)
     
+    def on_modified(self, event):
+        """업로드 중 파일 쓰기 감지 (백필 저속 유지용)"""
+        if not event.is_directory:
+            self.sync_manager.io_throttle.note_live_activity()
+    
     def _wait_for_file_complete(self, file_path: Path, max_wait: int = 30):
         """파일 업로드 완료 대기"""
         last_size = 0
@@ -555,7 +606,7 @@ def main():
     """메인 실행 함수"""
     try:
         # 동기화 시스템 초기화
-        sync_manager = FTPiCloudPhotoSync()
+        sync_manager = FTPiCloudPhotoSync(enable_previews="--previews" in sys.argv)
         
         # FTP 폴더 존재 확인
         if not sync_manager.ftp_root.exists():
@@ -563,12 +614,19 @@ def main():
             return 1
         
         # 명령행 인수 확인
-        if len(sys.argv) > 1 and sys.argv[1] == "--sync-existing":
+        if "--sync-existing" in sys.argv:
             # 기존 파일 동기화 모드
             sync_manager.logger.info("🔄 기존 파일 동기화 모드 시작")
+            lower_backfill_priority()
             sync_manager.process_existing_files_batch(batch_size=10)  # 배치 크기 10개로 설정
+            if sync_manager.preview_generator:
+                sync_manager.preview_generator.shutdown()
             return 0
         
+        # asyncio 런타임 모드 (단일 이벤트 루프 스케줄러)
+        if "--asyncio" in sys.argv:
+            return asyncio.run(AsyncSyncRuntime(sync_manager).run())
+        
         # 배치 처리 워커 시작
         batch_thread = threading.Thread(target=sync_manager._batch_processor, daemon=True)
         batch_thread.start()
@@ -592,17 +650,25 @@ def main():
         sync_manager.logger.info("🛑 종료: Ctrl+C")
         
         try:
+            last_metrics_log = time.time()
             while True:
                 time.sleep(1)
                 # 주기적 상태 출력
                 if sync_manager.upload_queue.qsize() > 0:
                     sync_manager.logger.info(f"📋 대기 중인 파일: {sync_manager.upload_queue.qsize()}개")
                 
+                # 백필 진행 중이면 1분마다 I/O 제한 상태 출력
+                if existing_thread.is_alive() and time.time() - last_metrics_log >= 60:
+                    last_metrics_log = time.time()
+                    sync_manager.logger.info(f"💽 I/O 제한: {sync_manager.io_throttle.format_metrics()}")
+                
         except KeyboardInterrupt:
             sync_manager.logger.info("🛑 종료 신호 받음")
             
         observer.stop()
         observer.join()
+        if sync_manager.preview_generator:
+            sync_manager.preview_generator.shutdown()
         sync_manager.logger.info("✅ FTP → iCloud Photos 동기화 시스템 종료")
         return 0
         
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+I/O 속도 제한기 (토큰 버킷)
+기존 파일 백필이 FTP 서버와 같은 드라이브를 포화시키지 않도록 제한
+
+특징:
+- 바이트/초 + IOPS 이중 토큰 버킷
+- 실시간 업로드 감지 시 자동으로 낮은 제한으로 전환
+- 프로세스 간 공유: 감시 데몬이 마커 파일을 갱신하면 --sync-existing 프로세스도 감지
+"""
+
+import os
+import time
+import threading
+from pathlib import Path
+from typing import Optional, Dict
+
+
+class TokenBucket:
+    """초당 rate 만큼 채워지는 토큰 버킷 (스레드 안전)"""
+
+    def __init__(self, rate: float, burst_seconds: float = 1.0):
+        self.rate = rate
+        self.burst_seconds = burst_seconds
+        self.capacity = rate * burst_seconds
+        self.tokens = self.capacity
+        self.last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    def set_rate(self, rate: float):
+        """속도 변경 (쌓인 토큰은 새 용량으로 잘라냄)"""
+        with self._lock:
+            self._refill()
+            self.rate = rate
+            self.capacity = rate * self.burst_seconds
+            self.tokens = min(self.tokens, self.capacity)
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.rate)
+        self.last_refill = now
+
+    def reserve(self, amount: float) -> float:
+        """토큰 예약 후 기다려야 할 시간(초) 반환 - 용량보다 큰 요청은 빚으로 처리"""
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            self._refill()
+            self.tokens -= amount
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+
+class IOThrottle:
+    """스캔/해시/스테이징용 I/O 제한기"""
+
+    def __init__(self, bytes_per_sec: float = 40 * 1024 * 1024, iops: float = 200,
+                 live_bytes_per_sec: float = 5 * 1024 * 1024, live_iops: float = 20,
+                 live_hold_seconds: float = 30, marker_file: Optional[Path] = None):
+        self.normal_limits = (bytes_per_sec, iops)
+        self.live_limits = (live_bytes_per_sec, live_iops)
+        self.live_hold_seconds = live_hold_seconds
+        self.marker_file = marker_file
+
+        self.byte_bucket = TokenBucket(bytes_per_sec)
+        self.op_bucket = TokenBucket(iops)
+        self.mode = 'normal'
+
+        self._last_live_activity = 0.0
+        self._last_marker_touch = 0.0
+        self._last_marker_check = 0.0
+        self._marker_mtime = 0.0
+
+        # 메트릭
+        self.total_bytes = 0
+        self.total_ops = 0
+        self.throttled_seconds = 0.0
+        self.throttle_events = 0
+        self.mode_switches = 0
+        self._lock = threading.Lock()
+
+    def note_live_activity(self):
+        """실시간 감시기에서 업로드 수신 시 호출"""
+        now = time.time()
+        self._last_live_activity = now
+        # 다른 프로세스(백필)에 알리기 위해 마커 파일 갱신 (초당 최대 1회)
+        if self.marker_file and now - self._last_marker_touch >= 1.0:
+            self._last_marker_touch = now
+            try:
+                self.marker_file.touch()
+            except OSError:
+                pass
+
+    def _live_active(self) -> bool:
+        """최근 live_hold_seconds 안에 실시간 업로드가 있었는지"""
+        now = time.time()
+        if self.marker_file and now - self._last_marker_check >= 1.0:
+            self._last_marker_check = now
+            try:
+                self._marker_mtime = self.marker_file.stat().st_mtime
+            except OSError:
+                self._marker_mtime = 0.0
+        last = max(self._last_live_activity, self._marker_mtime)
+        return now - last < self.live_hold_seconds
+
+    def _update_mode(self):
+        mode = 'live' if self._live_active() else 'normal'
+        if mode != self.mode:
+            self.mode = mode
+            self.mode_switches += 1
+            bytes_rate, ops_rate = self.live_limits if mode == 'live' else self.normal_limits
+            self.byte_bucket.set_rate(bytes_rate)
+            self.op_bucket.set_rate(ops_rate)
+
+    def acquire(self, nbytes: int = 0, ops: int = 1) -> float:
+        """I/O 수행 전 호출 - 필요한 만큼 대기 후 대기 시간 반환"""
+        self._update_mode()
+        wait = max(self.byte_bucket.reserve(nbytes) if nbytes else 0.0,
+                   self.op_bucket.reserve(ops) if ops else 0.0)
+        with self._lock:
+            self.total_bytes += nbytes
+            self.total_ops += ops
+            if wait > 0:
+                self.throttled_seconds += wait
+                self.throttle_events += 1
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def get_metrics(self) -> Dict:
+        """현재 제한 상태 메트릭"""
+        bytes_rate, ops_rate = self.live_limits if self.mode == 'live' else self.normal_limits
+        return {
+            'mode': self.mode,
+            'bytes_per_sec_limit': bytes_rate,
+            'iops_limit': ops_rate,
+            'total_bytes': self.total_bytes,
+            'total_ops': self.total_ops,
+            'throttled_seconds': round(self.throttled_seconds, 2),
+            'throttle_events': self.throttle_events,
+            'mode_switches': self.mode_switches,
+        }
+
+    def format_metrics(self) -> str:
+        """로그 출력용 한 줄 요약"""
+        m = self.get_metrics()
+        mode = "🐢 실시간 업로드 감지 (저속)" if m['mode'] == 'live' else "🚀 일반"
+        return (f"{mode} | 제한: {m['bytes_per_sec_limit'] / 1024 / 1024:.0f}MB/s, {m['iops_limit']:.0f} IOPS"
+                f" | 누적: {m['total_bytes'] / 1024 / 1024:.1f}MB, {m['total_ops']}회"
+                f" | 대기: {m['throttled_seconds']:.1f}초")
+
+
+def lower_backfill_priority():
+    """백필 프로세스의 CPU/I/O 우선순위 낮추기 (nice + macOS 백그라운드 정책)"""
+    try:
+        os.nice(10)
+    except OSError:
+        pass
+    # macOS: 백그라운드 정책은 디스크 I/O도 낮은 우선순위로 스케줄링
+    if hasattr(os, 'PRIO_DARWIN_BG'):
+        try:
+            os.setpriority(os.PRIO_DARWIN_PROCESS, 0, os.PRIO_DARWIN_BG)
+        except OSError:
+            pass
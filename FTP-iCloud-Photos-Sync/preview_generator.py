@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+미리보기(썸네일) 생성기
+수신된 사진마다 작은 JPEG 미리보기를 만들어 디스크 캐시에 저장
+
+특징:
+- 프로세스 풀에서 실행 (수신 파이프라인을 막지 않음)
+- 콘텐츠 해시 기반 캐시 키 (같은 사진은 한 번만 생성)
+- 내장 EXIF 썸네일 우선 사용, 없을 때만 sips로 디코딩
+- 캐시 용량 초과 시 LRU 순서로 삭제
+"""
+
+import os
+import struct
+import hashlib
+import tempfile
+import subprocess
+import threading
+import logging
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, Future
+from pathlib import Path
+from typing import Optional, Tuple
+
+# 미리보기를 만들 수 있는 사진 형식 (동영상은 제외)
+PREVIEW_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.heic', '.heif'}
+
+# 콘텐츠 해시에 사용할 앞/뒤 샘플 크기
+HASH_SAMPLE_BYTES = 64 * 1024
+
+# EXIF 블록을 찾을 때 읽는 파일 앞부분 크기
+EXIF_SEARCH_BYTES = 256 * 1024
+
+
+def content_hash(file_path: Path) -> str:
+    """파일 크기 + 앞/뒤 64KB 샘플로 콘텐츠 해시 계산 (전체를 읽지 않음)"""
+    size = file_path.stat().st_size
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(str(size).encode())
+    with open(file_path, 'rb') as f:
+        digest.update(f.read(HASH_SAMPLE_BYTES))
+        if size > HASH_SAMPLE_BYTES * 2:
+            f.seek(-HASH_SAMPLE_BYTES, os.SEEK_END)
+            digest.update(f.read(HASH_SAMPLE_BYTES))
+    return digest.hexdigest()
+
+
+def extract_exif_thumbnail(data: bytes) -> Optional[bytes]:
+    """EXIF IFD1에 내장된 JPEG 썸네일 추출 (JPEG/HEIC 공통)"""
+    start = data.find(b'Exif\x00\x00')
+    if start < 0:
+        return None
+    tiff = start + 6
+    byte_order = data[tiff:tiff + 2]
+    if byte_order == b'II':
+        endian = '<'
+    elif byte_order == b'MM':
+        endian = '>'
+    else:
+        return None
+
+    def read(fmt: str, offset: int):
+        return struct.unpack_from(endian + fmt, data, tiff + offset)[0]
+
+    try:
+        # IFD0 → 다음 IFD(IFD1) 오프셋
+        ifd0 = read('I', 4)
+        entries = read('H', ifd0)
+        ifd1 = read('I', ifd0 + 2 + entries * 12)
+        if ifd1 == 0:
+            return None
+
+        thumb_offset = thumb_length = None
+        entries = read('H', ifd1)
+        for i in range(entries):
+            entry = ifd1 + 2 + i * 12
+            tag = read('H', entry)
+            if tag == 0x0201:  # JPEGInterchangeFormat
+                thumb_offset = read('I', entry + 8)
+            elif tag == 0x0202:  # JPEGInterchangeFormatLength
+                thumb_length = read('I', entry + 8)
+
+        if not thumb_offset or not thumb_length:
+            return None
+        thumb = data[tiff + thumb_offset:tiff + thumb_offset + thumb_length]
+        # 잘린 데이터나 JPEG가 아닌 경우 무시
+        if len(thumb) != thumb_length or not thumb.startswith(b'\xff\xd8'):
+            return None
+        return thumb
+    except struct.error:
+        return None
+
+
+def build_preview(src_path: str, cache_dir: str, max_edge: int) -> Tuple[str, str, int]:
+    """워커 프로세스에서 미리보기 생성 → (캐시 키, 방식, 크기)"""
+    src = Path(src_path)
+    key = content_hash(src)
+    dest = Path(cache_dir) / key[:2] / f"{key}.jpg"
+
+    if dest.exists():
+        os.utime(dest)  # LRU 갱신
+        return key, 'hit', dest.stat().st_size
+
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    # 같은 키를 동시에 만드는 워커끼리 임시 파일이 겹치지 않도록 고유 이름 사용
+    fd, tmp_path = tempfile.mkstemp(dir=dest.parent, prefix=f".{key}.", suffix=".tmp")
+    os.close(fd)
+    tmp = Path(tmp_path)
+    try:
+        # 1순위: 내장 EXIF 썸네일 (디코딩 없음)
+        with open(src, 'rb') as f:
+            head = f.read(EXIF_SEARCH_BYTES)
+        thumb = extract_exif_thumbnail(head)
+        if thumb:
+            tmp.write_bytes(thumb)
+            os.replace(tmp, dest)
+            return key, 'exif', len(thumb)
+
+        # 2순위: sips로 디코딩 후 축소 (macOS)
+        result = subprocess.run(
+            ['sips', '-s', 'format', 'jpeg', '-Z', str(max_edge), str(src), '--out', str(tmp)],
+            capture_output=True,
+            timeout=30
+        )
+        if result.returncode != 0 or not tmp.exists() or tmp.stat().st_size == 0:
+            return key, 'failed', 0
+        os.replace(tmp, dest)
+    finally:
+        tmp.unlink(missing_ok=True)  # 교체하지 못한 경우만 남아 있음
+    return key, 'decoded', dest.stat().st_size
+
+
+class PreviewGenerator:
+    """프로세스 풀 기반 미리보기 생성 + LRU 디스크 캐시"""
+
+    def __init__(self, cache_dir: Path, max_cache_mb: int = 512, max_workers: int = 2,
+                 max_edge: int = 320, logger: Optional[logging.Logger] = None):
+        self.cache_dir = Path(cache_dir)
+        self.max_cache_bytes = max_cache_mb * 1024 * 1024
+        self.max_edge = max_edge
+        self.logger = logger or logging.getLogger(__name__)
+
+        # 캐시 키 → 파일 크기 (앞쪽이 가장 오래 사용되지 않은 항목)
+        self._lru: "OrderedDict[str, int]" = OrderedDict()
+        self._cache_bytes = 0
+        self._lock = threading.Lock()
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._load_cache_index()
+        self.executor = ProcessPoolExecutor(max_workers=max_workers)
+
+    def _cache_path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.jpg"
+
+    def _load_cache_index(self):
+        """기존 캐시 파일을 마지막 사용 시간 순으로 로드"""
+        entries = []
+        for path in self.cache_dir.glob("*/*.jpg"):
+            try:
+                stat = path.stat()
+                entries.append((stat.st_mtime, path.stem, stat.st_size))
+            except OSError:
+                continue
+        for _, key, size in sorted(entries):
+            self._lru[key] = size
+            self._cache_bytes += size
+        if entries:
+            self.logger.info(f"🖼️ 미리보기 캐시 로드: {len(entries)}개 ({self._cache_bytes / 1024 / 1024:.1f}MB)")
+
+    def submit(self, file_path: Path) -> Optional[Future]:
+        """미리보기 생성 요청 (즉시 반환)"""
+        if file_path.suffix.lower() not in PREVIEW_EXTENSIONS:
+            return None
+        try:
+            future = self.executor.submit(build_preview, str(file_path), str(self.cache_dir), self.max_edge)
+        except RuntimeError as e:
+            self.logger.warning(f"⚠️ 미리보기 요청 실패 {file_path.name}: {e}")
+            return None
+        future.add_done_callback(lambda f: self._on_done(file_path, f))
+        return future
+
+    def _on_done(self, file_path: Path, future: Future):
+        """워커 완료 콜백 - LRU 갱신 및 용량 초과 시 삭제"""
+        try:
+            key, method, size = future.result()
+        except Exception as e:
+            self.logger.warning(f"⚠️ 미리보기 생성 실패 {file_path.name}: {e}")
+            return
+
+        if method == 'failed':
+            self.logger.debug(f"🚫 미리보기 디코딩 실패: {file_path.name}")
+            return
+
+        with self._lock:
+            if key in self._lru:
+                self._cache_bytes -= self._lru.pop(key)
+            self._lru[key] = size
+            self._cache_bytes += size
+            self._evict()
+
+        self.logger.debug(f"🖼️ 미리보기 ({method}): {file_path.name}")
+
+    def _evict(self):
+        """캐시 용량 초과분을 가장 오래된 항목부터 삭제 (lock 보유 상태에서 호출)"""
+        while self._cache_bytes > self.max_cache_bytes and len(self._lru) > 1:
+            key, size = self._lru.popitem(last=False)
+            self._cache_bytes -= size
+            try:
+                self._cache_path(key).unlink()
+            except OSError:
+                pass
+
+    def get_preview_path(self, file_path: Path) -> Optional[Path]:
+        """원본 파일에 대한 캐시된 미리보기 경로 (없으면 None)"""
+        try:
+            path = self._cache_path(content_hash(file_path))
+        except OSError:
+            return None
+        return path if path.exists() else None
+
+    def shutdown(self, wait: bool = True):
+        """진행 중인 작업 마무리 후 풀 종료"""
+        self.executor.shutdown(wait=wait)
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+동기화 이력 리포트 / 내보내기 CLI
+sync_history.db를 upload_time 인덱스 범위 조회로 읽어 리포트 출력 또는 파일로 내보내기
+
+사용법:
+    python3 sync_report.py summary --since 2025-07-12 --until 2025-07-13
+    python3 sync_report.py export --since 2025-07-12 --format csv --out shoot.csv
+    python3 sync_report.py export --format parquet --out history.parquet  (pyarrow 필요)
+
+메모리 사용량은 테이블 크기와 무관 (청크 단위 스트리밍, 집계는 SQLite 내부에서 수행)
+"""
+
+import sys
+import csv
+import sqlite3
+import argparse
+from pathlib import Path
+from datetime import datetime
+from typing import Iterator, List, Optional, Tuple
+from db_migrations import SCHEMA_VERSION, get_version
+
+DEFAULT_DB_PATH = Path(__file__).resolve().parent / "sync_history.db"
+
+# 내보내기 컬럼 (순서 고정)
+EXPORT_COLUMNS = ['id', 'file_path', 'file_size', 'file_hash', 'upload_time', 'status']
+
+# 스트리밍 청크 크기 (행)
+CHUNK_SIZE = 5000
+
+
+def to_epoch(value: Optional[str]) -> Optional[int]:
+    """로컬 시간 문자열('2025-07-12' 또는 '2025-07-12 14:00') → DB 저장 형식 epoch 초"""
+    if not value:
+        return None
+    for fmt in ('%Y-%m-%d %H:%M:%S', '%Y-%m-%d %H:%M', '%Y-%m-%d'):
+        try:
+            return int(datetime.strptime(value, fmt).astimezone().timestamp())
+        except ValueError:
+            continue
+    raise argparse.ArgumentTypeError(f"시간 형식 오류: {value} (예: 2025-07-12 또는 '2025-07-12 14:00')")
+
+
+class SyncHistoryReport:
+    """sync_history 범위 조회 및 집계"""
+
+    def __init__(self, db_path: Path, since: Optional[int] = None, until: Optional[int] = None):
+        # 읽기 전용으로 열어 실행 중인 데몬과 충돌하지 않도록 함
+        self.conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+        self.since = since
+        self.until = until
+
+    def _range_clause(self) -> Tuple[str, list]:
+        """upload_time 인덱스를 타는 범위 조건"""
+        conditions, params = [], []
+        if self.since:
+            conditions.append("s.upload_time >= ?")
+            params.append(self.since)
+        if self.until:
+            conditions.append("s.upload_time < ?")
+            params.append(self.until)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        return where, params
+
+    def iter_rows(self, chunk_size: int = CHUNK_SIZE) -> Iterator[List[tuple]]:
+        """범위 내 행을 청크 단위로 스트리밍"""
+        where, params = self._range_clause()
+        cursor = self.conn.execute(f"""
+            SELECT s.id, d.path || '/' || s.file_name, s.file_size, lower(hex(s.file_hash)),
+                   datetime(s.upload_time, 'unixepoch'), s.status
+            FROM sync_history s JOIN directories d ON d.id = s.dir_id
+            {where} ORDER BY s.upload_time
+        """, params)
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            yield rows
+
+    def hourly_throughput(self) -> List[tuple]:
+        """시간대별 (로컬 시간) 파일 수, 용량(MB), 실패 수"""
+        where, params = self._range_clause()
+        return self.conn.execute(f"""
+            SELECT strftime('%Y-%m-%d %H:00', s.upload_time, 'unixepoch', 'localtime') AS hour,
+                   COUNT(*),
+                   ROUND(SUM(s.file_size) / 1048576.0, 1),
+                   SUM(s.status != 'completed')
+            FROM sync_history s {where}
+            GROUP BY hour ORDER BY hour
+        """, params).fetchall()
+
+    def failure_rates(self) -> List[tuple]:
+        """상태별 건수와 비율"""
+        where, params = self._range_clause()
+        return self.conn.execute(f"""
+            SELECT s.status, COUNT(*),
+                   ROUND(100.0 * COUNT(*) / SUM(COUNT(*)) OVER (), 2)
+            FROM sync_history s {where}
+            GROUP BY s.status ORDER BY COUNT(*) DESC
+        """, params).fetchall()
+
+    def largest_files(self, limit: int = 10) -> List[tuple]:
+        """가장 큰 파일 (SQLite top-N 정렬, 메모리는 limit에 비례)"""
+        where, params = self._range_clause()
+        return self.conn.execute(f"""
+            SELECT d.path || '/' || s.file_name, s.file_size,
+                   datetime(s.upload_time, 'unixepoch', 'localtime')
+            FROM sync_history s JOIN directories d ON d.id = s.dir_id
+            {where}
+            ORDER BY s.file_size DESC LIMIT ?
+        """, params + [limit]).fetchall()
+
+    def close(self):
+        self.conn.close()
+
+
+def export_csv(report: SyncHistoryReport, out_path: Path) -> int:
+    """CSV로 스트리밍 내보내기"""
+    total = 0
+    with open(out_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(EXPORT_COLUMNS)
+        for rows in report.iter_rows():
+            writer.writerows(rows)
+            total += len(rows)
+    return total
+
+
+def export_parquet(report: SyncHistoryReport, out_path: Path) -> int:
+    """Parquet(열 지향)으로 내보내기 - 청크마다 row group 하나씩 기록"""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise SystemExit("❌ Parquet 내보내기에는 pyarrow가 필요합니다: pip3 install pyarrow")
+
+    schema = pa.schema([
+        ('id', pa.int64()),
+        ('file_path', pa.string()),
+        ('file_size', pa.int64()),
+        ('file_hash', pa.string()),
+        ('upload_time', pa.string()),  # UTC 'YYYY-MM-DD HH:MM:SS'
+        ('status', pa.string()),
+    ])
+    total = 0
+    with pq.ParquetWriter(str(out_path), schema, compression='zstd') as writer:
+        for rows in report.iter_rows():
+            columns = list(zip(*rows))
+            batch = pa.RecordBatch.from_arrays(
+                [pa.array(col, type=field.type) for col, field in zip(columns, schema)],
+                schema=schema
+            )
+            writer.write_batch(batch)
+            total += len(rows)
+    return total
+
+
+def print_summary(report: SyncHistoryReport, top: int):
+    """리포트 출력"""
+    print("📈 시간대별 처리량")
+    print(f"   {'시간':<17} {'파일':>7} {'용량(MB)':>10} {'실패':>6}")
+    for hour, count, size_mb, failed in report.hourly_throughput():
+        print(f"   {hour:<17} {count:>7} {size_mb or 0:>10} {failed or 0:>6}")
+
+    print("\n📊 상태별 비율")
+    for status, count, percent in report.failure_rates():
+        print(f"   {status:<12} {count:>7}개  ({percent}%)")
+
+    print(f"\n📦 가장 큰 파일 Top {top}")
+    for file_path, file_size, upload_time in report.largest_files(top):
+        print(f"   {file_size / 1024 / 1024:>8.1f}MB  {upload_time}  {file_path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="sync_history 리포트 / 내보내기")
+    parser.add_argument('command', choices=['summary', 'export'])
+    parser.add_argument('--db', type=Path, default=DEFAULT_DB_PATH, help="sync_history.db 경로")
+    parser.add_argument('--since', type=to_epoch, help="시작 (로컬 시간, 포함)")
+    parser.add_argument('--until', type=to_epoch, help="끝 (로컬 시간, 미포함)")
+    parser.add_argument('--top', type=int, default=10, help="가장 큰 파일 개수")
+    parser.add_argument('--format', choices=['csv', 'parquet'], default='csv')
+    parser.add_argument('--out', type=Path, help="내보낼 파일 경로")
+    args = parser.parse_args()
+
+    if not args.db.exists():
+        print(f"❌ 데이터베이스가 없습니다: {args.db}")
+        return 1
+
+    report = SyncHistoryReport(args.db, args.since, args.until)
+    if get_version(report.conn) < SCHEMA_VERSION:
+        print(f"❌ DB 스키마가 오래되었습니다 (v{get_version(report.conn)}). 동기화 데몬을 한 번 실행해 마이그레이션하세요.")
+        report.close()
+        return 1
+    try:
+        if args.command == 'summary':
+            print_summary(report, args.top)
+        else:
+            out_path = args.out or Path(f"sync_history.{args.format}")
+            exporter = export_parquet if args.format == 'parquet' else export_csv
+            total = exporter(report, out_path)
+            print(f"✅ {total}개 행 내보내기 완료: {out_path}")
+    finally:
+        report.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())